@@ -0,0 +1,320 @@
+#!/usr/bin/env python
+"""
+Benchmark of the ingest-to-pixel pipeline.
+Times each stage the displays run per tick - parsing variable server messages,
+appending to the history, update_plot with matplotlib (Agg) and PyVista
+(off-screen), the state labels - plus Save Data exports, over a sweep of
+history sizes and sample rates, and reports per-call percentiles.
+
+Usage:
+    python benchmark.py [--quick] [--json FILE] [--stages parse,append,...]
+                        [--sizes 1000,10000] [--rates 1000,10000] [--ticks N]
+
+The display stages need a Tk display (use xvfb-run on a headless machine)
+and are skipped without one.
+Author: Generated for NASA Trick Project
+"""
+
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+from mock_trick_server import vehicle_orbit, ascii_messages, binary_messages
+from trick_client import TrickVariableClient, DEFAULT_VEHICLE
+from trajectory_history import TrajectoryHistory, TIME, POSITION, VELOCITY, ACCELERATION
+from trajectory_export import export_rows, EXPORT_FORMATS
+
+STAGES = ("parse", "append", "plot_agg", "plot_pyvista", "labels", "save")
+SIZES = (1000, 10000, 100000, 1000000)
+RATES = (1000, 10000, 100000)
+QUICK_SIZES = (1000, 10000)
+QUICK_RATES = (1000, 10000)
+TICK = 0.02  # Display tick in seconds; each tick ingests rate * TICK samples
+
+
+def synthetic_rows(count, start=0, rate=1000.0):
+    """
+    Generate samples of an orbit, in history order.
+
+    Args:
+        count (int): Number of samples
+        start (int): Index of the first sample
+        rate (float): Samples per second of simulated time
+
+    Returns:
+        np.ndarray: (count, 10) samples
+    """
+    t = (start + np.arange(count)) / float(rate)
+    rows = np.empty((count, 10))
+    rows[:, TIME] = 1.7e9 + t
+    rows[:, 1:] = vehicle_orbit(DEFAULT_VEHICLE).state(t)
+    return rows
+
+
+def percentiles(times):
+    """
+    Summarize per-call times.
+
+    Args:
+        times (list): Seconds per call
+
+    Returns:
+        dict: Call count and mean/p50/p90/p99/max in milliseconds
+    """
+    ms = np.asarray(times) * 1000.0
+    p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+    return {"calls": len(ms), "mean_ms": float(ms.mean()), "p50_ms": float(p50),
+            "p90_ms": float(p90), "p99_ms": float(p99), "max_ms": float(ms.max())}
+
+
+def report(results, stage, times, rows_per_call=None, **params):
+    """
+    Add a result and print it.
+
+    Args:
+        results (list): Result dicts, appended to
+        stage (str): Stage name
+        times (list): Seconds per call
+        rows_per_call (int): Samples handled per call, for a rows/s figure
+        **params: Sweep parameters of this case
+    """
+    result = {"stage": stage}
+    result.update(params)
+    result.update(percentiles(times))
+    if rows_per_call:
+        result["rows_per_s"] = rows_per_call / max(float(np.mean(times)), 1e-12)
+    results.append(result)
+
+    label = " ".join("{}={}".format(key, value) for key, value in sorted(params.items()))
+    rate = "  {:>12,.0f} rows/s".format(result["rows_per_s"]) if rows_per_call else ""
+    print("{:<13} {:<40} p50 {:8.3f} ms  p99 {:8.3f} ms{}".format(
+        stage, label, result["p50_ms"], result["p99_ms"], rate))
+
+
+def bench_parse(results, rates, ticks):
+    """Parse one tick's worth of messages, ASCII and binary, per rate."""
+    for binary in (False, True):
+        client = TrickVariableClient(binary=binary)
+        for rate in rates:
+            batch = max(1, int(rate * TICK))
+            rows = synthetic_rows(batch, rate=rate)
+            # The server sends the variables in var_add order (time last)
+            values = np.column_stack([rows[:, 1:], rows[:, TIME]])
+            payload = binary_messages(values) if binary else ascii_messages(values)
+
+            client.reset_connection()
+            times = []
+            for _ in range(ticks):
+                client.rx_buffer += payload
+                start = time.perf_counter()
+                samples = client._pop_samples()[0]
+                client.set_state(samples[-1])
+                times.append(time.perf_counter() - start)
+            report(results, "parse", times, batch, format="binary" if binary else "ascii",
+                   rate=rate)
+
+
+def bench_append(results, sizes, rates, ticks):
+    """Append one tick's worth of samples to a full history, per size and rate."""
+    for size in sizes:
+        history = TrajectoryHistory(size)
+        history.extend(synthetic_rows(size))
+        for rate in rates:
+            batch = max(1, int(rate * TICK))
+            rows = synthetic_rows(batch, size, rate)
+            times = []
+            for _ in range(ticks):
+                start = time.perf_counter()
+                history.extend(rows)
+                times.append(time.perf_counter() - start)
+            report(results, "append", times, batch, size=size, rate=rate)
+
+
+def bench_save(results, sizes, repeats):
+    """Export a full history in every Save Data format, per size."""
+    directory = tempfile.mkdtemp(prefix="orion_bench_")
+    try:
+        for size in sizes:
+            history = TrajectoryHistory(size)
+            history.extend(synthetic_rows(size))
+            for fmt, extension in EXPORT_FORMATS.items():
+                path = os.path.join(directory, "bench." + extension)
+                times = []
+                for _ in range(repeats):
+                    start = time.perf_counter()
+                    export_rows(path, history.view().copy(), fmt)
+                    times.append(time.perf_counter() - start)
+                report(results, "save", times, size, size=size, format=fmt)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def tick_samples(app, track, rows, batch, ticks):
+    """
+    Time update_plot over ticks of new samples.
+
+    Args:
+        app: Display under test
+        track (VehicleTrack): Vehicle receiving the samples
+        rows (np.ndarray): Samples to feed, batch per tick
+        batch (int): Samples per tick
+        ticks (int): Ticks to time
+
+    Returns:
+        list: Seconds per update_plot (including pending idle draws)
+    """
+    times = []
+    for tick in range(ticks):
+        app.append_samples(track, rows[(tick * batch) % len(rows):][:batch])
+        start = time.perf_counter()
+        app.update_plot([track])
+        app.window.update_idletasks()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def bench_plot_agg(results, sizes, rates, ticks, labels):
+    """Time the matplotlib display's update_plot (and labels) per view, size and rate."""
+    import tkinter as tk
+    import flight_trajectory_display as display
+
+    for size in sizes:
+        root = tk.Tk()
+        root.withdraw()
+        app = display.FlightTrajectoryDisplay(root, max_points=size, record=None)
+        track = app.tracks[0]
+        for view in ("2D", "3D"):
+            if app.view_mode != view:
+                app.toggle_3d_view()
+            track.clear()
+            app.append_samples(track, synthetic_rows(size))
+            app.limits_dirty = True
+            app.update_plot()
+            root.update()
+            for rate in rates:
+                batch = max(1, int(rate * TICK))
+                rows = synthetic_rows(batch * 10, size, rate)
+                report(results, "plot_agg", tick_samples(app, track, rows, batch, ticks), batch,
+                       size=size, rate=rate, view=view)
+
+        if labels:
+            # A new state per refresh, so every label changes
+            times = []
+            for state in synthetic_rows(ticks):
+                start = time.perf_counter()
+                app.show_state(state[POSITION], state[VELOCITY], state[ACCELERATION], state[TIME])
+                app.set_texts([app.points_label], ["Points: {}".format(len(track.history))])
+                root.update_idletasks()
+                times.append(time.perf_counter() - start)
+            report(results, "labels", times, size=size)
+        root.destroy()
+
+
+def bench_plot_pyvista(results, sizes, rates, ticks):
+    """Time the PyVista display's update_plot with an off-screen plotter per size and rate."""
+    import pyvista as pv
+    import flight_trajectory_display_pyvista as display
+
+    for size in sizes:
+        plotter = pv.Plotter(off_screen=True, window_size=(1024, 768))
+        app = display.FlightTrajectoryDisplay(max_points=size, record=None, plotter=plotter)
+        app.control_window.withdraw()
+        track = app.tracks[0]
+        app.append_samples(track, synthetic_rows(size))
+        app.update_plot()
+        for rate in rates:
+            batch = max(1, int(rate * TICK))
+            rows = synthetic_rows(batch * 10, size, rate)
+            report(results, "plot_pyvista", tick_samples(app, track, rows, batch, ticks), batch,
+                   size=size, rate=rate)
+        plotter.close()
+        app.control_window.destroy()
+
+
+def display_available():
+    """Check that a Tk display can be opened (printing why not)."""
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+        root.destroy()
+        return True
+    except Exception as e:
+        print("Skipping display stages: {}".format(e))
+        return False
+
+
+def main():
+    """Main entry point."""
+    args = sys.argv[1:]
+
+    def option(flag, default, convert):
+        if flag in args:
+            i = args.index(flag)
+            value = convert(args[i + 1])
+            del args[i:i + 2]
+            return value
+        return default
+
+    def numbers(text):
+        return tuple(int(float(value)) for value in text.split(","))
+
+    quick = "--quick" in args
+    stages = option("--stages", STAGES, lambda text: tuple(text.split(",")))
+    sizes = option("--sizes", QUICK_SIZES if quick else SIZES, numbers)
+    rates = option("--rates", QUICK_RATES if quick else RATES, numbers)
+    ticks = option("--ticks", 30 if quick else 200, int)
+    json_path = option("--json", None, str)
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        print("Unknown stages: {} (choose from {})".format(", ".join(unknown), ", ".join(STAGES)))
+        sys.exit(2)
+
+    print("=" * 60)
+    print("Orion Trajectory Display Benchmark")
+    print("=" * 60)
+    print("Stages: {}".format(", ".join(stages)))
+    print("History sizes: {}".format(", ".join(str(size) for size in sizes)))
+    print("Sample rates: {} rows/s ({:.0f} ms ticks)".format(
+        ", ".join(str(rate) for rate in rates), TICK * 1000))
+    print("=" * 60)
+
+    results = []
+    if "parse" in stages:
+        bench_parse(results, rates, ticks)
+    if "append" in stages:
+        bench_append(results, sizes, rates, ticks)
+    if "save" in stages:
+        bench_save(results, sizes, 3 if not quick else 1)
+    display_stages = [stage for stage in ("plot_agg", "plot_pyvista", "labels") if stage in stages]
+    if display_stages and display_available():
+        if "plot_agg" in stages or "labels" in stages:
+            bench_plot_agg(results, sizes, rates if "plot_agg" in stages else (),
+                           ticks, "labels" in stages)
+        if "plot_pyvista" in stages:
+            try:
+                bench_plot_pyvista(results, sizes, rates, ticks)
+            except ImportError as e:
+                print("Skipping plot_pyvista: {}".format(e))
+
+    if json_path:
+        versions = {"python": platform.python_version(), "numpy": np.__version__}
+        for name in ("matplotlib", "pyvista", "vtk"):
+            module = sys.modules.get(name)
+            if module is not None:
+                versions[name] = getattr(module, "__version__", None)
+        output = {"date": datetime.now().isoformat(), "platform": platform.platform(),
+                  "versions": versions, "tick_s": TICK, "results": results}
+        with open(json_path, "w") as f:
+            json.dump(output, f, indent=2)
+        print("Results written to: {}".format(json_path))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+"""
+pytest configuration.
+test_trick_connection.py is the manual connection tester (a live session
+against a real or mock variable server), not part of the test suite.
+"""
+
+collect_ignore = ["test_trick_connection.py"]
@@ -0,0 +1,661 @@
+#!/usr/bin/env python
+"""
+Controller logic shared by the matplotlib and PyVista trajectory displays.
+DisplayController ingests every vehicle's samples each GUI tick, records
+them, refreshes the state panel and performance HUD, and runs replays,
+archive loading, Save Data exports and connecting/stopping; the displays
+subclass it and add their window, controls and rendering.
+parse_display_args() and start_display() hold the command line handling
+common to both displays.
+Author: Generated for NASA Trick Project
+"""
+
+import time
+from datetime import datetime
+
+from trick_client import DEFAULT_VEHICLE, IDLE, CONNECTING, LIVE, STALLED, BACKOFF
+from trick_relay import DEFAULT_PORT as RELAY_PORT
+from trajectory_history import TIME, POSITION, VELOCITY, ACCELERATION
+from trajectory_archive import TrajectoryArchive, parse_window, EXTENSION as ARCHIVE_EXTENSION
+from trajectory_replay import TrajectoryReplay, parse_speed
+from trajectory_recorder import TrajectoryRecorder
+from trajectory_export import TrajectoryExport, EXPORT_FORMATS, EXPORT_LABELS
+from perf_stats import PerfMonitor, StartupTimer
+from vehicle_track import VehicleTrack
+
+
+# Status label color for each connection state
+STATUS_COLORS = {
+    IDLE: "red",
+    CONNECTING: "orange",
+    LIVE: "green",
+    STALLED: "orange",
+    BACKOFF: "red",
+}
+
+HUD_PERIOD = 0.5  # Seconds between performance HUD refreshes
+
+
+def load_dialogs():
+    """
+    Import the Tk file and text dialogs, on first use of Load Archive or Replay.
+
+    Returns:
+        tuple: (filedialog, simpledialog) modules
+    """
+    # Python 2/3 compatibility
+    try:
+        import tkFileDialog as filedialog
+        import tkSimpleDialog as simpledialog
+    except ImportError:
+        from tkinter import filedialog, simpledialog
+    return filedialog, simpledialog
+
+
+class DisplayController:
+    """
+    Ingest, recording, replay and performance logic of a trajectory display.
+
+    Subclasses create the Tk window and controls after calling __init__, and
+    provide:
+      * window: Tk window that runs the update ticks and parents dialogs
+      * widgets: host_entry, port_entry, connect_btn, status_label,
+        points_label, lag_label, state_labels, save_format_var,
+        save_progress, hud_var and hud_label
+      * update_plot(tracks), clear_plot(), show_state(pos, vel, acc, t),
+        show_hud(shown), perf_context() and close_window()
+    and may extend start_updates() (e.g. to build the scene first).
+    """
+    def __init__(self, host="localhost", port=7108, max_points=1000, ingest_mode="thread",
+                 max_samples_per_tick=1000, binary=False, vehicles=None, record="csv",
+                 record_dir=".", perf=False, label_rate=10.0, startup=None, relay=False):
+        """
+        Initialize the vehicles and the update state.
+
+        Args:
+            host (str): Trick Variable Server host
+            port (int): Trick Variable Server port
+            max_points (int): Maximum number of trajectory points to display
+            ingest_mode (str): "thread" to read the socket on a background thread,
+                or "direct" to read the socket from the GUI tick without blocking
+            max_samples_per_tick (int): Most samples ingested per GUI tick; the
+                rest wait for the next tick
+            binary (bool): Ask the variable server for binary messages
+            vehicles (list): Vehicle specs to follow, e.g. ["Sim.Orion_1",
+                "Sim.Orion_2", "host2:7108/Sim.Orion_1"] (default: Sim.Orion_1);
+                see vehicle_track.parse_vehicle
+            record (str): Stream every received sample to disk while connected,
+                as "csv", "parquet" or "archive" (.traj) files, or None to not record
+            record_dir (str): Directory for the recordings
+            perf (bool): Time the update stages and show the performance HUD
+                from the start
+            label_rate (float): State panel refreshes per second, whatever the
+                sample rate (None: every tick that receives samples)
+            startup (StartupTimer): Timer marking the startup steps
+            relay (bool): host and port are a TrickRelay sharing one sim
+                connection (see trick_relay); host may be "unix:/path"
+        """
+        self.startup = startup or StartupTimer()
+
+        # One client, connection manager (reconnects with backoff off the GUI
+        # thread), history buffer and level-of-detail stage per vehicle
+        self.tracks = [VehicleTrack(spec, host, port, max_points, ingest_mode, binary, relay)
+                       for spec in (vehicles or [DEFAULT_VEHICLE])]
+        self.max_points = max_points
+        self.ingest_mode = ingest_mode
+        self.max_samples_per_tick = max_samples_per_tick
+
+        # Recorders persist every sample, independent of max_points
+        if record:
+            for track in self.tracks:
+                track.recorder = TrajectoryRecorder(record_dir, self.file_prefix(track), record)
+
+        # Plot updates since connecting or starting a replay
+        self.frames = 0
+        self.replay_reported = False
+
+        # Save Data export running on a worker thread, if any
+        self.export = None
+        self.export_quiet = False
+
+        # Stage timings for the performance HUD (off until the HUD is shown);
+        # the clients time their parsing into the same monitor
+        self.perf = PerfMonitor(enabled=perf)
+        self.hud_time = 0.0
+        for track in self.tracks:
+            track.client.perf = self.perf
+
+        # The state panel refreshes at label_rate with the latest state, and
+        # only labels whose text changed are reconfigured
+        self.label_period = 1.0 / label_rate if label_rate else 0.0
+        self.label_time = 0.0
+        self.labels_pending = False  # Samples arrived since the last refresh
+        self.label_samples = 0  # Samples and ticks since the last refresh
+        self.label_ticks = 0
+        self.label_texts = {}  # Label -> text last set
+
+        # The first vehicle drives the state labels
+        self.trick_client = self.tracks[0].client
+        self.connection = self.tracks[0].connection
+        self.history = self.tracks[0].history
+
+        # Update loop state
+        self.is_running = False
+        self.update_id = None  # Tk id of the scheduled update tick
+
+    def connect_to_trick(self):
+        """Connect to Trick Variable Server, or stop the connection or replay."""
+        if self.tracks[0].replay is None and not any(track.running for track in self.tracks):
+            host = self.host_entry.get()
+            port = int(self.port_entry.get())
+
+            # Histories are kept, so a reconnect continues the same trajectories
+            for track in self.tracks:
+                track.start(host, port)
+            self.update_status()
+            self.connect_btn.config(text="Disconnect", bg="red")
+            self.start_updates()
+        else:
+            self.disconnect_from_trick()
+
+    def disconnect_from_trick(self):
+        """Disconnect from Trick Variable Server."""
+        self.is_running = False
+        if self.update_id:
+            self.window.after_cancel(self.update_id)
+
+        # Stopping also writes out and closes the recordings
+        for track in self.tracks:
+            track.stop()
+            if track.recorder is not None and track.recorder.files:
+                print("Recorded {} samples to: {}".format(track.recorder.rows_written,
+                                                          ", ".join(track.recorder.files)))
+        self.end_replay()
+        self.status_label.config(text="Disconnected", fg="red")
+        self.connect_btn.config(text="Connect", bg="green")
+
+    def start_updates(self):
+        """Start the update loop, replacing a tick already scheduled."""
+        if self.update_id:
+            self.window.after_cancel(self.update_id)
+        self.is_running = True
+        self.update_display()
+
+    def clear_trajectory(self):
+        """Clear trajectory history."""
+        for track in self.tracks:
+            track.clear()
+        self.clear_plot()
+
+    def file_prefix(self, track):
+        """Get the start of the file names saved or recorded for a vehicle."""
+        if len(self.tracks) == 1:
+            return "orion_trajectory"
+        return "orion_trajectory_{}".format(track.file_name())
+
+    def save_to_csv(self, auto_save=False, fmt=None):
+        """
+        Save the trajectory history, one file per vehicle with data.
+
+        The histories are copied here and written by a worker thread, with
+        its progress shown next to the Save button, so the GUI keeps running.
+
+        Args:
+            auto_save (bool): If True, saves without printing a summary
+            fmt (str): "csv", "csv.gz" or "archive", or None for the format
+                chosen in the GUI
+
+        Returns:
+            list: Names of the files being written (self.export.files once done)
+        """
+        if self.export is not None and self.export.running:
+            print("Still saving the previous export")
+            return []
+
+        tracks = [track for track in self.tracks if len(track.history)]
+        if not tracks:
+            if not auto_save:
+                print("No data to save!")
+            return []
+
+        # Generate filename with timestamp
+        fmt = fmt or EXPORT_LABELS[self.save_format_var.get()]
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        jobs = [("{}_{}.{}".format(self.file_prefix(track), timestamp, EXPORT_FORMATS[fmt]),
+                 track.history.view().copy())
+                for track in tracks]
+
+        self.export = TrajectoryExport(jobs, fmt)
+        self.export_quiet = auto_save
+        self.export.start()
+        self.poll_export()
+        return [filename for filename, rows in jobs]
+
+    def poll_export(self):
+        """Show the export progress until the worker thread finishes."""
+        export = self.export
+        self.save_progress.config(value=100.0 * export.fraction)
+        if export.running:
+            self.window.after(100, self.poll_export)
+            return
+
+        if not self.export_quiet:
+            for filename, rows in export.jobs:
+                if filename in export.files:
+                    print("Data saved to: {}".format(filename))
+                    print("Total data points: {}".format(len(rows)))
+
+    def load_archive(self, path=None, window=None):
+        """
+        Plot a time window of a recorded trajectory archive.
+
+        Only the window's part of the file is read, decimated to max_points
+        while it is read, so any archive size loads in bounded memory. The
+        window replaces the first vehicle's trajectory; disconnect first.
+
+        Args:
+            path (str): Archive file (.traj), or None to choose one and be
+                asked for the window
+            window (tuple): (start, end) sample times in seconds, None on
+                either side for the archive's start or end
+        """
+        if self.is_running:
+            print("Disconnect before loading an archive")
+            return
+
+        ask = path is None
+        if ask:
+            filedialog, simpledialog = load_dialogs()
+            path = filedialog.askopenfilename(
+                title="Load Trajectory Archive",
+                filetypes=[("Trajectory archives", "*." + ARCHIVE_EXTENSION), ("All files", "*")])
+            if not path:
+                return
+
+        try:
+            archive = TrajectoryArchive(path)
+            time_range = archive.time_range()
+            if time_range is None:
+                print("Archive {} is empty".format(path))
+                return
+            if ask:
+                text = simpledialog.askstring(
+                    "Time Window",
+                    "Samples from {:.3f} s to {:.3f} s.\nWindow START:END (blank for all):".format(
+                        *time_range), parent=self.window)
+                if text is None:
+                    return
+                window = parse_window(text)
+            start, end = window or (None, None)
+            total = len(archive.window(start, end))
+            rows = archive.decimated(start, end, self.max_points)
+        except (OSError, ValueError) as e:
+            print("Error loading archive: {}".format(e))
+            return
+
+        self.clear_trajectory()
+        if not len(rows):
+            print("No samples in that window of {}".format(path))
+            return
+        track = self.tracks[0]
+        track.history.extend(rows)
+        track.changed = True
+
+        latest = rows[-1]
+        self.show_state(latest[POSITION], latest[VELOCITY], latest[ACCELERATION], latest[TIME])
+        self.set_texts([self.points_label], ["Points: {}".format(len(rows))])
+        self.update_plot([track])
+        print("Loaded {} of {} samples ({:.3f} s to {:.3f} s) from {}".format(
+            len(rows), total, rows[0, TIME], rows[-1, TIME], path))
+
+    def start_replay(self, path=None, speed=1.0):
+        """
+        Play a recorded file through the live ingest and render path.
+
+        The file (CSV, gzip CSV or .traj; see trajectory_replay.load_rows)
+        feeds the first vehicle in place of its connection. With speed=None
+        rows are taken as fast as the display ingests them, and the ingest
+        and frame rates printed at the end profile the display without a sim.
+
+        Args:
+            path (str): File to play, or None to choose one and be asked
+                for the speed
+            speed (float): Recorded seconds played per second, or None for
+                as fast as possible
+        """
+        if path is None:
+            filedialog, simpledialog = load_dialogs()
+            path = filedialog.askopenfilename(
+                title="Replay Trajectory",
+                filetypes=[("Trajectory files", "*.csv *.gz *." + ARCHIVE_EXTENSION),
+                           ("All files", "*")])
+            if not path:
+                return
+            text = simpledialog.askstring("Replay Speed", "Speed (1, 10, ... or max):",
+                                          initialvalue="1", parent=self.window)
+            if text is None:
+                return
+            try:
+                speed = parse_speed(text)
+            except ValueError as e:
+                print("Invalid replay speed: {}".format(e))
+                return
+
+        if any(track.running for track in self.tracks):
+            self.disconnect_from_trick()
+        try:
+            replay = TrajectoryReplay(path, speed)
+        except (OSError, ValueError) as e:
+            print("Error opening replay: {}".format(e))
+            return
+
+        # The replay stands in for the first vehicle's client and connection
+        self.clear_trajectory()
+        track = self.tracks[0]
+        track.replay = replay
+        self.trick_client = self.connection = replay
+        self.frames = 0
+        self.replay_reported = False
+        print("Replaying {} samples from {}".format(len(replay), path))
+
+        track.start(None, None)
+        self.update_status()
+        self.connect_btn.config(text="Stop", bg="red")
+        self.start_updates()
+
+    def report_replay(self):
+        """Print the replay's ingest and frame rates (once per replay)."""
+        replay = self.tracks[0].replay
+        if replay is None or self.replay_reported:
+            return
+        self.replay_reported = True
+        samples, seconds = replay.rates()
+        seconds = max(seconds, 1e-6)
+        print("Replayed {} samples in {:.2f} s: {:.0f} samples/s ingested, "
+              "{:.1f} frames/s rendered".format(samples, seconds, samples / seconds,
+                                                self.frames / seconds))
+
+    def finish_replay(self):
+        """Stop updating once a replay has played every row, keeping its trajectory."""
+        if self.labels_pending:
+            self.update_labels()
+        self.update_status()
+        self.is_running = False
+        self.tracks[0].stop()
+        self.end_replay()
+        self.connect_btn.config(text="Connect", bg="green")
+
+    def end_replay(self):
+        """Give the first vehicle its connection back after a replay."""
+        track = self.tracks[0]
+        if track.replay is None:
+            return
+        self.report_replay()
+        track.replay = None
+        self.trick_client = track.client
+        self.connection = track.connection
+
+    def toggle_hud(self):
+        """Show or hide the performance HUD, timing the update stages only while shown."""
+        if self.hud_var.get():
+            self.perf.reset()
+            self.perf.enabled = True
+            self.hud_time = 0.0
+        else:
+            self.perf.enabled = False
+        self.show_hud(self.perf.enabled)
+
+    def update_hud(self):
+        """Refresh the performance HUD (at most every HUD_PERIOD seconds)."""
+        now = time.time()
+        if now - self.hud_time < HUD_PERIOD:
+            return
+        self.hud_time = now
+        self.perf.set("queue", sum(track.client.queued_samples for track in self.tracks))
+        self.perf.set("dropped", sum(track.client.dropped_samples for track in self.tracks))
+        self.hud_label.config(text=self.perf.hud_text())
+
+    def save_perf_snapshot(self, path=None):
+        """
+        Write the performance HUD's data, with the display settings, as JSON.
+
+        Args:
+            path (str): Output file (default: orion_perf_<timestamp>.json)
+
+        Returns:
+            str: Name of the file written, or None on error
+        """
+        if path is None:
+            path = "orion_perf_{}.json".format(datetime.now().strftime("%Y-%m-%d_%H-%M-%S"))
+        self.perf.set("queue", sum(track.client.queued_samples for track in self.tracks))
+        self.perf.set("dropped", sum(track.client.dropped_samples for track in self.tracks))
+        replay = self.tracks[0].replay
+        context = self.perf_context()
+        try:
+            self.perf.save(path, enabled=self.perf.enabled,
+                           vehicles=[track.name for track in self.tracks],
+                           ingest_mode=self.ingest_mode, max_points=self.max_points,
+                           max_samples_per_tick=self.max_samples_per_tick,
+                           points=sum(len(track.history) for track in self.tracks),
+                           frames=self.frames,
+                           replay_speed=replay.speed if replay is not None else None,
+                           **context)
+        except (OSError, IOError) as e:
+            print("Error saving performance snapshot: {}".format(e))
+            return None
+        print("Performance snapshot saved to: {}".format(path))
+        return path
+
+    def update_status(self):
+        """Show the connection manager's state in the status label."""
+        text = self.connection.status_text()
+        if len(self.tracks) > 1:
+            live = sum(track.live for track in self.tracks)
+            text = "{} ({}/{} live)".format(text, live, len(self.tracks))
+        if text != self.status_label.cget("text"):
+            self.status_label.config(text=text, fg=STATUS_COLORS[self.connection.state])
+
+    def read_samples(self, track):
+        """
+        Collect the samples that arrived since the last GUI tick.
+
+        Args:
+            track (VehicleTrack): Vehicle to read
+
+        Returns:
+            np.ndarray: (N, 10) samples in history order (see TrickVariableClient)
+        """
+        return track.read(self.max_samples_per_tick)
+
+    def append_samples(self, track, samples):
+        """
+        Append a batch of samples to a vehicle's trajectory history.
+
+        Args:
+            track (VehicleTrack): Vehicle the samples belong to
+            samples (np.ndarray): (N, 10) samples in history order
+        """
+        track.history.extend(samples)
+        track.changed = True
+        if track.recorder is not None:
+            track.recorder.record(samples)
+
+    def set_texts(self, labels, texts):
+        """
+        Set label texts, skipping labels that already show them.
+
+        Args:
+            labels (list): Label widgets
+            texts (list): Text for each label
+        """
+        for label, text in zip(labels, texts):
+            if self.label_texts.get(label) != text:
+                self.label_texts[label] = text
+                label.config(text=text)
+
+    def update_labels(self):
+        """Show the first vehicle's latest state and the statistics in the state panel."""
+        self.label_time = time.time()
+        self.labels_pending = False
+        self.show_state(self.trick_client.get_position(), self.trick_client.get_velocity(),
+                        self.trick_client.get_acceleration(), self.trick_client.get_time())
+
+        # Samples per tick averaged over the ticks since the last refresh
+        per_tick = float(self.label_samples) / max(self.label_ticks, 1)
+        self.label_samples = self.label_ticks = 0
+        self.set_texts([self.points_label, self.lag_label],
+                       ["Points: {}".format(sum(len(track.history) for track in self.tracks)),
+                        "Lag: {:.3f} s ({:.0f} /tick)".format(self.trick_client.get_lag(), per_tick)])
+
+    def update_display(self):
+        """Main update loop for display."""
+        if not self.is_running:
+            return
+
+        # Stage timings for the HUD (no-ops while it is hidden)
+        perf = self.perf
+        tick_start = perf.start()
+
+        # Get data from Trick, for every vehicle
+        received = 0
+        for track in self.tracks:
+            start = perf.start()
+            samples = self.read_samples(track)
+            perf.stop("ingest", start)
+            if len(samples):
+                # Store history
+                start = perf.start()
+                self.append_samples(track, samples)
+                perf.stop("append", start)
+                received += len(samples)
+
+        self.label_samples += received
+        self.label_ticks += 1
+        if received:
+            self.labels_pending = True
+
+            # Update the vehicles that changed, then draw once for all of them
+            start = perf.start()
+            self.update_plot([track for track in self.tracks if track.changed])
+            perf.stop("update_plot", start)
+            self.frames += 1
+            perf.event("frames")
+            perf.event("samples", received)
+
+        # State panel at label_rate (decoupled from the sample rate), always
+        # ending on the latest state
+        if self.labels_pending and time.time() - self.label_time >= self.label_period:
+            start = perf.start()
+            self.update_labels()
+            perf.stop("labels", start)
+
+        perf.stop("tick", tick_start)
+        if perf.enabled:
+            self.update_hud()
+
+        # Connection state (attempts and reconnects run on the manager thread)
+        replay = self.tracks[0].replay
+        if replay is not None and replay.finished:
+            self.finish_replay()
+            return
+        self.update_status()
+
+        # Schedule next update (50 Hz update rate, or at once for a max-speed replay)
+        fast = replay is not None and replay.running and replay.speed is None
+        self.update_id = self.window.after(1 if fast else 20, self.update_display)
+
+    def on_closing(self):
+        """Handle window closing event."""
+        self.disconnect_from_trick()
+        if self.export is not None:
+            # Let a running save finish its files
+            self.export.join()
+        self.close_window()
+
+
+def parse_display_args(args, max_points=1000):
+    """
+    Parse the command line options common to both displays.
+
+    Usage: [host] [port] [max_points] [--binary] [--vehicles A,B,...] [--relay]
+           [--record csv|parquet|archive | --no-record] [--perf] [--label-rate HZ]
+           [--archive PATH [--window START:END]] [--replay FILE [--speed 1|10|max]]
+           [--startup-times]
+
+    Args:
+        args (list): Command line arguments, without the program name
+        max_points (int): History size unless given
+
+    Returns:
+        tuple: (settings, session) dicts; settings are FlightTrajectoryDisplay
+            keyword arguments (host, port, max_points, binary, vehicles,
+            record, perf, label_rate, relay), session is what start_display()
+            does once the display exists (archive, window, replay, speed,
+            startup_times)
+    """
+    args = list(args)
+
+    def option(flag, default, convert):
+        if flag in args:
+            i = args.index(flag)
+            value = convert(args[i + 1])
+            del args[i:i + 2]
+            return value
+        return default
+
+    def switch(flag):
+        if flag in args:
+            args.remove(flag)
+            return True
+        return False
+
+    settings = {
+        "binary": switch("--binary"),
+        # Vehicle specs, e.g. Sim.Orion_1,Sim.Orion_2,host2:7108/Sim.Orion_1
+        "vehicles": option("--vehicles", None, lambda text: text.split(",")),
+        # host and port are a trick_relay.py relay instead of the sim
+        "relay": switch("--relay"),
+        # Show the performance HUD from the start
+        "perf": switch("--perf"),
+        # State panel refresh rate
+        "label_rate": option("--label-rate", 10.0, float),
+        "record": option("--record", "csv", str),
+    }
+    if switch("--no-record"):
+        settings["record"] = None
+    session = {
+        # Plot a recorded archive (or a time window of it) at startup
+        "archive": option("--archive", None, str),
+        "window": option("--window", None, parse_window),
+        # Play a recorded file instead of connecting
+        "replay": option("--replay", None, str),
+        "speed": option("--speed", 1.0, parse_speed),
+        # Print how long each startup step took
+        "startup_times": switch("--startup-times"),
+    }
+
+    settings["host"] = args[0] if len(args) > 0 else "localhost"
+    settings["port"] = int(args[1]) if len(args) > 1 else (
+        RELAY_PORT if settings["relay"] else 7108)
+    settings["max_points"] = int(args[2]) if len(args) > 2 else max_points
+    return settings, session
+
+
+def start_display(app, session):
+    """
+    Load the archive or start the replay given on the command line.
+
+    Args:
+        app (DisplayController): Display just created
+        session (dict): Session options from parse_display_args()
+    """
+    if session["archive"]:
+        app.load_archive(session["archive"], session["window"])
+    if session["replay"]:
+        app.start_replay(session["replay"], session["speed"])
+
+    if session["startup_times"]:
+        def report_startup():
+            app.startup.mark("main loop running")
+            print(app.startup.report())
+        app.window.after_idle(report_startup)
@@ -7,10 +7,13 @@ import sys
 import socket
 import os 
 import glob
+import random
 from time import sleep
 from time import time
 import datetime
 from CircularQueue import *
+from trick_parser import parse_rows
+from trick_subscription import TrickSubscription
 #from VerticalScrolledFrame import *
 
 # this thing holds the trick terms to pass to the trick variable server
@@ -100,14 +103,9 @@ def capture_init_state():
     client_socket_test = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     client_socket_test.connect( ("localhost", 7104) )  
     src_test = client_socket_test.makefile("r")
-    client_socket_test.send(b"trick.var_pause()\n")
-    client_socket_test.send( b"trick.var_clear()\n" )
 
     terms_to_grab = ["orion_init.pos[0]", "orion_init.pos[1]", "orion_init.pos[2]" , "orion_init.vel[0]" , "orion_init.vel[1]" , "orion_init.vel[2]" , "orion_init.year", "orion_init.month", "orion_init.day", "orion_init.hour", "orion_init.minute", "orion_init.second"]
-    for term in terms_to_grab:
-        trick_var_test = "trick.var_add(\"" + term + "\")\n"
-        client_socket_test.send(bytes(trick_var_test))
-    client_socket_test.send(b"trick.var_unpause()\n")
+    TrickSubscription(terms_to_grab).send(client_socket_test)
     trick_server_data_test = src_test.readline() # all of the trick terms
     trick_init_state_variables = trick_server_data_test.split("\t") # a list of the trick data
     return trick_init_state_variables
@@ -115,6 +113,13 @@ def capture_init_state():
 #trick_init_state_variables = capture_init_state()
 
 
+def format_trick_value(value):
+    """Formats a trick_data value for the data files, vectors come out as "x,y,z"."""
+    if isinstance(value, tuple):
+        return ",".join(repr(v) for v in value)
+    return repr(value)
+
+
 def show_popup_message(message, duration_ms):
     """Displays a temporary pop-up window with a message."""
     popup = Toplevel()
@@ -124,19 +129,48 @@ def show_popup_message(message, duration_ms):
     popup.after(duration_ms, popup.destroy)
 
 
+# sleeps for a while without freezing the window, if there is one yet
+def wait_responsive(seconds):
+    end = time() + seconds
+    while time() < end:
+        window = globals().get("root")
+        if window is not None:
+            window.update()
+        sleep(min(0.05, max(0, end - time())))
+
+
 class Trick():
     '''
     this class holds the entirety of the trick variable server setup and management, it adds things, clears things, and
     hopefully will not blow up like the holy hand grenade of antioch if you put the wrong term in it
     '''
-    def __init__(self, host, port):
+    def __init__(self, host, port, connect_timeout=3.0, max_backoff=30.0):
+        # retry with a growing, jittered delay instead of recursing into __init__ (which
+        # eventually hit the recursion limit) and keep the window responsive while waiting
+        delay = 0.5
+        attempt = 1
+        while not self.connect(host, port, connect_timeout):
+            wait = delay * random.uniform(0.75, 1.25)
+            print "Trick Variable server not responding, retry " + str(attempt) + " in " + str(round(wait, 1)) + " seconds"
+            wait_responsive(wait)
+            delay = min(delay * 2, max_backoff)
+            attempt += 1
+
+    def connect(self, host, port, connect_timeout):
         try:
+            connect_start = time()
             self.client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.client_socket.settimeout(connect_timeout)
             self.client_socket.connect( (host, port) )  
+            self.client_socket.settimeout(None)
             self.src = self.client_socket.makefile("r")
-            self.client_socket.send(b"trick.var_pause()\n")
-            self.client_socket.send( b"trick.var_clear()\n" )
 
+            # the whole pause/clear/add/unpause block goes out in one sendall at the end
+            subscription = TrickSubscription()
+
+            # (term, first column, number of columns) in var_add order, used to unpack each row
+            self.term_columns = []
+            self.num_vars = 0
             for term in trick_terms:
                 # need to handle vectors with commas
                 # print(trick_terms[term])
@@ -147,12 +181,9 @@ class Trick():
                     term_y = vector_trick_term[0].strip() + vector_trick_term[2].strip()
                     term_z = vector_trick_term[0].strip() + vector_trick_term[3].strip()
 
-                    trick_var_x = "trick.var_add(\""+str(term_x)+"\")\n"
-                    self.client_socket.send(bytes(trick_var_x))
-                    trick_var_y = "trick.var_add(\""+str(term_y)+"\")\n"
-                    self.client_socket.send(bytes(trick_var_y))
-                    trick_var_z = "trick.var_add(\""+str(term_z)+"\")\n"
-                    self.client_socket.send(bytes(trick_var_z))   
+                    subscription.add(term_x, term_y, term_z)
+                    self.term_columns.append((term, self.num_vars, 3))
+                    self.num_vars += 3
 
                     # print(term_x)
                     # print(term_y)
@@ -165,9 +196,11 @@ class Trick():
                     # a = self.client_socket.send(bytes(exist, encoding = 'utf-8'))
 
                     # print(exist)
-                    trick_var = "trick.var_add(\""+str(trick_terms[term])+"\")\n"
-                    self.client_socket.send(bytes(trick_var))
-            self.client_socket.send(b"trick.var_unpause()\n")
+                    subscription.add(trick_terms[term])
+                    self.term_columns.append((term, self.num_vars, 1))
+                    self.num_vars += 1
+            subscription.send(self.client_socket)
+            print "Subscribed to " + str(self.num_vars) + " trick terms in " + str(round((time() - connect_start) * 1000, 1)) + " ms"
             
             for term in trick_terms:
                 if term in WRITEABLE_FILES:
@@ -175,16 +208,14 @@ class Trick():
                     file_name = "./graphing_data/"+name+".txt"
                     with open(file_name, 'a') as file:
                         pass # this is literally just an open then leave
+            return True
         except:
-            print "Trick Variable server not responding, trying again in 1 second"
             self.client_socket.close()
-            sleep(1)
-            self.__init__(host, port)
+            return False
 
     # clears the variable server
     def clear(self):
-        self.client_socket.send( b"trick.var_pause()\n" )
-        self.client_socket.send( b"trick.var_clear()\n" )
+        self.client_socket.sendall( b"trick.var_pause()\ntrick.var_clear()\n" )
         self.client_socket.close()
 
     # updates the trick terms
@@ -196,34 +227,22 @@ class Trick():
         else:
             self.no_data = False
     
-        trick_variables = trick_server_data.split("\t") # a list of the trick data
-
-        # print(trick_data.keys())
-
-        trick_data_keys = list(trick_data.keys())
-        #print("******************")
-        #print(trick_data_keys[5])
-        data_index = 0
-        index = 1
-        while index < len(trick_variables):
-            if data_index == len(trick_data_keys):
-                break
-            # print(trick_data_keys[data_index])
-            if trick_data_keys[data_index].find("X[Y,Z]") != -1:
-                trick_data[trick_data_keys[data_index]] = str(trick_variables[index])+","+str(trick_variables[index+1])+","+str(trick_variables[index+2])
-
-                #update the buffers
-                trick_data_buffers[trick_data_keys[data_index]].enqueue(str(trick_variables[index])+","+str(trick_variables[index+1])+","+str(trick_variables[index+2]))
-               
-                index +=2
+        # the whole line is parsed to floats at once, in the same order the terms were added
+        rows = parse_rows(trick_server_data, self.num_vars, 1)
+        if len(rows) == 0:
+            return
+        trick_variables = rows[0].tolist()
+
+        # vectors are stored as (x, y, z) tuples, everything else as a float
+        for term, column, width in self.term_columns:
+            if width == 3:
+                value = tuple(trick_variables[column:column + 3])
             else:
-                trick_data[trick_data_keys[data_index]] = str(trick_variables[index])
+                value = trick_variables[column]
+            trick_data[term] = value
 
-                # update buffer
-                trick_data_buffers[trick_data_keys[data_index]].enqueue(str(trick_variables[index]))
-            index+=1
-
-            data_index += 1
+            # update the buffers
+            trick_data_buffers[term].enqueue(value)
 
         # print(trick_data.keys())
         # write to the data_files
@@ -231,7 +250,7 @@ class Trick():
             if key in WRITEABLE_FILES:
                 file_name = "./graphing_data/"+str(key.replace(" ", "_")) + ".txt"
                 with open(file_name, 'a') as file:
-                    file.write(str(value)+ "\n" )
+                    file.write(format_trick_value(value)+ "\n" )
                     # print("wrote to file")
         
         # print("Updated trick terms")  # Debugging print
@@ -298,9 +317,9 @@ class Tolerance_widget(Frame, object):
         self.dynamic_label.config(text=self.tripped, fg = "red")
         self.container.config(highlightbackground = "red")
         self.trip_time = trick_data["UTC Seconds (s)"]
-        p2_strng = "Time Tripped:: " + self.trip_time
+        p2_strng = "Time Tripped:: " + str(self.trip_time)
         self.time_tripped.config(fg = "green", text = p2_strng)
-        p2_strng = "Value When Tripped:: " + trick_data[self.name]
+        p2_strng = "Value When Tripped:: " + format_trick_value(trick_data[self.name])
         self.value_when_tripped.config(text = p2_strng)
         
 class DataWidget(Frame, object):
@@ -483,11 +502,11 @@ class MAIN_DISPLAY:
                     if dim == "N":
                         self.tolerance_expected = float(trick_data[self.tolerance_term])
                     elif dim == "X":
-                        self.tolerance_expected = float(trick_data[self.tolerance_term].split(",")[0])
+                        self.tolerance_expected = float(trick_data[self.tolerance_term][0])
                     elif dim == "Y":
-                        self.tolerance_expected = float(trick_data[self.tolerance_term].split(",")[1])
+                        self.tolerance_expected = float(trick_data[self.tolerance_term][1])
                     elif dim == "Z":
-                        self.tolerance_expected = float(trick_data[self.tolerance_term].split(",")[2])
+                        self.tolerance_expected = float(trick_data[self.tolerance_term][2])
                 else:
                     self.tolerance_expected = float(self.expected_field.get())
                 self.tolerance_max = float(self.max_field.get())
@@ -518,7 +537,7 @@ class MAIN_DISPLAY:
     def update_tolerance(self):
         dead_tol = []
         for key, value in TOLERANCES.items():
-            if value[4] == "NOW" or value[4] >= trick_data["UTC Seconds (s)"]:
+            if value[4] == "NOW" or value[4] >= format_trick_value(trick_data["UTC Seconds (s)"]):
                 if value[3] == "N":
                     data = float(trick_data.get(value[5]))
                     if data > value[0] + value[1]:
@@ -538,7 +557,7 @@ class MAIN_DISPLAY:
                             if w.data == key:
                                 w.update_data("YES")                 
                 elif value[3] == "X":
-                    data = float(trick_data.get(value[5]).split(',')[0])
+                    data = float(trick_data.get(value[5])[0])
                     if data > value[0] + value[1]:
                         valsAdd = value[0]+value[1]
                         p2_strng = "DATA VALUE " + value[5] + " breached MAX set tolerance of " + str(valsAdd) + " and reached " + str(data)
@@ -556,7 +575,7 @@ class MAIN_DISPLAY:
                             if w.data == key:
                                 w.update_data("YES")                                                       
                 elif value[3] == "Y":
-                    data = float(trick_data.get(value[5]).split(',')[1])
+                    data = float(trick_data.get(value[5])[1])
                     if data > value[0] + value[1]:
                         valsAdd = value[0]+value[1]
                         p2_strng = "DATA VALUE " + value[5] + " breached MAX set tolerance of " + str(valsAdd) + " and reached " + str(data)
@@ -574,7 +593,7 @@ class MAIN_DISPLAY:
                             if w.data == key:
                                 w.update_data("YES")                                               
                 elif value[3] == "Z":
-                    data = float(trick_data.get(value[5]).split(',')[2])
+                    data = float(trick_data.get(value[5])[2])
                     if data > value[0] + value[1]:
                         valsAdd = value[0]+value[1]
                         p2_strng = "DATA VALUE " + value[5] + " breached MAX set tolerance of " + str(valsAdd) + " and reached " + str(data)
@@ -598,18 +617,15 @@ class MAIN_DISPLAY:
                 TOLERANCES.pop(key)
             except:
                 p2_strng = "Popping key: " + str(key) + "resulted in error! Likely not in dictionary of dead toleracnes anymore. Func: update_tolerance"
-                print p2_strng
+                print(p2_strng)
 
     # updates the Data Widgets with new Data from the Trick Variable Server
     def update_widgets(self):
         for widget in self.widget_list:
             if widget.winfo_exists():
                 data = trick_data[widget.name]
-                if data.find(",") != -1:
-                    t_data = trick_data[widget.name].split(",")
-                    for i, d in enumerate(t_data):
-                        t_data[i] = str(round(float(d), 4))
-                    data = str(t_data[0])+","+str(t_data[1])+","+str(t_data[2])
+                if isinstance(data, tuple):
+                    data = ",".join(str(round(d, 4)) for d in data)
                 else:
                     data = str(data)              
 
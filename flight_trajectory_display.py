@@ -5,20 +5,20 @@ Connects to Trick Variable Server and plots Orion vehicle trajectory in real-tim
 Author: Generated for NASA Trick Project
 """
 
-import socket
 import sys
-import matplotlib
-matplotlib.use('TkAgg')  # Use TkAgg backend for better integration
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from mpl_toolkits.mplot3d import Axes3D
-import numpy as np
-from collections import deque
 import time
-import csv
-from datetime import datetime
-import os
+STARTUP_START = time.perf_counter()  # Start of the --startup-times report
+
+# matplotlib is imported by setup_plot(), once the window is on screen
+import numpy as np
+
+from trajectory_history import COLUMNS, POSITION
+from trajectory_export import EXPORT_LABELS
+from perf_stats import StartupTimer
+from vehicle_track import combined_extent
+from display_controller import (DisplayController, STATUS_COLORS, parse_display_args,
+                                start_display)
+
 
 # Python 2/3 compatibility
 try:
@@ -31,159 +31,48 @@ except ImportError:
     from tkinter import ttk
 
 
-class TrickVariableClient:
-    """
-    Client to connect to Trick Variable Server and retrieve simulation data.
+# Trajectory color of each vehicle, in the order given (repeats after ten)
+VEHICLE_COLORS = ['b', 'g', 'm', 'c', 'y', 'k', 'tab:orange', 'tab:brown', 'tab:pink', 'tab:gray']
+
+# Text of every state panel label (position, velocity, acceleration, time,
+# speed), formatted in one call; see show_state
+STATE_FORMAT = "\n".join(["X: {:.4e}", "Y: {:.4e}", "Z: {:.4e}"] * 3 +
+                         ["UTC Sec: {:.4f}", "Speed: {:.4e} m/s"])
+
+
+def make_canvas(figure, master, perf):
     """
-    def __init__(self, host="localhost", port=7108):
-        """
-        Initialize connection to Trick Variable Server.
-        
-        Args:
-            host (str): Hostname or IP address of the Trick simulation
-            port (int): Port number for the variable server (default: 7108)
-        """
-        self.host = host
-        self.port = port
-        self.client_socket = None
-        self.src = None
-        self.connected = False
-        self.no_data = False
-        
-        # Data storage
-        self.position = [0.0, 0.0, 0.0]  # [X, Y, Z] in meters (ECI frame)
-        self.velocity = [0.0, 0.0, 0.0]  # [X, Y, Z] in m/s (ECI frame)
-        self.acceleration = [0.0, 0.0, 0.0]  # [X, Y, Z] in m/s^2 (ECI frame)
-        self.utc_seconds = 0.0  # Seconds from epoch
-        
-        # Trick variable names
-        self.trick_vars = [
-            "Sim.Orion_1.Dyn.DVehModel.State.VState[0].R_CG_from_ECI_in_ECI[0]",
-            "Sim.Orion_1.Dyn.DVehModel.State.VState[0].R_CG_from_ECI_in_ECI[1]",
-            "Sim.Orion_1.Dyn.DVehModel.State.VState[0].R_CG_from_ECI_in_ECI[2]",
-            "Sim.Orion_1.Dyn.DVehModel.State.VState[0].V_CG_rel_ECI_in_ECI[0]",
-            "Sim.Orion_1.Dyn.DVehModel.State.VState[0].V_CG_rel_ECI_in_ECI[1]",
-            "Sim.Orion_1.Dyn.DVehModel.State.VState[0].V_CG_rel_ECI_in_ECI[2]",
-            "Sim.Orion_1.Dyn.DVehModel.State.VState[0].A_CG_rel_ECI_in_ECI[0]",
-            "Sim.Orion_1.Dyn.DVehModel.State.VState[0].A_CG_rel_ECI_in_ECI[1]",
-            "Sim.Orion_1.Dyn.DVehModel.State.VState[0].A_CG_rel_ECI_in_ECI[2]",
-            "Sim.Orion_1.NEnv.itsSTimeModel.itsSTimeOutput.TimeData.UTC_Seconds_From_Epoch"
-        ]
-        
-    def connect(self):
-        """Establish connection to Trick Variable Server."""
-        try:
-            print("Connecting to Trick Variable Server at {}:{}...".format(self.host, self.port))
-            self.client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.client_socket.connect((self.host, self.port))
-            self.src = self.client_socket.makefile("r")
-            
-            # Pause variable server and clear any existing variables
-            self.client_socket.send(b"trick.var_pause()\n")
-            self.client_socket.send(b"trick.var_clear()\n")
-            
-            # Add all variables to the server
-            for var in self.trick_vars:
-                cmd = "trick.var_add(\"{}\")\n".format(var)
-                self.client_socket.send(cmd.encode())
-            
-            # Unpause to start receiving data
-            self.client_socket.send(b"trick.var_unpause()\n")
-            
-            self.connected = True
-            print("Successfully connected to Trick Variable Server!")
-            return True
-            
-        except Exception as e:
-            print("Error connecting to Trick Variable Server: {}".format(e))
-            print("Retrying in 1 second...")
-            time.sleep(1)
-            return False
+    Embed a figure in Tk, timing its full redraws as the "draw" stage of perf.
     
-    def update(self):
-        """
-        Update data from Trick Variable Server.
-        
-        Returns:
-            bool: True if data was successfully updated, False otherwise
-        """
-        if not self.connected:
-            return False
-        
-        try:
-            # Read line from variable server
-            trick_server_data = self.src.readline()
-            
-            if trick_server_data == '':
-                self.no_data = True
-                return False
-            else:
-                self.no_data = False
-            
-            # Parse data (tab-separated values)
-            values = trick_server_data.strip().split("\t")
-            
-            if len(values) >= 10:
-                # Extract position (indices 1-3, index 0 is timestamp)
-                self.position[0] = float(values[1])
-                self.position[1] = float(values[2])
-                self.position[2] = float(values[3])
-                
-                # Extract velocity (indices 4-6)
-                self.velocity[0] = float(values[4])
-                self.velocity[1] = float(values[5])
-                self.velocity[2] = float(values[6])
-                
-                # Extract acceleration (indices 7-9)
-                self.acceleration[0] = float(values[7])
-                self.acceleration[1] = float(values[8])
-                self.acceleration[2] = float(values[9])
-                
-                # Extract UTC seconds (index 10)
-                self.utc_seconds = float(values[10])
-                
-                return True
-            else:
-                return False
-                
-        except Exception as e:
-            print("Error reading from Trick Variable Server: {}".format(e))
-            return False
+    matplotlib's Tk backend is imported here, on first use.
     
-    def disconnect(self):
-        """Close connection to Trick Variable Server."""
-        if self.client_socket:
-            try:
-                self.client_socket.send(b"trick.var_pause()\n")
-                self.client_socket.send(b"trick.var_clear()\n")
-                self.client_socket.close()
-                print("Disconnected from Trick Variable Server")
-            except:
-                pass
-        self.connected = False
+    Args:
+        figure (matplotlib.figure.Figure): Figure to show
+        master: Tk widget to put the canvas in
+        perf (PerfMonitor): Monitor receiving the draw times
     
-    def get_position(self):
-        """Get current position vector [X, Y, Z] in meters."""
-        return self.position.copy()
-    
-    def get_velocity(self):
-        """Get current velocity vector [X, Y, Z] in m/s."""
-        return self.velocity.copy()
+    Returns:
+        FigureCanvasTkAgg: The canvas
+    """
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
     
-    def get_acceleration(self):
-        """Get current acceleration vector [X, Y, Z] in m/s^2."""
-        return self.acceleration.copy()
+    class TimedCanvas(FigureCanvasTkAgg):
+        def draw(self):
+            start = perf.start()
+            FigureCanvasTkAgg.draw(self)
+            perf.stop("draw", start)
     
-    def get_time(self):
-        """Get current UTC seconds from epoch."""
-        return self.utc_seconds
+    return TimedCanvas(figure, master=master)
 
 
-class FlightTrajectoryDisplay:
+class FlightTrajectoryDisplay(DisplayController):
     """
     GUI application for displaying flight trajectory in real-time.
     """
-    def __init__(self, root, host="localhost", port=7108, max_points=1000):
+    def __init__(self, root, host="localhost", port=7108, max_points=1000, ingest_mode="thread",
+                 max_samples_per_tick=1000, blit=True, binary=False, vehicles=None,
+                 record="csv", record_dir=".", perf=False, label_rate=10.0, startup=None,
+                 relay=False):
         """
         Initialize the flight trajectory display.
         
@@ -192,27 +81,26 @@ class FlightTrajectoryDisplay:
             host (str): Trick Variable Server host
             port (int): Trick Variable Server port
             max_points (int): Maximum number of trajectory points to display
+            ingest_mode (str): "thread" or "direct" (see DisplayController)
+            max_samples_per_tick (int): Most samples ingested per GUI tick
+            blit (bool): Redraw only the trajectory artists over a cached
+                background, doing a full redraw only when the limits change
+            binary (bool): Ask the variable server for binary messages
+            vehicles (list): Vehicle specs to follow (default: Sim.Orion_1)
+            record (str): "csv", "parquet" or "archive" recordings, or None
+            record_dir (str): Directory for the recordings
+            perf (bool): Show the performance HUD from the start
+            label_rate (float): State panel refreshes per second
+            startup (StartupTimer): Timer marking the startup steps
+            relay (bool): host and port are a TrickRelay (see trick_relay)
         """
-        self.root = root
+        DisplayController.__init__(self, host, port, max_points, ingest_mode,
+                                   max_samples_per_tick, binary, vehicles, record, record_dir,
+                                   perf, label_rate, startup, relay)
+        self.root = self.window = root
         self.root.title("Orion Flight Trajectory Display")
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
         
-        # Trick client
-        self.trick_client = TrickVariableClient(host, port)
-        self.max_points = max_points
-        
-        # Data buffers for trajectory history
-        self.pos_x_history = deque(maxlen=max_points)
-        self.pos_y_history = deque(maxlen=max_points)
-        self.pos_z_history = deque(maxlen=max_points)
-        self.vel_x_history = deque(maxlen=max_points)
-        self.vel_y_history = deque(maxlen=max_points)
-        self.vel_z_history = deque(maxlen=max_points)
-        self.acc_x_history = deque(maxlen=max_points)
-        self.acc_y_history = deque(maxlen=max_points)
-        self.acc_z_history = deque(maxlen=max_points)
-        self.time_history = deque(maxlen=max_points)
-        
         # Current axis pair for plotting
         self.axis_mode = "X-Y"  # Can be "X-Y", "Y-Z", or "X-Z"
         
@@ -225,12 +113,22 @@ class FlightTrajectoryDisplay:
         self.y_limits = None
         self.z_limits = None
         
-        # Setup UI
+        # Blitting state: cached axes background, and whether the limits must be
+        # refit to the data (forcing a full redraw) on the next update
+        self.use_blit = blit
+        self.background = None
+        self.limits_dirty = True
+        # Samples per vehicle drawn as a per-tick tail before the trajectories
+        # are redrawn into the background (blit mode)
+        self.tail_points = 500
+        self.autoscale_headroom = 0.15  # Fraction of the span added around auto-scaled data
+        
+        # Setup UI: the window and controls are shown before the plot, which
+        # imports matplotlib (events queued meanwhile run once the plot exists)
         self.setup_ui()
-        
-        # Try to connect
-        self.is_running = False
-        self.update_id = None
+        self.root.update()
+        self.startup.mark("controls shown")
+        self.setup_plot()
         
     def setup_ui(self):
         """Setup the user interface."""
@@ -248,12 +146,12 @@ class FlightTrajectoryDisplay:
         
         Label(conn_frame, text="Host:").grid(row=0, column=0, sticky=W)
         self.host_entry = Entry(conn_frame, width=15)
-        self.host_entry.insert(0, "localhost")
+        self.host_entry.insert(0, self.tracks[0].client.host)
         self.host_entry.grid(row=0, column=1, padx=5)
         
         Label(conn_frame, text="Port:").grid(row=0, column=2, sticky=W, padx=(10, 0))
         self.port_entry = Entry(conn_frame, width=8)
-        self.port_entry.insert(0, "7108")
+        self.port_entry.insert(0, str(self.tracks[0].client.port))
         self.port_entry.grid(row=0, column=3, padx=5)
         
         self.connect_btn = Button(conn_frame, text="Connect", command=self.connect_to_trick, 
@@ -283,6 +181,13 @@ class FlightTrajectoryDisplay:
         Button(view_frame, text="Clear Trajectory", command=self.clear_trajectory).pack(side=LEFT, padx=10)
         Button(view_frame, text="💾 Save Data", command=self.save_to_csv, 
                bg="dodgerblue", fg="white").pack(side=LEFT, padx=5)
+        self.save_format_var = tk.StringVar(value="CSV")
+        ttk.Combobox(view_frame, textvariable=self.save_format_var, values=list(EXPORT_LABELS),
+                     state="readonly", width=13).pack(side=LEFT, padx=2)
+        self.save_progress = ttk.Progressbar(view_frame, length=60, maximum=100)
+        self.save_progress.pack(side=LEFT, padx=2)
+        Button(view_frame, text="📂 Load Archive", command=self.load_archive).pack(side=LEFT, padx=5)
+        Button(view_frame, text="▶ Replay", command=self.start_replay).pack(side=LEFT, padx=5)
         
         # Zoom and quit controls
         control_btns_frame = Frame(control_frame)
@@ -350,16 +255,40 @@ class FlightTrajectoryDisplay:
         self.points_label.pack(anchor=W, padx=5)
         self.speed_label = Label(stats_frame, text="Speed: 0.0000 m/s", font=("Courier", 9))
         self.speed_label.pack(anchor=W, padx=5)
-        
-        # Plot panel (right side)
+        self.lag_label = Label(stats_frame, text="Lag: 0.000 s", font=("Courier", 9))
+        self.lag_label.pack(anchor=W, padx=5)
+        
+        # Labels filled from STATE_FORMAT, in order
+        self.state_labels = [self.pos_x_label, self.pos_y_label, self.pos_z_label,
+                             self.vel_x_label, self.vel_y_label, self.vel_z_label,
+                             self.acc_x_label, self.acc_y_label, self.acc_z_label,
+                             self.time_label, self.speed_label]
+        
+        # Performance HUD
+        perf_frame = LabelFrame(data_frame, text="Performance", font=("Arial", 10, "bold"))
+        perf_frame.pack(fill=X, padx=10, pady=5)
+        
+        self.hud_var = tk.BooleanVar(value=self.perf.enabled)
+        Checkbutton(perf_frame, text="Show HUD", variable=self.hud_var,
+                    command=self.toggle_hud).pack(anchor=W, padx=5)
+        Button(perf_frame, text="Save Snapshot", command=self.save_perf_snapshot).pack(anchor=W, padx=5)
+        self.hud_label = Label(perf_frame, text="", font=("Courier", 8), justify=LEFT)
+        if self.perf.enabled:
+            self.hud_label.pack(anchor=W, padx=5)
+        
+        # Plot panel (right side), filled by setup_plot()
         self.plot_frame = Frame(main_frame)
         self.plot_frame.pack(side=RIGHT, fill=BOTH, expand=True)
         
+    def setup_plot(self):
+        """Create the matplotlib figure and canvas (importing matplotlib on first use)."""
+        from matplotlib.figure import Figure
+        self.startup.mark("import matplotlib")
+        
         # Create matplotlib figure (start with 2D)
-        self.fig = plt.figure(figsize=(8, 8))
+        self.fig = Figure(figsize=(8, 8))
         self.ax = self.fig.add_subplot(111)
-        self.line, = self.ax.plot([], [], 'b-', linewidth=1, label='Trajectory')
-        self.current_pos, = self.ax.plot([], [], 'ro', markersize=8, label='Current Position')
+        self.create_artists()
         
         self.ax.set_xlabel('X (m)', fontsize=12)
         self.ax.set_ylabel('Y (m)', fontsize=12)
@@ -369,49 +298,38 @@ class FlightTrajectoryDisplay:
         self.ax.set_aspect('equal', adjustable='datalim')
         
         # Embed matplotlib figure in Tkinter
-        self.canvas = FigureCanvasTkAgg(self.fig, master=self.plot_frame)
+        self.canvas = make_canvas(self.fig, self.plot_frame, self.perf)
+        self.canvas.mpl_connect('draw_event', self.on_draw)
         self.canvas.draw()
         self.canvas.get_tk_widget().pack(fill=BOTH, expand=True)
-        
-    def connect_to_trick(self):
-        """Connect to Trick Variable Server."""
-        if not self.trick_client.connected:
-            host = self.host_entry.get()
-            port = int(self.port_entry.get())
-            
-            self.trick_client.host = host
-            self.trick_client.port = port
-            
-            if self.trick_client.connect():
-                self.status_label.config(text="Connected", fg="green")
-                self.connect_btn.config(text="Disconnect", bg="red")
-                self.is_running = True
-                self.update_display()
-            else:
-                self.status_label.config(text="Connection Failed", fg="red")
-        else:
-            self.disconnect_from_trick()
+        self.startup.mark("plot ready")
+        
+    def create_artists(self):
+        """Create the trajectory line, tail and current position marker of every vehicle."""
+        empty = ([], [], []) if self.view_mode == "3D" else ([], [])
+        single = len(self.tracks) == 1
+        for i, track in enumerate(self.tracks):
+            color = VEHICLE_COLORS[i % len(VEHICLE_COLORS)]
+            track.line, = self.ax.plot(*empty, '-', color=color, linewidth=1,
+                                       label='Trajectory' if single else track.name,
+                                       animated=self.use_blit)
+            track.tail, = self.ax.plot(*empty, '-', color=color, linewidth=1,
+                                       label='_nolegend_', animated=self.use_blit)
+            track.marker, = self.ax.plot(*empty, 'o', color='r' if single else color, markersize=8,
+                                         label='Current Position' if single else '_nolegend_',
+                                         animated=self.use_blit)
+            track.settled = 0
     
-    def disconnect_from_trick(self):
-        """Disconnect from Trick Variable Server."""
-        self.is_running = False
-        if self.update_id:
-            self.root.after_cancel(self.update_id)
-        
-        # Auto-save data before disconnecting
-        if len(self.time_history) > 0:
-            filename = self.save_to_csv(auto_save=True)
-            if filename:
-                print("Simulation data automatically saved to: {}".format(filename))
-        
-        self.trick_client.disconnect()
-        self.status_label.config(text="Disconnected", fg="red")
-        self.connect_btn.config(text="Connect", bg="green")
+    def moving_artists(self):
+        """Get the artists redrawn every tick in blit mode (tails, then markers)."""
+        return ([track.tail for track in self.tracks] +
+                [track.marker for track in self.tracks])
     
     def change_axis_mode(self, event=None):
         """Change the axis pair being displayed."""
         self.axis_mode = self.axis_var.get()
         self.update_plot_labels()
+        self.limits_dirty = True
         self.update_plot()
     
     def toggle_3d_view(self):
@@ -435,10 +353,11 @@ class FlightTrajectoryDisplay:
         self.fig.clear()
         
         if self.view_mode == "3D":
-            # Create 3D axes
+            # Create 3D axes (importing mplot3d registers the 3d projection on
+            # matplotlib releases that do not load it themselves)
+            from mpl_toolkits.mplot3d import Axes3D
             self.ax = self.fig.add_subplot(111, projection='3d')
-            self.line, = self.ax.plot([], [], [], 'b-', linewidth=1, label='Trajectory')
-            self.current_pos, = self.ax.plot([], [], [], 'ro', markersize=8, label='Current Position')
+            self.create_artists()
             
             self.ax.set_xlabel('X (m)', fontsize=12)
             self.ax.set_ylabel('Y (m)', fontsize=12)
@@ -449,8 +368,7 @@ class FlightTrajectoryDisplay:
         else:
             # Create 2D axes
             self.ax = self.fig.add_subplot(111)
-            self.line, = self.ax.plot([], [], 'b-', linewidth=1, label='Trajectory')
-            self.current_pos, = self.ax.plot([], [], 'ro', markersize=8, label='Current Position')
+            self.create_artists()
             
             self.update_plot_labels()
             self.ax.grid(True, alpha=0.3)
@@ -462,6 +380,7 @@ class FlightTrajectoryDisplay:
         self.x_limits = None
         self.y_limits = None
         self.z_limits = None
+        self.limits_dirty = True
         
         # Redraw canvas
         self.canvas.draw()
@@ -484,78 +403,21 @@ class FlightTrajectoryDisplay:
             self.ax.set_ylabel('Z (m)', fontsize=12)
             self.ax.set_title('Orion Flight Trajectory (X-Z Plane)', fontsize=14, fontweight='bold')
     
-    def clear_trajectory(self):
-        """Clear trajectory history."""
-        self.pos_x_history.clear()
-        self.pos_y_history.clear()
-        self.pos_z_history.clear()
-        self.vel_x_history.clear()
-        self.vel_y_history.clear()
-        self.vel_z_history.clear()
-        self.acc_x_history.clear()
-        self.acc_y_history.clear()
-        self.acc_z_history.clear()
-        self.time_history.clear()
+    def clear_plot(self):
+        """Redraw after the histories were cleared, refitting the limits to new data."""
+        self.limits_dirty = True
         self.update_plot()
     
-    def save_to_csv(self, auto_save=False):
-        """
-        Save trajectory data to a CSV file.
-        
-        Args:
-            auto_save (bool): If True, automatically saves without user notification
-        """
-        if len(self.time_history) == 0:
-            if not auto_save:
-                print("No data to save!")
-            return None
-        
-        # Generate filename with timestamp
-        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        filename = "orion_trajectory_{}.csv".format(timestamp)
-        
-        try:
-            with open(filename, 'w', newline='') as csvfile:
-                writer = csv.writer(csvfile)
-                
-                # Write header
-                writer.writerow([
-                    'Time (UTC sec)',
-                    'Position X (m)',
-                    'Position Y (m)',
-                    'Position Z (m)',
-                    'Velocity X (m/s)',
-                    'Velocity Y (m/s)',
-                    'Velocity Z (m/s)',
-                    'Acceleration X (m/s²)',
-                    'Acceleration Y (m/s²)',
-                    'Acceleration Z (m/s²)'
-                ])
-                
-                # Write data rows
-                for i in range(len(self.time_history)):
-                    writer.writerow([
-                        self.time_history[i],
-                        self.pos_x_history[i],
-                        self.pos_y_history[i],
-                        self.pos_z_history[i],
-                        self.vel_x_history[i],
-                        self.vel_y_history[i],
-                        self.vel_z_history[i],
-                        self.acc_x_history[i],
-                        self.acc_y_history[i],
-                        self.acc_z_history[i]
-                    ])
-            
-            if not auto_save:
-                print("Data saved to: {}".format(filename))
-                print("Total data points: {}".format(len(self.time_history)))
-            
-            return filename
-            
-        except Exception as e:
-            print("Error saving CSV file: {}".format(e))
-            return None
+    def show_hud(self, shown):
+        """Show or hide the performance HUD label."""
+        if shown:
+            self.hud_label.pack(anchor=W, padx=5)
+        else:
+            self.hud_label.pack_forget()
+    
+    def perf_context(self):
+        """Get the display settings saved with performance snapshots."""
+        return {"display": "matplotlib", "blit": self.use_blit, "view_mode": self.view_mode}
     
     def zoom_in(self):
         """Zoom in on the plot by 50%."""
@@ -573,61 +435,52 @@ class FlightTrajectoryDisplay:
         self.x_limits = None
         self.y_limits = None
         self.z_limits = None
+        self.limits_dirty = True
         self.update_plot()
     
     def apply_zoom(self):
         """Apply current zoom level to the plot."""
-        if len(self.pos_x_history) == 0:
+        extent = combined_extent(self.tracks)
+        if extent is None:
             return
         
+        # Running position extents kept by the histories (no scan)
+        data_min, data_max = extent
+        center = (data_max + data_min) / 2
+        span = (data_max - data_min) / self.zoom_level
+        
         if self.view_mode == "3D":
             # 3D zoom
-            x_data = list(self.pos_x_history)
-            y_data = list(self.pos_y_history)
-            z_data = list(self.pos_z_history)
-            
-            # Calculate center and range
-            x_center = (max(x_data) + min(x_data)) / 2
-            y_center = (max(y_data) + min(y_data)) / 2
-            z_center = (max(z_data) + min(z_data)) / 2
-            
-            x_range = (max(x_data) - min(x_data)) / self.zoom_level
-            y_range = (max(y_data) - min(y_data)) / self.zoom_level
-            z_range = (max(z_data) - min(z_data)) / self.zoom_level
+            x_col = self.history.tracked.index("pos_x")
+            y_col = self.history.tracked.index("pos_y")
+            z_col = self.history.tracked.index("pos_z")
             
             # Set new limits
-            self.x_limits = [x_center - x_range/2, x_center + x_range/2]
-            self.y_limits = [y_center - y_range/2, y_center + y_range/2]
-            self.z_limits = [z_center - z_range/2, z_center + z_range/2]
+            self.x_limits = [center[x_col] - span[x_col]/2, center[x_col] + span[x_col]/2]
+            self.y_limits = [center[y_col] - span[y_col]/2, center[y_col] + span[y_col]/2]
+            self.z_limits = [center[z_col] - span[z_col]/2, center[z_col] + span[z_col]/2]
             
             # Apply limits
             self.ax.set_xlim(self.x_limits)
             self.ax.set_ylim(self.y_limits)
             self.ax.set_zlim(self.z_limits)
         else:
-            # 2D zoom - Get data based on current axis mode
+            # 2D zoom - Get columns based on current axis mode
             if self.axis_mode == "X-Y":
-                x_data = list(self.pos_x_history)
-                y_data = list(self.pos_y_history)
+                x_col = self.history.tracked.index("pos_x")
+                y_col = self.history.tracked.index("pos_y")
             elif self.axis_mode == "Y-Z":
-                x_data = list(self.pos_y_history)
-                y_data = list(self.pos_z_history)
+                x_col = self.history.tracked.index("pos_y")
+                y_col = self.history.tracked.index("pos_z")
             elif self.axis_mode == "X-Z":
-                x_data = list(self.pos_x_history)
-                y_data = list(self.pos_z_history)
+                x_col = self.history.tracked.index("pos_x")
+                y_col = self.history.tracked.index("pos_z")
             else:
                 return
             
-            # Calculate center and range
-            x_center = (max(x_data) + min(x_data)) / 2
-            y_center = (max(y_data) + min(y_data)) / 2
-            
-            x_range = (max(x_data) - min(x_data)) / self.zoom_level
-            y_range = (max(y_data) - min(y_data)) / self.zoom_level
-            
             # Set new limits
-            self.x_limits = [x_center - x_range/2, x_center + x_range/2]
-            self.y_limits = [y_center - y_range/2, y_center + y_range/2]
+            self.x_limits = [center[x_col] - span[x_col]/2, center[x_col] + span[x_col]/2]
+            self.y_limits = [center[y_col] - span[y_col]/2, center[y_col] + span[y_col]/2]
             
             # Apply limits
             self.ax.set_xlim(self.x_limits)
@@ -639,152 +492,218 @@ class FlightTrajectoryDisplay:
         """Quit the application cleanly."""
         self.on_closing()
     
-    def update_display(self):
-        """Main update loop for display."""
-        if not self.is_running:
-            return
+    def show_state(self, pos, vel, acc, t):
+        """
+        Show a vehicle state in the data panel.
         
-        # Get data from Trick
-        if self.trick_client.update():
-            # Get current state
-            pos = self.trick_client.get_position()
-            vel = self.trick_client.get_velocity()
-            acc = self.trick_client.get_acceleration()
-            t = self.trick_client.get_time()
-            
-            # Store history
-            self.pos_x_history.append(pos[0])
-            self.pos_y_history.append(pos[1])
-            self.pos_z_history.append(pos[2])
-            self.vel_x_history.append(vel[0])
-            self.vel_y_history.append(vel[1])
-            self.vel_z_history.append(vel[2])
-            self.acc_x_history.append(acc[0])
-            self.acc_y_history.append(acc[1])
-            self.acc_z_history.append(acc[2])
-            self.time_history.append(t)
-            
-            # Update text displays
-            self.pos_x_label.config(text="X: {:.4e}".format(pos[0]))
-            self.pos_y_label.config(text="Y: {:.4e}".format(pos[1]))
-            self.pos_z_label.config(text="Z: {:.4e}".format(pos[2]))
-            
-            self.vel_x_label.config(text="X: {:.4e}".format(vel[0]))
-            self.vel_y_label.config(text="Y: {:.4e}".format(vel[1]))
-            self.vel_z_label.config(text="Z: {:.4e}".format(vel[2]))
-            
-            self.acc_x_label.config(text="X: {:.4e}".format(acc[0]))
-            self.acc_y_label.config(text="Y: {:.4e}".format(acc[1]))
-            self.acc_z_label.config(text="Z: {:.4e}".format(acc[2]))
-            
-            self.time_label.config(text="UTC Sec: {:.4f}".format(t))
-            
-            # Calculate speed
-            speed = np.sqrt(vel[0]**2 + vel[1]**2 + vel[2]**2)
-            self.speed_label.config(text="Speed: {:.4e} m/s".format(speed))
-            
-            # Update statistics
-            self.points_label.config(text="Points: {}".format(len(self.pos_x_history)))
-            
-            # Update plot
-            self.update_plot()
+        Every label's text comes from one STATE_FORMAT call, and only the
+        labels whose text changed are reconfigured.
         
-        # Schedule next update (50 Hz update rate)
-        self.update_id = self.root.after(20, self.update_display)
+        Args:
+            pos: Position (x, y, z)
+            vel: Velocity (x, y, z)
+            acc: Acceleration (x, y, z)
+            t (float): UTC seconds
+        """
+        values = np.concatenate([pos, vel, acc, [t, np.linalg.norm(vel)]])
+        self.set_texts(self.state_labels, STATE_FORMAT.format(*values.tolist()).split("\n"))
     
-    def update_plot(self):
-        """Update the trajectory plot."""
-        if len(self.pos_x_history) == 0:
+    def on_draw(self, event):
+        """Cache the static background after every full redraw (blit mode)."""
+        # Match the decimation to the current plot width; a changed resolution
+        # is picked up by the next full redraw
+        for track in self.tracks:
+            if track.decimator.set_resolution(self.ax.bbox.width):
+                track.settled = 0
+        
+        if not self.use_blit:
             return
+        # The settled trajectories are part of the cached background
+        for track in self.tracks:
+            self.ax.draw_artist(track.line)
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        for artist in self.moving_artists():
+            self.ax.draw_artist(artist)
+    
+    def redraw(self, full=False):
+        """
+        Push the current artist data to the screen.
         
+        Args:
+            full (bool): Redraw axes, ticks, grid and legend too (limits changed)
+        """
+        if not self.use_blit:
+            self.canvas.draw_idle()
+        elif full or self.background is None:
+            # on_draw re-caches the background and draws the artists on top
+            self.canvas.draw()
+        else:
+            start = self.perf.start()
+            self.canvas.restore_region(self.background)
+            for artist in self.moving_artists():
+                self.ax.draw_artist(artist)
+            self.canvas.blit(self.ax.bbox)
+            self.perf.stop("draw", start)
+    
+    def data_outside_limits(self, columns):
+        """
+        Check whether any vehicle's history extends past the current axis limits.
+        
+        Args:
+            columns (list): Position column indices plotted on x, y (and z)
+        
+        Returns:
+            bool: True if any data lies outside the visible limits
+        """
+        data_min, data_max = combined_extent(self.tracks)
+        limits = [self.ax.get_xlim(), self.ax.get_ylim()]
+        if len(columns) == 3:
+            limits.append(self.ax.get_zlim())
+        
+        for col, (low, high) in zip(columns, limits):
+            i = col - POSITION.start
+            if data_min[i] < min(low, high) or data_max[i] > max(low, high):
+                return True
+        return False
+    
+    def plot_columns(self):
+        """
+        Get the position columns plotted on each axis.
+        
+        Returns:
+            list: History column indices for x, y (and z in 3D)
+        """
         if self.view_mode == "3D":
-            # 3D plotting
-            x_data = list(self.pos_x_history)
-            y_data = list(self.pos_y_history)
-            z_data = list(self.pos_z_history)
-            
-            # Update line data
-            self.line.set_data(x_data, y_data)
-            self.line.set_3d_properties(z_data)
-            
-            # Update current position marker
-            if len(x_data) > 0:
-                self.current_pos.set_data([x_data[-1]], [y_data[-1]])
-                self.current_pos.set_3d_properties([z_data[-1]])
-            
-            # Apply zoom limits if set, otherwise auto-scale
-            if self.x_limits is not None and self.y_limits is not None and self.z_limits is not None:
-                self.ax.set_xlim(self.x_limits)
-                self.ax.set_ylim(self.y_limits)
-                self.ax.set_zlim(self.z_limits)
-            else:
-                # Auto-scale axes
-                self.ax.set_xlim([min(x_data), max(x_data)])
-                self.ax.set_ylim([min(y_data), max(y_data)])
-                self.ax.set_zlim([min(z_data), max(z_data)])
+            return [COLUMNS.index("pos_x"), COLUMNS.index("pos_y"), COLUMNS.index("pos_z")]
+        if self.axis_mode == "X-Y":
+            return [COLUMNS.index("pos_x"), COLUMNS.index("pos_y")]
+        if self.axis_mode == "Y-Z":
+            return [COLUMNS.index("pos_y"), COLUMNS.index("pos_z")]
+        if self.axis_mode == "X-Z":
+            return [COLUMNS.index("pos_x"), COLUMNS.index("pos_z")]
+        return None
+    
+    def update_artists(self, track, columns, full):
+        """
+        Set a vehicle's line, tail and marker data from its history.
+        
+        In blit mode the line is drawn into the cached background by a full
+        redraw, and only the tail (samples since then) and the marker are
+        drawn every tick, so the per-tick cost does not grow with the
+        trajectory length.
+        
+        Args:
+            track (VehicleTrack): Vehicle to update
+            columns (list): Position columns plotted (see plot_columns)
+            full (bool): A full redraw follows, so move the tail into the line
+        """
+        artists = (track.line, track.tail, track.marker)
+        if len(track.history) == 0:
+            for artist in artists:
+                artist.set_data([], [])
+                if self.view_mode == "3D":
+                    artist.set_3d_properties([])
+            track.settled = 0
+            return
+        
+        columns = [col - POSITION.start for col in columns]
+        if full:
+            # Decimated positions: bounded by the plot width, newest samples at full resolution
+            points = track.decimator.update(track.history)
+            tail = points[-1:]
+            track.settled = track.history.total
         else:
-            # 2D plotting - Get data based on current axis mode
-            if self.axis_mode == "X-Y":
-                x_data = list(self.pos_x_history)
-                y_data = list(self.pos_y_history)
-            elif self.axis_mode == "Y-Z":
-                x_data = list(self.pos_y_history)
-                y_data = list(self.pos_z_history)
-            elif self.axis_mode == "X-Z":
-                x_data = list(self.pos_x_history)
-                y_data = list(self.pos_z_history)
-            else:
-                return
-            
-            # Update line data
-            self.line.set_data(x_data, y_data)
-            
-            # Update current position marker
-            if len(x_data) > 0:
-                self.current_pos.set_data([x_data[-1]], [y_data[-1]])
-            
-            # Apply zoom limits if set, otherwise auto-scale
-            if self.x_limits is not None and self.y_limits is not None:
-                self.ax.set_xlim(self.x_limits)
-                self.ax.set_ylim(self.y_limits)
+            # Samples since the last full redraw, joined to the end of the line
+            new = track.history.total - track.settled
+            points = None
+            tail = track.history.positions()[-min(new + 1, len(track.history)):]
+        
+        data = [(points, track.line), (tail, track.tail), (tail[-1:], track.marker)]
+        for values, artist in data:
+            if values is None:
+                continue
+            artist.set_data(values[:, columns[0]], values[:, columns[1]])
+            if self.view_mode == "3D":
+                artist.set_3d_properties(values[:, columns[2]])
+    
+    def update_plot(self, tracks=None):
+        """
+        Update the trajectory plot.
+        
+        Args:
+            tracks (list): Vehicles whose data changed (default: all of them);
+                every vehicle is drawn in the same redraw either way
+        """
+        columns = self.plot_columns()
+        if columns is None:
+            return
+        
+        extent = combined_extent(self.tracks)
+        
+        # Zoom limits are applied by apply_zoom(); auto-scale only when the
+        # data leaves the current limits
+        refit = (extent is not None and self.x_limits is None and
+                 (self.limits_dirty or self.data_outside_limits(columns)))
+        
+        # Full redraw when the limits move, or to move long tails into the background
+        full = (refit or self.limits_dirty or not self.use_blit or self.background is None or
+                any(not 0 <= track.history.total - track.settled <= self.tail_points
+                    for track in self.tracks))
+        
+        for track in (self.tracks if tracks is None or full else tracks):
+            self.update_artists(track, columns, full)
+            track.changed = False
+        
+        if refit:
+            # Headroom around the data, so the limits (and the full redraw a
+            # change costs) move only once the data leaves the padded box
+            if self.view_mode == "3D":
+                data_min, data_max = extent
+                pad = (data_max - data_min) * self.autoscale_headroom
+                pad[pad == 0] = 1.0
+                self.ax.set_xlim([data_min[0] - pad[0], data_max[0] + pad[0]])
+                self.ax.set_ylim([data_min[1] - pad[1], data_max[1] + pad[1]])
+                self.ax.set_zlim([data_min[2] - pad[2], data_max[2] + pad[2]])
             else:
-                # Auto-scale axes
+                # As margins, which autoscaling combines with the equal aspect
+                self.ax.margins(self.autoscale_headroom)
                 self.ax.relim()
                 self.ax.autoscale_view()
         
-        # Redraw
-        self.canvas.draw_idle()
+        # Redraw (full redraw only if the limits moved or the tails are long)
+        self.redraw(full=full)
+        if extent is not None:
+            self.limits_dirty = False
     
-    def on_closing(self):
-        """Handle window closing event."""
-        self.disconnect_from_trick()
+    def close_window(self):
+        """Close the window (see DisplayController.on_closing)."""
         self.root.destroy()
 
 
 def main():
     """Main entry point."""
-    # Parse command line arguments
-    host = "localhost"
-    port = 7108
+    startup = StartupTimer(STARTUP_START)
+    startup.mark("imports")
     
-    if len(sys.argv) > 1:
-        host = sys.argv[1]
-    if len(sys.argv) > 2:
-        port = int(sys.argv[2])
+    # Parse command line arguments (see display_controller.parse_display_args)
+    settings, session = parse_display_args(sys.argv[1:], max_points=1000)
     
     print("="*60)
     print("Orion Flight Trajectory Display")
     print("="*60)
-    print("Default connection: {}:{}".format(host, port))
+    print("Default connection: {}:{}{}".format(settings["host"], settings["port"],
+                                              " (relay)" if settings["relay"] else ""))
     print("You can change the host/port in the GUI before connecting.")
     print("="*60)
     
     # Create main window
     root = tk.Tk()
     root.geometry("1400x800")
+    startup.mark("Tk root")
     
-    # Create application
-    app = FlightTrajectoryDisplay(root, host=host, port=port, max_points=1000)
+    # Create application, then load the archive or start the replay given
+    app = FlightTrajectoryDisplay(root, startup=startup, **settings)
+    start_display(app, session)
     
     # Start Tkinter main loop
     root.mainloop()
@@ -792,4 +711,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
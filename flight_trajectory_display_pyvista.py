@@ -6,14 +6,19 @@ Connects to Trick Variable Server and plots Orion vehicle trajectory in real-tim
 Author: Generated for NASA Trick Project
 """
 
-import socket
 import sys
-import numpy as np
-from collections import deque
 import time
-import csv
-from datetime import datetime
-import os
+STARTUP_START = time.perf_counter()  # Start of the --startup-times report
+
+import importlib.util
+import numpy as np
+
+from trajectory_history import TrajectoryHistory, POSITION
+from trajectory_export import EXPORT_LABELS
+from perf_stats import StartupTimer
+from vehicle_track import combined_extent
+from display_controller import DisplayController, parse_display_args, start_display
+
 
 # Python 2/3 compatibility
 try:
@@ -25,170 +30,132 @@ except ImportError:
     from tkinter import *
     from tkinter import ttk
 
-try:
-    import pyvista as pv
-    from pyvistaqt import BackgroundPlotter
-    PYVISTA_AVAILABLE = True
-except ImportError:
-    PYVISTA_AVAILABLE = False
-    print("ERROR: PyVista not installed!")
-    print("Please install with: pip install pyvista pyvistaqt")
-    sys.exit(1)
+# PyVista is imported by load_pyvista(), once the control panel is on screen
+pv = None
+# Only needed for the interactive window (benchmarks pass an off-screen plotter)
+BackgroundPlotter = None
+
+
+def load_pyvista():
+    """
+    Import PyVista, and pyvistaqt if installed, on first use.
+    
+    Raises:
+        ImportError: PyVista is not installed
+    """
+    global pv, BackgroundPlotter
+    if pv is not None:
+        return
+    import pyvista
+    pv = pyvista
+    try:
+        from pyvistaqt import BackgroundPlotter
+    except ImportError:
+        BackgroundPlotter = None
 
 
-class TrickVariableClient:
+# Trajectory color of each vehicle, in the order given (repeats after ten)
+VEHICLE_COLORS = ['cyan', 'lime', 'magenta', 'yellow', 'orange', 'white', 'deepskyblue',
+                  'violet', 'gold', 'salmon']
+
+# Text of every state panel label (position, velocity, speed), formatted in
+# one call; see show_state
+STATE_FORMAT = "\n".join(["X: {:.4e}", "Y: {:.4e}", "Z: {:.4e}"] * 2 + ["Speed: {:.4e} m/s"])
+
+
+class TrajectoryPolyline:
     """
-    Client to connect to Trick Variable Server and retrieve simulation data.
+    Persistent VTK polyline fed incrementally from a TrajectoryHistory.
+    
+    Positions are copied into a ring of their own whose storage array is
+    handed to VTK once, without copying. Each sync writes only the samples
+    appended since the last sync and points the single polyline cell at a
+    slice of a precomputed id range, so the per-frame cost depends on the
+    number of new samples rather than the history length.
     """
-    def __init__(self, host="localhost", port=7108):
+    def __init__(self, capacity):
         """
-        Initialize connection to Trick Variable Server.
+        Initialize the polyline.
         
         Args:
-            host (str): Hostname or IP address of the Trick simulation
-            port (int): Port number for the variable server (default: 7108)
+            capacity (int): Maximum number of points (match the history capacity)
         """
-        self.host = host
-        self.port = port
-        self.client_socket = None
-        self.src = None
-        self.connected = False
-        self.no_data = False
-        
-        # Data storage
-        self.position = [0.0, 0.0, 0.0]  # [X, Y, Z] in meters (ECI frame)
-        self.velocity = [0.0, 0.0, 0.0]  # [X, Y, Z] in m/s (ECI frame)
-        self.acceleration = [0.0, 0.0, 0.0]  # [X, Y, Z] in m/s^2 (ECI frame)
-        self.utc_seconds = 0.0  # Seconds from epoch
-        
-        # Trick variable names
-        self.trick_vars = [
-            "Sim.Orion_1.Dyn.DVehModel.State.VState[0].R_CG_from_ECI_in_ECI[0]",
-            "Sim.Orion_1.Dyn.DVehModel.State.VState[0].R_CG_from_ECI_in_ECI[1]",
-            "Sim.Orion_1.Dyn.DVehModel.State.VState[0].R_CG_from_ECI_in_ECI[2]",
-            "Sim.Orion_1.Dyn.DVehModel.State.VState[0].V_CG_rel_ECI_in_ECI[0]",
-            "Sim.Orion_1.Dyn.DVehModel.State.VState[0].V_CG_rel_ECI_in_ECI[1]",
-            "Sim.Orion_1.Dyn.DVehModel.State.VState[0].V_CG_rel_ECI_in_ECI[2]",
-            "Sim.Orion_1.Dyn.DVehModel.State.VState[0].A_CG_rel_ECI_in_ECI[0]",
-            "Sim.Orion_1.Dyn.DVehModel.State.VState[0].A_CG_rel_ECI_in_ECI[1]",
-            "Sim.Orion_1.Dyn.DVehModel.State.VState[0].A_CG_rel_ECI_in_ECI[2]",
-            "Sim.Orion_1.NEnv.itsSTimeModel.itsSTimeOutput.TimeData.UTC_Seconds_From_Epoch"
-        ]
-        
-    def connect(self):
-        """Establish connection to Trick Variable Server."""
-        try:
-            print("Connecting to Trick Variable Server at {}:{}...".format(self.host, self.port))
-            self.client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.client_socket.connect((self.host, self.port))
-            self.src = self.client_socket.makefile("r")
-            
-            # Pause variable server and clear any existing variables
-            self.client_socket.send(b"trick.var_pause()\n")
-            self.client_socket.send(b"trick.var_clear()\n")
-            
-            # Add all variables to the server
-            for var in self.trick_vars:
-                cmd = "trick.var_add(\"{}\")\n".format(var)
-                self.client_socket.send(cmd.encode())
-            
-            # Unpause to start receiving data
-            self.client_socket.send(b"trick.var_unpause()\n")
-            
-            self.connected = True
-            print("Successfully connected to Trick Variable Server!")
-            return True
-            
-        except Exception as e:
-            print("Error connecting to Trick Variable Server: {}".format(e))
-            print("Retrying in 1 second...")
-            time.sleep(1)
-            return False
+        self.ring = TrajectoryHistory(capacity, columns=("pos_x", "pos_y", "pos_z"), tracked=())
+        self.synced_total = 0
+        self.decimated = False  # Ring holds replace() output, not a history tail
+        
+        # Point ids 0..2*capacity-1; the visible line is always one slice of this
+        self.point_ids = np.arange(2 * capacity, dtype=pv.ID_TYPE)
+        self.offsets = np.zeros(2, dtype=pv.ID_TYPE)
+        
+        self.mesh = pv.PolyData()
+        self.mesh.points = self.ring.data  # shared with VTK, not copied
+        self.update_cells()
     
-    def update(self):
+    def update_cells(self):
+        """Point the polyline cell at the slots currently holding samples."""
+        start, end = self.ring.slots()
+        self.offsets[1] = end - start
+        offsets = self.offsets if end > start else self.offsets[:1]  # no cell when empty
+        self.connectivity = self.point_ids[start:end]  # keep a reference for VTK
+        self.mesh.SetLines(pv.CellArray.from_arrays(offsets, self.connectivity, deep=False))
+    
+    def reset(self):
+        """Remove all points."""
+        self.ring.clear()
+        self.synced_total = 0
+        self.decimated = False
+        self.update_cells()
+    
+    def replace(self, points):
+        """
+        Replace every point of the polyline (used for decimated trajectories).
+        
+        Args:
+            points (np.ndarray): (N, 3) positions, at most the polyline capacity
+        """
+        self.ring.clear()
+        self.ring.extend(points)
+        self.synced_total = 0
+        self.decimated = True
+        
+        self.mesh.GetPoints().Modified()
+        self.update_cells()
+    
+    def sync(self, history):
         """
-        Update data from Trick Variable Server.
+        Append the positions added to history since the last sync.
+        
+        Args:
+            history (TrajectoryHistory): Source trajectory history
         
         Returns:
-            bool: True if data was successfully updated, False otherwise
+            bool: True if the polyline changed
         """
-        if not self.connected:
-            return False
+        if history.total < self.synced_total or self.decimated:
+            # History was cleared, or the ring holds decimated points
+            self.reset()
         
-        try:
-            # Read line from variable server
-            trick_server_data = self.src.readline()
-            
-            if trick_server_data == '':
-                self.no_data = True
-                return False
-            else:
-                self.no_data = False
-            
-            # Parse data (tab-separated values)
-            values = trick_server_data.strip().split("\t")
-            
-            if len(values) >= 10:
-                # Extract position (indices 1-3, index 0 is timestamp)
-                self.position[0] = float(values[1])
-                self.position[1] = float(values[2])
-                self.position[2] = float(values[3])
-                
-                # Extract velocity (indices 4-6)
-                self.velocity[0] = float(values[4])
-                self.velocity[1] = float(values[5])
-                self.velocity[2] = float(values[6])
-                
-                # Extract acceleration (indices 7-9)
-                self.acceleration[0] = float(values[7])
-                self.acceleration[1] = float(values[8])
-                self.acceleration[2] = float(values[9])
-                
-                # Extract UTC seconds (index 10)
-                self.utc_seconds = float(values[10])
-                
-                return True
-            else:
-                return False
-                
-        except Exception as e:
-            print("Error reading from Trick Variable Server: {}".format(e))
+        new = min(history.total - self.synced_total, len(history))
+        if new <= 0:
             return False
-    
-    def disconnect(self):
-        """Close connection to Trick Variable Server."""
-        if self.client_socket:
-            try:
-                self.client_socket.send(b"trick.var_pause()\n")
-                self.client_socket.send(b"trick.var_clear()\n")
-                self.client_socket.close()
-                print("Disconnected from Trick Variable Server")
-            except:
-                pass
-        self.connected = False
-    
-    def get_position(self):
-        """Get current position vector [X, Y, Z] in meters."""
-        return self.position.copy()
-    
-    def get_velocity(self):
-        """Get current velocity vector [X, Y, Z] in m/s."""
-        return self.velocity.copy()
-    
-    def get_acceleration(self):
-        """Get current acceleration vector [X, Y, Z] in m/s^2."""
-        return self.acceleration.copy()
-    
-    def get_time(self):
-        """Get current UTC seconds from epoch."""
-        return self.utc_seconds
+        
+        self.ring.extend(history.positions()[-new:])
+        self.synced_total = history.total
+        
+        self.mesh.GetPoints().Modified()
+        self.update_cells()
+        return True
 
 
-class FlightTrajectoryDisplay:
+class FlightTrajectoryDisplay(DisplayController):
     """
     GUI application for displaying flight trajectory in real-time using PyVista.
     """
-    def __init__(self, host="localhost", port=7108, max_points=10000):
+    def __init__(self, host="localhost", port=7108, max_points=10000, ingest_mode="thread",
+                 max_samples_per_tick=1000, binary=False, vehicles=None, record="csv",
+                 record_dir=".", plotter=None, perf=False, label_rate=10.0, startup=None,
+                 relay=False):
         """
         Initialize the flight trajectory display.
         
@@ -196,45 +163,64 @@ class FlightTrajectoryDisplay:
             host (str): Trick Variable Server host
             port (int): Trick Variable Server port
             max_points (int): Maximum number of trajectory points to display
+            ingest_mode (str): "thread" or "direct" (see DisplayController)
+            max_samples_per_tick (int): Most samples ingested per GUI tick
+            binary (bool): Ask the variable server for binary messages
+            vehicles (list): Vehicle specs to follow (default: Sim.Orion_1)
+            record (str): "csv", "parquet" or "archive" recordings, or None
+            record_dir (str): Directory for the recordings
+            plotter: PyVista plotter to draw into (default: a BackgroundPlotter
+                window; benchmarks pass pv.Plotter(off_screen=True))
+            perf (bool): Show the performance HUD from the start
+            label_rate (float): State panel refreshes per second
+            startup (StartupTimer): Timer marking the startup steps
+            relay (bool): host and port are a TrickRelay (see trick_relay)
         """
-        # Trick client
-        self.trick_client = TrickVariableClient(host, port)
-        self.max_points = max_points
-        
-        # Data buffers for trajectory history
-        self.pos_x_history = deque(maxlen=max_points)
-        self.pos_y_history = deque(maxlen=max_points)
-        self.pos_z_history = deque(maxlen=max_points)
-        self.vel_x_history = deque(maxlen=max_points)
-        self.vel_y_history = deque(maxlen=max_points)
-        self.vel_z_history = deque(maxlen=max_points)
-        self.acc_x_history = deque(maxlen=max_points)
-        self.acc_y_history = deque(maxlen=max_points)
-        self.acc_z_history = deque(maxlen=max_points)
-        self.time_history = deque(maxlen=max_points)
+        DisplayController.__init__(self, host, port, max_points, ingest_mode,
+                                   max_samples_per_tick, binary, vehicles, record, record_dir,
+                                   perf, label_rate, startup, relay)
         
         # View mode (2D or 3D)
         self.view_mode = "3D"  # Start with 3D for PyVista
         
-        # Setup PyVista plotter
-        self.plotter = BackgroundPlotter(title="Orion Flight Trajectory (PyVista 3D)")
-        self.plotter.set_background('black')
+        # Optional spline smoothing, refit at most once per spline_interval seconds
+        self.spline_interval = 1.0
+        self.last_spline_time = 0.0
         
-        # Add coordinate axes
-        self.plotter.add_axes()
+        # Setup control window (Tkinter), shown before PyVista is imported
+        self.setup_control_window()
+        self.window = self.control_window
+        self.control_window.update()
+        self.startup.mark("controls shown")
+        self.setup_plotter(plotter)
         
-        # Initialize empty trajectory line
-        self.trajectory_actor = None
-        self.current_pos_actor = None
+    def setup_plotter(self, plotter=None):
+        """
+        Create the PyVista plotter and trajectory meshes (importing PyVista on first use).
         
-        # State
-        self.is_running = False
+        Args:
+            plotter: PyVista plotter to draw into (default: a BackgroundPlotter window)
+        """
+        load_pyvista()
+        self.startup.mark("import pyvista")
+        if plotter is None:
+            if BackgroundPlotter is None:
+                raise ImportError("The PyVista window needs pyvistaqt (pip install pyvistaqt)")
+            plotter = BackgroundPlotter(title="Orion Flight Trajectory (PyVista 3D)")
+        self.plotter = plotter
+        self.plotter.set_background('black')
         
-        # Setup control window (Tkinter)
-        self.setup_control_window()
+        # Add coordinate axes
+        self.plotter.add_axes()
         
-        # Start update timer
-        self.update_timer = None
+        # Persistent trajectory line, spline and marker per vehicle; the actors
+        # are built once by setup_scene() and rendered together once per tick
+        for track in self.tracks:
+            track.polyline = TrajectoryPolyline(self.max_points)
+            track.spline_mesh = None
+            track.spline_actor = None
+        self.scene_ready = False
+        self.startup.mark("plot ready")
         
     def setup_control_window(self):
         """Setup the Tkinter control panel."""
@@ -252,12 +238,12 @@ class FlightTrajectoryDisplay:
         
         Label(conn_frame, text="Host:").grid(row=0, column=0, sticky=W)
         self.host_entry = Entry(conn_frame, width=20)
-        self.host_entry.insert(0, "localhost")
+        self.host_entry.insert(0, self.tracks[0].client.host)
         self.host_entry.grid(row=0, column=1, padx=5)
         
         Label(conn_frame, text="Port:").grid(row=1, column=0, sticky=W)
         self.port_entry = Entry(conn_frame, width=20)
-        self.port_entry.insert(0, "7108")
+        self.port_entry.insert(0, str(self.tracks[0].client.port))
         self.port_entry.grid(row=1, column=1, padx=5)
         
         self.connect_btn = Button(conn_frame, text="Connect", command=self.connect_to_trick,
@@ -296,216 +282,196 @@ class FlightTrajectoryDisplay:
         self.points_label = Label(data_frame, text="Points: 0", font=("Courier", 9))
         self.points_label.grid(row=7, column=0, columnspan=2, sticky=W)
         
+        self.lag_label = Label(data_frame, text="Lag: 0.000 s", font=("Courier", 9))
+        self.lag_label.grid(row=8, column=0, columnspan=2, sticky=W)
+        
+        # Labels filled from STATE_FORMAT, in order
+        self.state_labels = [self.pos_x_label, self.pos_y_label, self.pos_z_label,
+                             self.vel_x_label, self.vel_y_label, self.vel_z_label,
+                             self.speed_label]
+        
         # Control buttons
         btn_frame = Frame(main_frame)
         btn_frame.pack(fill=X, pady=10)
         
+        self.spline_var = tk.BooleanVar(value=False)
+        Checkbutton(data_frame, text="Smooth trajectory (spline, throttled)",
+                    variable=self.spline_var).grid(row=9, column=0, columnspan=2, sticky=W, pady=(10,0))
+        
         Button(btn_frame, text="Clear Trajectory", command=self.clear_trajectory,
                bg="orange", fg="white", width=15).pack(side=LEFT, padx=5)
         Button(btn_frame, text="💾 Save Data", command=self.save_to_csv,
                bg="dodgerblue", fg="white", width=15).pack(side=LEFT, padx=5)
+        
+        # Save format and progress
+        save_frame = Frame(main_frame)
+        save_frame.pack(fill=X)
+        Label(save_frame, text="Save as:").pack(side=LEFT)
+        self.save_format_var = tk.StringVar(value="CSV")
+        ttk.Combobox(save_frame, textvariable=self.save_format_var, values=list(EXPORT_LABELS),
+                     state="readonly", width=13).pack(side=LEFT, padx=5)
+        self.save_progress = ttk.Progressbar(save_frame, length=120, maximum=100)
+        self.save_progress.pack(side=LEFT, padx=5)
+        Button(btn_frame, text="📂 Load Archive", command=self.load_archive,
+               width=15).pack(side=LEFT, padx=5)
+        Button(btn_frame, text="▶ Replay", command=self.start_replay,
+               width=15).pack(side=LEFT, padx=5)
         Button(btn_frame, text="Quit", command=self.on_closing,
                bg="darkred", fg="white", width=15).pack(side=LEFT, padx=5)
         
-    def connect_to_trick(self):
-        """Connect to Trick Variable Server."""
-        if not self.trick_client.connected:
-            host = self.host_entry.get()
-            port = int(self.port_entry.get())
-            
-            self.trick_client.host = host
-            self.trick_client.port = port
-            
-            if self.trick_client.connect():
-                self.status_label.config(text="Connected", fg="green")
-                self.connect_btn.config(text="Disconnect", bg="red")
-                self.is_running = True
-                self.start_update_loop()
-            else:
-                self.status_label.config(text="Connection Failed", fg="red")
-        else:
-            self.disconnect_from_trick()
+        # Performance HUD
+        perf_frame = LabelFrame(main_frame, text="Performance", font=("Arial", 11, "bold"), padx=10, pady=10)
+        perf_frame.pack(fill=X, pady=10)
+        
+        self.hud_var = tk.BooleanVar(value=self.perf.enabled)
+        Checkbutton(perf_frame, text="Show HUD", variable=self.hud_var,
+                    command=self.toggle_hud).grid(row=0, column=0, sticky=W)
+        Button(perf_frame, text="Save Snapshot",
+               command=self.save_perf_snapshot).grid(row=0, column=1, sticky=W, padx=10)
+        self.hud_label = Label(perf_frame, text="", font=("Courier", 9), justify=LEFT)
+        self.hud_label.grid(row=1, column=0, columnspan=2, sticky=W)
+        if not self.perf.enabled:
+            self.hud_label.grid_remove()
+        
+    def start_updates(self):
+        """Build the scene (once), then start the update loop."""
+        self.setup_scene()
+        DisplayController.start_updates(self)
+    
+    def clear_plot(self):
+        """Empty the persistent lines after the histories were cleared."""
+        for track in self.tracks:
+            # Empty the persistent line in place and hide the marker
+            track.polyline.reset()
+            if self.scene_ready:
+                track.spline_actor.SetVisibility(False)
+                track.marker.SetVisibility(False)
+        if self.scene_ready:
+            self.plotter.render()
     
-    def disconnect_from_trick(self):
-        """Disconnect from Trick Variable Server."""
-        self.is_running = False
-        if self.update_timer:
-            self.control_window.after_cancel(self.update_timer)
-        
-        # Auto-save data before disconnecting
-        if len(self.time_history) > 0:
-            filename = self.save_to_csv(auto_save=True)
-            if filename:
-                print("Simulation data automatically saved to: {}".format(filename))
-        
-        self.trick_client.disconnect()
-        self.status_label.config(text="Disconnected", fg="red")
-        self.connect_btn.config(text="Connect", bg="green")
+    def show_hud(self, shown):
+        """Show or hide the performance HUD label."""
+        if shown:
+            self.hud_label.grid()
+        else:
+            self.hud_label.grid_remove()
     
-    def clear_trajectory(self):
-        """Clear trajectory history."""
-        self.pos_x_history.clear()
-        self.pos_y_history.clear()
-        self.pos_z_history.clear()
-        self.vel_x_history.clear()
-        self.vel_y_history.clear()
-        self.vel_z_history.clear()
-        self.acc_x_history.clear()
-        self.acc_y_history.clear()
-        self.acc_z_history.clear()
-        self.time_history.clear()
-        
-        # Clear PyVista actors
-        if self.trajectory_actor:
-            self.plotter.remove_actor(self.trajectory_actor)
-            self.trajectory_actor = None
-        if self.current_pos_actor:
-            self.plotter.remove_actor(self.current_pos_actor)
-            self.current_pos_actor = None
+    def perf_context(self):
+        """Get the display settings saved with performance snapshots."""
+        return {"display": "pyvista", "smooth": self.spline_var.get(),
+                "window_size": list(self.plotter.window_size)}
     
-    def save_to_csv(self, auto_save=False):
+    def show_state(self, pos, vel, acc, t):
         """
-        Save trajectory data to a CSV file.
+        Show a vehicle state in the data panel (acceleration and time are not shown).
+        
+        Every label's text comes from one STATE_FORMAT call, and only the
+        labels whose text changed are reconfigured.
         
         Args:
-            auto_save (bool): If True, automatically saves without user notification
+            pos: Position (x, y, z)
+            vel: Velocity (x, y, z)
+            acc: Acceleration (x, y, z)
+            t (float): UTC seconds
         """
-        if len(self.time_history) == 0:
-            if not auto_save:
-                print("No data to save!")
-            return None
-        
-        # Generate filename with timestamp
-        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        filename = "orion_trajectory_{}.csv".format(timestamp)
-        
-        try:
-            with open(filename, 'w', newline='') as csvfile:
-                writer = csv.writer(csvfile)
-                
-                # Write header
-                writer.writerow([
-                    'Time (UTC sec)',
-                    'Position X (m)',
-                    'Position Y (m)',
-                    'Position Z (m)',
-                    'Velocity X (m/s)',
-                    'Velocity Y (m/s)',
-                    'Velocity Z (m/s)',
-                    'Acceleration X (m/s²)',
-                    'Acceleration Y (m/s²)',
-                    'Acceleration Z (m/s²)'
-                ])
-                
-                # Write data rows
-                for i in range(len(self.time_history)):
-                    writer.writerow([
-                        self.time_history[i],
-                        self.pos_x_history[i],
-                        self.pos_y_history[i],
-                        self.pos_z_history[i],
-                        self.vel_x_history[i],
-                        self.vel_y_history[i],
-                        self.vel_z_history[i],
-                        self.acc_x_history[i],
-                        self.acc_y_history[i],
-                        self.acc_z_history[i]
-                    ])
-            
-            if not auto_save:
-                print("Data saved to: {}".format(filename))
-                print("Total data points: {}".format(len(self.time_history)))
-            
-            return filename
-            
-        except Exception as e:
-            print("Error saving CSV file: {}".format(e))
-            return None
-    
-    def start_update_loop(self):
-        """Start the update loop."""
-        self.update_display()
+        values = np.concatenate([pos, vel, [np.linalg.norm(vel)]])
+        self.set_texts(self.state_labels, STATE_FORMAT.format(*values.tolist()).split("\n"))
     
-    def update_display(self):
-        """Main update loop for display."""
-        if not self.is_running:
+    def setup_scene(self):
+        """Create the persistent trajectory, spline and marker actors of every vehicle (once)."""
+        if self.scene_ready:
             return
         
-        # Get data from Trick
-        if self.trick_client.update():
-            # Get current state
-            pos = self.trick_client.get_position()
-            vel = self.trick_client.get_velocity()
-            acc = self.trick_client.get_acceleration()
-            t = self.trick_client.get_time()
-            
-            # Store history
-            self.pos_x_history.append(pos[0])
-            self.pos_y_history.append(pos[1])
-            self.pos_z_history.append(pos[2])
-            self.vel_x_history.append(vel[0])
-            self.vel_y_history.append(vel[1])
-            self.vel_z_history.append(vel[2])
-            self.acc_x_history.append(acc[0])
-            self.acc_y_history.append(acc[1])
-            self.acc_z_history.append(acc[2])
-            self.time_history.append(t)
-            
-            # Update text displays
-            self.pos_x_label.config(text="X: {:.4e}".format(pos[0]))
-            self.pos_y_label.config(text="Y: {:.4e}".format(pos[1]))
-            self.pos_z_label.config(text="Z: {:.4e}".format(pos[2]))
-            
-            self.vel_x_label.config(text="X: {:.4e}".format(vel[0]))
-            self.vel_y_label.config(text="Y: {:.4e}".format(vel[1]))
-            self.vel_z_label.config(text="Z: {:.4e}".format(vel[2]))
-            
-            # Calculate speed
-            speed = np.sqrt(vel[0]**2 + vel[1]**2 + vel[2]**2)
-            self.speed_label.config(text="Speed: {:.4e} m/s".format(speed))
+        single = len(self.tracks) == 1
+        for i, track in enumerate(self.tracks):
+            color = VEHICLE_COLORS[i % len(VEHICLE_COLORS)]
+            track.line = self.plotter.add_mesh(track.polyline.mesh, color=color, line_width=3,
+                                               label='Trajectory' if single else track.name)
             
-            # Update statistics
-            self.points_label.config(text="Points: {}".format(len(self.pos_x_history)))
+            # Spline actor starts hidden; its mesh is replaced in place when refit
+            track.spline_mesh = pv.PolyData(np.zeros((2, 3)))
+            track.spline_actor = self.plotter.add_mesh(track.spline_mesh, color=color,
+                                                       line_width=3)
+            track.spline_actor.SetVisibility(False)
             
-            # Update 3D plot
-            self.update_plot()
+            # Unit sphere, moved and scaled per frame instead of rebuilt
+            track.marker = self.plotter.add_mesh(pv.Sphere(radius=1.0),
+                                                 color='red' if single else color,
+                                                 label='Current Position' if single else None)
+            track.marker.SetVisibility(False)
+        self.scene_ready = True
+    
+    def update_spline(self, tracks):
+        """
+        Refit the smoothed trajectories if spline_interval has elapsed.
+        
+        Args:
+            tracks (list): Vehicles to refit
+        """
+        now = time.time()
+        if now - self.last_spline_time < self.spline_interval:
+            return
+        self.last_spline_time = now
         
-        # Schedule next update (50 Hz update rate)
-        self.update_timer = self.control_window.after(20, self.update_display)
+        for track in tracks:
+            if len(track.history) < 2:
+                continue
+            points = track.decimator.update(track.history)
+            track.spline_mesh.copy_from(pv.Spline(points, len(points)))
     
-    def update_plot(self):
-        """Update the 3D trajectory plot."""
-        if len(self.pos_x_history) < 2:
+    def update_plot(self, tracks=None):
+        """
+        Update the 3D trajectory plot.
+        
+        Args:
+            tracks (list): Vehicles whose data changed (default: all of them);
+                every vehicle is shown in the same render either way
+        """
+        extent = combined_extent(self.tracks)
+        if extent is None:
             return
         
-        # Create points array for trajectory
-        points = np.column_stack([
-            list(self.pos_x_history),
-            list(self.pos_y_history),
-            list(self.pos_z_history)
-        ])
-        
-        # Remove old trajectory actor
-        if self.trajectory_actor:
-            self.plotter.remove_actor(self.trajectory_actor)
-        
-        # Create polyline for trajectory
-        trajectory = pv.Spline(points, len(points))
-        self.trajectory_actor = self.plotter.add_mesh(trajectory, color='cyan', 
-                                                      line_width=3, label='Trajectory')
-        
-        # Remove old current position actor
-        if self.current_pos_actor:
-            self.plotter.remove_actor(self.current_pos_actor)
-        
-        # Add current position as a sphere
-        current_point = pv.Sphere(radius=abs(points[-1]).max() * 0.02, center=points[-1])
-        self.current_pos_actor = self.plotter.add_mesh(current_point, color='red', 
-                                                        label='Current Position')
-        
-    def on_closing(self):
-        """Handle window closing event."""
-        self.disconnect_from_trick()
+        if not self.scene_ready:
+            self.setup_scene()
+        
+        # Marker size follows the scene size, the same for every vehicle
+        data_min, data_max = extent
+        scale = max(np.abs(data_min).max(), np.abs(data_max).max()) * 0.02
+        smooth = self.spline_var.get()
+        
+        for track in (self.tracks if tracks is None else tracks):
+            track.changed = False
+            if len(track.history) < 2:
+                continue
+            
+            # Long histories are decimated to the render window width and replace
+            # the (bounded) polyline; short ones append only the new samples
+            track.decimator.set_resolution(self.plotter.window_size[0])
+            if track.decimator.active:
+                track.polyline.replace(track.decimator.update(track.history))
+            else:
+                track.polyline.sync(track.history)
+            
+            # Move the current position marker
+            track.marker.SetPosition(*track.history.latest()[POSITION])
+            track.marker.SetVisibility(True)
+        
+        for track in self.tracks:
+            track.marker.SetScale(scale)
+            # Smoothing is an optional, throttled render mode
+            track.spline_actor.SetVisibility(smooth and len(track.history) >= 2)
+            track.line.SetVisibility(not smooth)
+        if smooth:
+            start = self.perf.start()
+            self.update_spline(self.tracks)
+            self.perf.stop("spline", start)
+        
+        start = self.perf.start()
+        self.plotter.render()
+        self.perf.stop("draw", start)
+        
+    def close_window(self):
+        """Close the plotter and the control panel (see DisplayController.on_closing)."""
         self.plotter.close()
         self.control_window.destroy()
     
@@ -516,28 +482,33 @@ class FlightTrajectoryDisplay:
 
 def main():
     """Main entry point."""
-    # Parse command line arguments
-    host = "localhost"
-    port = 7108
+    startup = StartupTimer(STARTUP_START)
+    startup.mark("imports")
     
-    if len(sys.argv) > 1:
-        host = sys.argv[1]
-    if len(sys.argv) > 2:
-        port = int(sys.argv[2])
+    # Checked without importing, so the control panel still appears first
+    for module in ("pyvista", "pyvistaqt"):
+        if importlib.util.find_spec(module) is None:
+            print("ERROR: {} not installed!".format(module))
+            print("Please install with: pip install pyvista pyvistaqt")
+            sys.exit(1)
+    
+    # Parse command line arguments (see display_controller.parse_display_args)
+    settings, session = parse_display_args(sys.argv[1:], max_points=10000)
     
     print("="*60)
     print("Orion Flight Trajectory Display (PyVista Edition)")
     print("="*60)
     print("GPU-Accelerated 3D Visualization")
-    print("Default connection: {}:{}".format(host, port))
+    print("Default connection: {}:{}{}".format(settings["host"], settings["port"],
+                                              " (relay)" if settings["relay"] else ""))
     print("You can change the host/port in the GUI before connecting.")
     print("="*60)
     
-    # Create and run application
-    app = FlightTrajectoryDisplay(host=host, port=port, max_points=10000)
+    # Create the application, then load the archive or start the replay given
+    app = FlightTrajectoryDisplay(startup=startup, **settings)
+    start_display(app, session)
     app.run()
 
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,509 @@
+#!/usr/bin/env python
+"""
+Mock Trick Variable Server for load and regression testing.
+Accepts the var_add/var_pause/var_unpause/var_clear/var_cycle commands the
+displays send and streams a synthetic Keplerian orbit for every subscribed
+vehicle, in ASCII or var_binary_nonames format, at the requested cycle or a
+forced rate. Jitter, stalls, partial sends and disconnects can be switched on
+to exercise the client's buffering and reconnect paths without a real sim.
+Author: Generated for NASA Trick Project
+"""
+
+import math
+import random
+import re
+import select
+import socket
+import sys
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from trick_parser import binary_dtype, VS_VAR_LIST, TRICK_DOUBLE
+
+MU_EARTH = 3.986004418e14  # m^3/s^2
+VS_VAR_EXISTS = 1  # Message type of a var_exists reply
+DEFAULT_CYCLE = 0.1  # Trick's default var_cycle, seconds
+TICK = 0.01  # Longest wait between sends, seconds
+MAX_BATCH = 50000  # Most rows generated for one send
+
+STATE_VARIABLE = re.compile(r"(R_CG_from_ECI|V_CG_rel_ECI|A_CG_rel_ECI)_in_ECI\[(\d)\]$")
+STATE_OFFSETS = {"R_CG_from_ECI": 1, "V_CG_rel_ECI": 4, "A_CG_rel_ECI": 7}
+COMMAND = re.compile(r"trick\.(\w+)\((.*)\)$")
+
+
+class KeplerOrbit:
+    """
+    Two-body orbit evaluated for many times at once.
+    """
+    def __init__(self, semi_major_axis=6.778e6, eccentricity=0.001, inclination=51.6,
+                 raan=0.0, arg_periapsis=0.0, mean_anomaly=0.0):
+        """
+        Initialize the orbit from its elements (angles in degrees).
+
+        Args:
+            semi_major_axis (float): Semi-major axis in meters
+            eccentricity (float): Eccentricity, 0 <= e < 1
+            inclination (float): Inclination
+            raan (float): Right ascension of the ascending node
+            arg_periapsis (float): Argument of periapsis
+            mean_anomaly (float): Mean anomaly at t = 0
+        """
+        self.a = semi_major_axis
+        self.e = eccentricity
+        self.mean_motion = math.sqrt(MU_EARTH / self.a ** 3)
+        self.mean_anomaly = math.radians(mean_anomaly)
+
+        # Perifocal to ECI rotation
+        i, o, w = (math.radians(inclination), math.radians(raan), math.radians(arg_periapsis))
+        co, so, ci, si, cw, sw = (math.cos(o), math.sin(o), math.cos(i), math.sin(i),
+                                  math.cos(w), math.sin(w))
+        self.rotation = np.array([[co * cw - so * sw * ci, -co * sw - so * cw * ci],
+                                  [so * cw + co * sw * ci, -so * sw + co * cw * ci],
+                                  [sw * si, cw * si]])
+
+    def state(self, t):
+        """
+        Get the state at times t.
+
+        Args:
+            t (np.ndarray): (N,) seconds since the orbit's epoch
+
+        Returns:
+            np.ndarray: (N, 9) position, velocity and acceleration in ECI
+        """
+        mean = self.mean_anomaly + self.mean_motion * t
+        anomaly = mean.copy()
+        for _ in range(6):
+            # Newton's method on Kepler's equation E - e sin E = M
+            anomaly -= (anomaly - self.e * np.sin(anomaly) - mean) / (1 - self.e * np.cos(anomaly))
+        cos_e, sin_e = np.cos(anomaly), np.sin(anomaly)
+        root = math.sqrt(1 - self.e ** 2)
+
+        perifocal_r = np.stack([self.a * (cos_e - self.e), self.a * root * sin_e])
+        radius = self.a * (1 - self.e * cos_e)
+        speed = math.sqrt(MU_EARTH * self.a) / radius
+        perifocal_v = np.stack([-speed * sin_e, speed * root * cos_e])
+
+        out = np.empty((len(t), 9))
+        out[:, 0:3] = (self.rotation @ perifocal_r).T
+        out[:, 3:6] = (self.rotation @ perifocal_v).T
+        out[:, 6:9] = -MU_EARTH * out[:, 0:3] / radius[:, None] ** 3
+        return out
+
+
+def vehicle_orbit(vehicle):
+    """
+    Get the synthetic orbit of a vehicle; each prefix gets its own phase and plane.
+
+    Args:
+        vehicle (str): Vehicle prefix, e.g. "Sim.Orion_2"
+
+    Returns:
+        KeplerOrbit: The vehicle's orbit
+    """
+    seed = zlib.crc32(vehicle.encode("utf-8"))
+    return KeplerOrbit(mean_anomaly=seed % 360, raan=(seed >> 9) % 40)
+
+
+def ascii_messages(values):
+    """
+    Format rows as ASCII variable server messages.
+
+    Args:
+        values (np.ndarray): (N, variables) values in var_add order
+
+    Returns:
+        bytes: One tab-separated, newline-terminated line per row
+    """
+    row_format = "{}\t".format(VS_VAR_LIST) + "\t".join(["%r"] * values.shape[1])
+    return ("\n".join([row_format % tuple(row) for row in values.tolist()]) + "\n").encode("ascii")
+
+
+def binary_messages(values):
+    """
+    Pack rows as var_binary_nonames messages of doubles (little-endian).
+
+    Args:
+        values (np.ndarray): (N, variables) values in var_add order
+
+    Returns:
+        bytes: One message per row
+    """
+    dtype = binary_dtype(values.shape[1])
+    messages = np.zeros(len(values), dtype)
+    messages["indicator"] = VS_VAR_LIST
+    messages["size"] = dtype.itemsize - 4
+    messages["nvars"] = values.shape[1]
+    messages["vars"]["type"] = TRICK_DOUBLE
+    messages["vars"]["size"] = 8
+    messages["vars"]["value"] = values
+    return messages.tobytes()
+
+
+class MockSession:
+    """
+    One client connection: its subscription, settings and send loop.
+    """
+    def __init__(self, server, sock, address):
+        """
+        Initialize a paused session with no variables.
+
+        Args:
+            server (MockTrickServer): Server settings and counters
+            sock (socket.socket): Accepted connection
+            address (tuple): Client (host, port)
+        """
+        self.server = server
+        self.sock = sock
+        self.address = address
+        self.variables = []
+        self.columns = []  # (vehicle or None, state column or None) per variable
+        self.paused = True
+        self.binary = False
+        self.cycle = DEFAULT_CYCLE
+        self.next_time = None  # Wall-clock time of the next row
+        self.rx_buffer = b""
+        self.rows_sent = 0
+        self.connected_time = time.time()
+        self.closed = False
+
+    def run(self):
+        """Handle commands and send rows until the client leaves or the server stops."""
+        server = self.server
+        next_stall = self.connected_time + server.stall_every if server.stall_every else None
+        next_send = time.time()
+        try:
+            while not server.stop_event.is_set():
+                now = time.time()
+                if server.disconnect_every and now - self.connected_time >= server.disconnect_every:
+                    server.log("Dropping {} (disconnect test)".format(self.address))
+                    return
+                if next_stall is not None and now >= next_stall:
+                    server.log("Stalling {} for {:.1f} s".format(self.address, server.stall_time))
+                    server.stop_event.wait(server.stall_time)
+                    next_stall = time.time() + server.stall_every
+
+                readable = select.select([self.sock], [], [], max(0.0, next_send - time.time()))[0]
+                if readable:
+                    data = self.sock.recv(65536)
+                    if not data:
+                        return
+                    if not self.handle(data):
+                        return
+                    continue
+
+                self.send_due(time.time())
+                period = min(self.row_period(), TICK)
+                jitter = server.jitter * period
+                next_send = time.time() + period + (random.uniform(-jitter, jitter) if jitter else 0.0)
+        except OSError as e:
+            server.log("Connection {} closed: {}".format(self.address, e))
+        finally:
+            self.closed = True
+            self.sock.close()
+
+    def row_period(self):
+        """Get the seconds between rows (the forced rate, or the client's var_cycle)."""
+        if self.server.rate:
+            return 1.0 / self.server.rate
+        return max(self.cycle, 1e-6)
+
+    def handle(self, data):
+        """
+        Run the complete command lines received.
+
+        Args:
+            data (bytes): Bytes received
+
+        Returns:
+            bool: False if the client asked to exit
+        """
+        lines = (self.rx_buffer + data).split(b"\n")
+        self.rx_buffer = lines.pop()
+        for line in lines:
+            # Combined subscriptions put several statements on one line
+            for statement in line.decode("utf-8", "replace").split(";"):
+                statement = statement.strip()
+                if statement and not self.command(statement):
+                    return False
+        return True
+
+    def command(self, statement):
+        """
+        Run one variable server command.
+
+        Args:
+            statement (str): e.g. 'trick.var_add("Sim.Orion_1.Dyn...")'
+
+        Returns:
+            bool: False if the client asked to exit
+        """
+        match = COMMAND.match(statement)
+        if not match:
+            self.server.log("Ignoring {!r}".format(statement))
+            return True
+        name, argument = match.group(1), match.group(2).strip().strip("\"'")
+
+        if name == "var_add":
+            self.variables.append(argument)
+            self.columns.append(self.column_of(argument))
+        elif name == "var_clear":
+            self.variables = []
+            self.columns = []
+        elif name == "var_pause":
+            self.paused = True
+        elif name == "var_unpause":
+            self.paused = False
+            self.next_time = time.time()
+        elif name == "var_cycle":
+            try:
+                self.cycle = float(argument)
+            except ValueError:
+                self.server.log("Ignoring {!r}".format(statement))
+        elif name == "var_binary_nonames":
+            self.binary = True
+        elif name == "var_ascii":
+            self.binary = False
+        elif name == "var_send":
+            self.send_rows(np.array([time.time()]))
+        elif name == "var_exists":
+            self.sock.sendall("{}\t1\n".format(VS_VAR_EXISTS).encode("ascii"))
+        elif name == "var_exit":
+            return False
+        elif name not in ("var_sync", "var_set_copy_mode", "var_set_write_mode",
+                          "var_set_frame_multiple", "var_debug"):
+            self.server.log("Ignoring unknown command {}".format(name))
+        return True
+
+    @staticmethod
+    def column_of(variable):
+        """
+        Work out what a variable name refers to.
+
+        Args:
+            variable (str): Trick variable name
+
+        Returns:
+            tuple: (vehicle prefix, column 0-9 of the orbit state with 0 the
+                time) or (None, None) for a variable the mock does not model
+        """
+        if variable.endswith("UTC_Seconds_From_Epoch"):
+            return None, 0
+        match = STATE_VARIABLE.search(variable)
+        if not match:
+            return None, None
+        vehicle = variable.split(".Dyn.", 1)[0]
+        return vehicle, STATE_OFFSETS[match.group(1)] + int(match.group(2))
+
+    def send_due(self, now):
+        """Send every row whose time has come since the last send."""
+        if self.paused or not self.variables or self.next_time is None or now < self.next_time:
+            return
+        period = self.row_period()
+        count = min(int((now - self.next_time) / period) + 1, MAX_BATCH)
+        times = self.next_time + np.arange(count) * period
+        self.next_time += count * period
+        self.send_rows(times)
+
+    def send_rows(self, times):
+        """
+        Send one row per time.
+
+        Args:
+            times (np.ndarray): (N,) wall-clock times of the rows
+        """
+        if not self.variables:
+            return
+        values = self.values(times)
+        payload = binary_messages(values) if self.binary else ascii_messages(values)
+
+        if self.server.partial and len(payload) > 1:
+            # Split the send so rows arrive cut in two
+            cut = random.randint(1, len(payload) - 1)
+            self.sock.sendall(payload[:cut])
+            time.sleep(0.001)
+            payload = payload[cut:]
+        self.sock.sendall(payload)
+        self.rows_sent += len(values)
+        self.server.count(len(values))
+
+    def values(self, times):
+        """
+        Get the subscribed variables' values at the given times.
+
+        Args:
+            times (np.ndarray): (N,) wall-clock times
+
+        Returns:
+            np.ndarray: (N, variables) values in var_add order
+        """
+        sim_times = times - self.server.start_time
+        states = {}
+        values = np.empty((len(times), len(self.variables)))
+        for i, (vehicle, column) in enumerate(self.columns):
+            if column == 0:
+                values[:, i] = times
+            elif column is None:
+                # Unmodelled variable: a slow sine, distinct per index
+                values[:, i] = np.sin(sim_times * 0.1 + i)
+            else:
+                if vehicle not in states:
+                    states[vehicle] = self.server.orbit(vehicle).state(sim_times)
+                values[:, i] = states[vehicle][:, column - 1]
+        return values
+
+
+class MockTrickServer:
+    """
+    Accepts variable server connections and serves each from its own thread.
+    """
+    def __init__(self, host="127.0.0.1", port=7108, rate=None, jitter=0.0, stall_every=None,
+                 stall_time=1.0, partial=False, disconnect_every=None, verbose=True):
+        """
+        Initialize the server (call start() to listen).
+
+        Args:
+            host (str): Address to listen on
+            port (int): Port to listen on, 0 for any free port (see self.port)
+            rate (float): Rows per second for every client, overriding var_cycle
+            jitter (float): Random fraction (+/-) applied to the time between sends
+            stall_every (float): Stop sending for stall_time every this many seconds
+            stall_time (float): Length of each stall in seconds
+            partial (bool): Split every send at a random byte
+            disconnect_every (float): Drop each connection after this many seconds
+            verbose (bool): Print connections, faults and ignored commands
+        """
+        self.host = host
+        self.port = port
+        self.rate = rate
+        self.jitter = jitter
+        self.stall_every = stall_every
+        self.stall_time = stall_time
+        self.partial = partial
+        self.disconnect_every = disconnect_every
+        self.verbose = verbose
+
+        self.start_time = time.time()
+        self.orbits = {}
+        self.sessions = []
+        self.rows_sent = 0
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.listener = None
+        self.thread = None
+
+    def log(self, message):
+        """Print a message unless quiet."""
+        if self.verbose:
+            print(message)
+
+    def orbit(self, vehicle):
+        """Get (and cache) a vehicle's orbit."""
+        with self.lock:
+            if vehicle not in self.orbits:
+                self.orbits[vehicle] = vehicle_orbit(vehicle)
+            return self.orbits[vehicle]
+
+    def count(self, rows):
+        """Add to the total of rows sent."""
+        with self.lock:
+            self.rows_sent += rows
+
+    def start(self):
+        """Listen and accept connections on a background thread."""
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind((self.host, self.port))
+        self.listener.listen(16)
+        self.listener.settimeout(0.2)
+        self.port = self.listener.getsockname()[1]
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._accept, name="MockTrickServer")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        """Stop accepting and close every connection."""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(1.0)
+        if self.listener is not None:
+            self.listener.close()
+
+    def _accept(self):
+        """Accept thread: start a session thread per connection."""
+        while not self.stop_event.is_set():
+            try:
+                sock, address = self.listener.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            session = MockSession(self, sock, address)
+            self.sessions = [s for s in self.sessions if not s.closed] + [session]
+            self.log("Client connected from {}:{}".format(*address))
+            thread = threading.Thread(target=session.run, name="MockTrickSession")
+            thread.daemon = True
+            thread.start()
+
+
+def main():
+    """Main entry point."""
+    host = "127.0.0.1"
+    port = 7108
+    options = {}
+    args = sys.argv[1:]
+
+    def option(flag, convert):
+        if flag in args:
+            i = args.index(flag)
+            value = convert(args[i + 1])
+            del args[i:i + 2]
+            return value
+        return None
+
+    # --rate HZ, --jitter FRACTION, --stall EVERY:SECONDS, --disconnect SECONDS,
+    # --partial, --host ADDRESS, --quiet
+    options["rate"] = option("--rate", float)
+    options["jitter"] = option("--jitter", float) or 0.0
+    stall = option("--stall", str)
+    if stall:
+        every, _, seconds = stall.partition(":")
+        options["stall_every"] = float(every)
+        options["stall_time"] = float(seconds or 1.0)
+    options["disconnect_every"] = option("--disconnect", float)
+    host = option("--host", str) or host
+    options["partial"] = "--partial" in args
+    options["verbose"] = "--quiet" not in args
+    args = [arg for arg in args if arg not in ("--partial", "--quiet")]
+    if len(args) > 0:
+        port = int(args[0])
+
+    server = MockTrickServer(host, port, **options)
+    server.start()
+    print("=" * 60)
+    print("Mock Trick Variable Server on {}:{}".format(host, server.port))
+    print("Rate: {}".format("{:g} rows/s".format(server.rate) if server.rate else "client var_cycle"))
+    print("=" * 60)
+
+    try:
+        last_rows, last_time = 0, time.time()
+        while True:
+            time.sleep(5.0)
+            now = time.time()
+            rows = server.rows_sent
+            live = sum(1 for session in server.sessions if not session.closed)
+            print("{} client(s), {:.0f} rows/s sent".format(live, (rows - last_rows) / (now - last_time)))
+            last_rows, last_time = rows, now
+    except KeyboardInterrupt:
+        print("\nStopping mock server.")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
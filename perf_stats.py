@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+"""
+Opt-in timing of the display's hot paths and startup.
+Each stage keeps a rolling window of its recent durations (perf_counter, so
+monotonic) from which the HUD and JSON snapshots take percentiles; event
+rates such as frames and samples per second are counted over the last few
+seconds. While disabled, start() returns None and stop() does nothing, so
+the instrumentation costs one attribute check per stage.
+StartupTimer reports how long each step of a display's startup took.
+Author: Generated for NASA Trick Project
+"""
+
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+# HUD order of the display stages; other stages are listed after these
+STAGE_ORDER = ("tick", "ingest", "parse", "append", "labels", "update_plot", "draw")
+
+
+class StageStats:
+    """Rolling window of one stage's durations."""
+
+    def __init__(self, window=1000):
+        """
+        Initialize an empty window.
+
+        Args:
+            window (int): Most recent durations kept
+        """
+        self.values = np.zeros(window)
+        self.count = 0  # Durations recorded in total
+
+    def add(self, seconds):
+        """Record one duration."""
+        self.values[self.count % len(self.values)] = seconds
+        self.count += 1
+
+    def summary(self):
+        """
+        Summarize the window.
+
+        Returns:
+            dict: count (total) and mean/p50/p99/max over the window, in ms
+        """
+        recent = self.values[:min(self.count, len(self.values))] * 1000.0
+        if not len(recent):
+            return {"count": 0}
+        p50, p99 = np.percentile(recent, [50, 99])
+        return {"count": self.count, "mean_ms": float(recent.mean()), "p50_ms": float(p50),
+                "p99_ms": float(p99), "max_ms": float(recent.max())}
+
+
+class EventRate:
+    """Events per second over the last period seconds."""
+
+    def __init__(self, period=2.0):
+        self.period = period
+        self.events = deque()  # (time, count)
+        self.total = 0
+
+    def add(self, count=1, now=None):
+        """Record count events."""
+        now = time.perf_counter() if now is None else now
+        self.events.append((now, count))
+        self.total += count
+        while self.events and now - self.events[0][0] > self.period:
+            self.events.popleft()
+
+    def rate(self):
+        """Get the recent rate in events per second."""
+        now = time.perf_counter()
+        while self.events and now - self.events[0][0] > self.period:
+            self.events.popleft()
+        if not self.events:
+            return 0.0
+        span = max(now - self.events[0][0], 1e-3)
+        return sum(count for _, count in self.events) / span
+
+
+class PerfMonitor:
+    """
+    Stage timings, event rates and gauges for one display.
+
+    Usage on a hot path:
+        start = perf.start()
+        ...
+        perf.stop("append", start)
+    """
+    def __init__(self, enabled=False, window=1000, rate_period=2.0):
+        """
+        Initialize the monitor.
+
+        Args:
+            enabled (bool): Record from the start
+            window (int): Durations kept per stage
+            rate_period (float): Seconds over which rates are averaged
+        """
+        self.enabled = enabled
+        self.window = window
+        self.rate_period = rate_period
+        self.stages = {}  # name -> StageStats
+        self.rates = {}  # name -> EventRate
+        self.gauges = {}  # name -> last value set
+
+    def start(self):
+        """Get a start time, or None while disabled."""
+        return time.perf_counter() if self.enabled else None
+
+    def stop(self, stage, start):
+        """
+        Record the time since start for a stage.
+
+        Args:
+            stage (str): Stage name
+            start (float): Value returned by start(); None records nothing
+        """
+        if start is None:
+            return
+        self.add(stage, time.perf_counter() - start)
+
+    def add(self, stage, seconds):
+        """Record a duration for a stage."""
+        stats = self.stages.get(stage)
+        if stats is None:
+            stats = self.stages[stage] = StageStats(self.window)
+        stats.add(seconds)
+
+    def event(self, name, count=1):
+        """Count events (e.g. "frames", "samples") while enabled."""
+        if not self.enabled:
+            return
+        rate = self.rates.get(name)
+        if rate is None:
+            rate = self.rates[name] = EventRate(self.rate_period)
+        rate.add(count)
+
+    def set(self, name, value):
+        """Set a gauge (e.g. "queue", "dropped")."""
+        self.gauges[name] = value
+
+    def reset(self):
+        """Forget everything recorded."""
+        self.stages = {}
+        self.rates = {}
+        self.gauges = {}
+
+    def stage_names(self):
+        """Get the recorded stages in HUD order."""
+        known = [name for name in STAGE_ORDER if name in self.stages]
+        return known + sorted(name for name in self.stages if name not in STAGE_ORDER)
+
+    def snapshot(self, **context):
+        """
+        Get everything recorded as plain data.
+
+        Args:
+            **context: Extra fields to include (display settings etc.)
+
+        Returns:
+            dict: Stage summaries, rates per second, gauges and context
+        """
+        return {"time": time.time(),
+                "stages": dict((name, self.stages[name].summary()) for name in self.stage_names()),
+                "rates": dict((name, rate.rate()) for name, rate in self.rates.items()),
+                "totals": dict((name, rate.total) for name, rate in self.rates.items()),
+                "gauges": dict(self.gauges),
+                "context": context}
+
+    def save(self, path, **context):
+        """
+        Write a snapshot as JSON.
+
+        Args:
+            path (str): Output file
+            **context: Extra fields to include
+        """
+        with open(path, "w") as f:
+            json.dump(self.snapshot(**context), f, indent=2)
+
+    def hud_text(self):
+        """
+        Format the HUD.
+
+        Returns:
+            str: Rates and gauges, then p50/p99 per stage
+        """
+        rate = lambda name: self.rates[name].rate() if name in self.rates else 0.0
+        lines = ["FPS {:6.1f}  Samples/s {:8.0f}".format(rate("frames"), rate("samples")),
+                 "Queue {:6d}  Dropped {:10d}".format(int(self.gauges.get("queue", 0)),
+                                                      int(self.gauges.get("dropped", 0))),
+                 "{:<12}{:>8}{:>8}".format("Stage (ms)", "p50", "p99")]
+        for name in self.stage_names():
+            summary = self.stages[name].summary()
+            lines.append("{:<12}{:8.3f}{:8.3f}".format(name, summary["p50_ms"], summary["p99_ms"]))
+        return "\n".join(lines)
+
+
+class StartupTimer:
+    """
+    Times the steps of a program's startup (see the displays' --startup-times).
+
+    Each mark() ends a step; report() lists the steps like python -X importtime,
+    with each step's own time and the time since start.
+    """
+    def __init__(self, start=None):
+        """
+        Initialize the timer.
+
+        Args:
+            start (float): perf_counter() value startup began at (default: now)
+        """
+        self.start = time.perf_counter() if start is None else start
+        self.last = self.start
+        self.steps = []  # (step, seconds, seconds since start)
+
+    def mark(self, step):
+        """End a step, timed from the previous mark."""
+        now = time.perf_counter()
+        self.steps.append((step, now - self.last, now - self.start))
+        self.last = now
+
+    def report(self):
+        """
+        Format the steps.
+
+        Returns:
+            str: One line per step, times in milliseconds
+        """
+        lines = ["startup: {:>9} | {:>10} | step".format("self [ms]", "cumulative")]
+        for step, seconds, total in self.steps:
+            lines.append("startup: {:9.1f} | {:10.1f} | {}".format(seconds * 1000, total * 1000, step))
+        return "\n".join(lines)
@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+"""
+Headless trajectory capture for machines without a display.
+Follows one or more vehicles on Trick Variable Servers and streams every
+sample to recording files (binary archives by default), using the same
+client, reconnecting connection manager and recorder as the displays but
+without importing tkinter, matplotlib or PyVista.
+
+Usage:
+    python record_trajectory.py [host] [port] [--vehicles A,B,...] [--format archive|csv|parquet]
+                                [--dir DIR] [--binary] [--cycle SECONDS] [--duration SECONDS]
+                                [--max-mb MB] [--max-seconds SECONDS] [--quiet]
+
+Stops after --duration seconds, or on Ctrl+C / SIGTERM, closing every file.
+Author: Generated for NASA Trick Project
+"""
+
+import signal
+import sys
+import threading
+import time
+
+from trick_client import TrickVariableClient, TrickConnectionManager, DEFAULT_VEHICLE
+from trajectory_recorder import TrajectoryRecorder
+from vehicle_track import parse_vehicle, safe_file_name
+
+POLL_INTERVAL = 0.05  # Seconds between drains of the reader queues
+QUEUE_SIZE = 1000000  # Samples a reader may queue between drains before dropping
+REPORT_INTERVAL = 5.0  # Seconds between status lines
+
+
+class HeadlessRecorder:
+    """
+    Records the samples of several vehicles without a GUI.
+
+    Each vehicle has a TrickVariableClient whose reader thread parses at the
+    server's rate, a TrickConnectionManager that reconnects with backoff, and
+    a TrajectoryRecorder writing its files; poll() moves the queued samples
+    from the clients to the recorders.
+    """
+    def __init__(self, host="localhost", port=7108, vehicles=None, fmt="archive",
+                 directory=".", binary=False, cycle=None, max_bytes=None, max_seconds=None,
+                 queue_size=QUEUE_SIZE):
+        """
+        Initialize a stopped recorder per vehicle.
+
+        Args:
+            host (str): Trick Variable Server host, unless a vehicle spec names one
+            port (int): Trick Variable Server port, unless a vehicle spec names one
+            vehicles (list): Vehicle specs (see vehicle_track.parse_vehicle;
+                default: Sim.Orion_1)
+            fmt (str): "archive", "csv" or "parquet" (see TrajectoryRecorder)
+            directory (str): Directory for the recordings
+            binary (bool): Ask the variable servers for binary messages
+            cycle (float): var_cycle period to request, or None for the server's
+            max_bytes (int): Start a new file past this size, or None
+            max_seconds (float): Start a new file after this long, or None
+            queue_size (int): Samples each reader may queue between polls
+        """
+        vehicles = vehicles or [DEFAULT_VEHICLE]
+        self.names = list(vehicles)
+        self.clients = []
+        self.connections = []
+        self.recorders = []
+        for spec in vehicles:
+            spec_host, spec_port, vehicle = parse_vehicle(spec)
+            client = TrickVariableClient(spec_host or host, spec_port or port, queue_size,
+                                         binary=binary, vehicle=vehicle)
+            if cycle is not None:
+                client.configure(cycle=cycle)
+            prefix = "orion_trajectory"
+            if len(vehicles) > 1:
+                prefix = "{}_{}".format(prefix, safe_file_name(spec))
+            self.clients.append(client)
+            self.connections.append(TrickConnectionManager(client))
+            self.recorders.append(TrajectoryRecorder(directory, prefix, fmt,
+                                                     max_bytes=max_bytes, max_seconds=max_seconds))
+        self.received = [0] * len(vehicles)  # Samples recorded per vehicle
+
+    def start(self):
+        """Start recording and connecting every vehicle."""
+        for recorder, connection in zip(self.recorders, self.connections):
+            recorder.start()
+            connection.start()
+
+    def stop(self):
+        """Disconnect every vehicle and close the recordings."""
+        for connection in self.connections:
+            connection.stop()
+        # Samples still queued when the readers stopped
+        self.poll()
+        for recorder in self.recorders:
+            recorder.stop()
+
+    def poll(self):
+        """
+        Hand every queued sample to the recorders.
+
+        Returns:
+            int: Samples moved
+        """
+        moved = 0
+        for i, (client, recorder) in enumerate(zip(self.clients, self.recorders)):
+            samples = client.drain()
+            if len(samples):
+                recorder.record(samples)
+                self.received[i] += len(samples)
+                moved += len(samples)
+        return moved
+
+    def status_lines(self, rates):
+        """
+        Describe every vehicle.
+
+        Args:
+            rates (list): Samples per second of each vehicle since the last report
+
+        Returns:
+            list: One line per vehicle
+        """
+        lines = []
+        for name, connection, client, recorder, received, rate in zip(
+                self.names, self.connections, self.clients, self.recorders, self.received, rates):
+            lines.append("{}: {} | {:,} samples ({:,.0f}/s), {:,} written, {:,} dropped".format(
+                name, connection.status_text(), received, rate, recorder.rows_written,
+                client.dropped_samples))
+        return lines
+
+    def run(self, duration=None, stop_event=None, report_interval=REPORT_INTERVAL, quiet=False):
+        """
+        Record until duration elapses or stop_event is set.
+
+        Args:
+            duration (float): Seconds to record, or None for no limit
+            stop_event (threading.Event): Set to stop early (e.g. by a signal)
+            report_interval (float): Seconds between status lines
+            quiet (bool): Do not print status lines
+        """
+        stop_event = stop_event or threading.Event()
+        self.start()
+        start = last_report = time.time()
+        last_received = list(self.received)
+        try:
+            while not stop_event.wait(POLL_INTERVAL):
+                self.poll()
+                now = time.time()
+                if not quiet and now - last_report >= report_interval:
+                    rates = [(received - last) / (now - last_report)
+                             for received, last in zip(self.received, last_received)]
+                    for line in self.status_lines(rates):
+                        print(line)
+                    last_report = now
+                    last_received = list(self.received)
+                if duration is not None and now - start >= duration:
+                    break
+        finally:
+            self.stop()
+
+        elapsed = max(time.time() - start, 1e-6)
+        for name, recorder, received in zip(self.names, self.recorders, self.received):
+            print("{}: recorded {:,} samples in {:.1f} s ({:,.0f}/s) to: {}".format(
+                name, recorder.rows_written, elapsed, received / elapsed,
+                ", ".join(recorder.files) or "(no data)"))
+
+
+def main():
+    """Main entry point."""
+    args = sys.argv[1:]
+
+    def option(flag, default, convert):
+        if flag in args:
+            i = args.index(flag)
+            value = convert(args[i + 1])
+            del args[i:i + 2]
+            return value
+        return default
+
+    def switch(flag):
+        if flag in args:
+            args.remove(flag)
+            return True
+        return False
+
+    binary = switch("--binary")
+    quiet = switch("--quiet")
+    vehicles = option("--vehicles", None, lambda text: text.split(","))
+    fmt = option("--format", "archive", str)
+    directory = option("--dir", ".", str)
+    cycle = option("--cycle", None, float)
+    duration = option("--duration", None, float)
+    max_mb = option("--max-mb", None, float)
+    max_seconds = option("--max-seconds", None, float)
+    host = args[0] if len(args) > 0 else "localhost"
+    port = int(args[1]) if len(args) > 1 else 7108
+
+    try:
+        recorder = HeadlessRecorder(host, port, vehicles, fmt, directory, binary, cycle,
+                                    int(max_mb * 1e6) if max_mb else None, max_seconds)
+    except (ValueError, ImportError) as e:
+        print("ERROR: {}".format(e))
+        sys.exit(1)
+
+    print("=" * 60)
+    print("Orion Trajectory Recorder (headless)")
+    print("=" * 60)
+    print("Server: {}:{}".format(host, port))
+    print("Vehicles: {}".format(", ".join(recorder.names)))
+    print("Format: {} in {}".format(fmt, directory))
+    print("Duration: {}".format("{:g} s".format(duration) if duration else "until stopped"))
+    print("=" * 60)
+
+    # Ctrl+C and SIGTERM stop the loop, so the files are closed cleanly
+    stop_event = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *unused: stop_event.set())
+    recorder.run(duration, stop_event, quiet=quiet)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+"""
+Smoke test of the benchmark suite's headless stages (parse, append, save).
+Author: Generated for NASA Trick Project
+"""
+
+import json
+import sys
+
+import numpy as np
+
+import benchmark
+from trajectory_history import TIME
+
+
+def test_synthetic_rows_continue():
+    """Rows generated from a start index continue the same trajectory."""
+    rows = benchmark.synthetic_rows(20)
+    np.testing.assert_array_equal(benchmark.synthetic_rows(5, 15), rows[15:])
+    np.testing.assert_allclose(np.diff(rows[:, TIME]), 1e-3, atol=1e-6)
+
+
+def test_percentiles():
+    """Per-call times are summarized in milliseconds."""
+    summary = benchmark.percentiles([0.001] * 99 + [0.1])
+    assert summary["calls"] == 100
+    assert summary["p50_ms"] == 1.0
+    assert summary["max_ms"] == 100.0
+
+
+def test_headless_stages_json(tmp_path, monkeypatch, capsys):
+    """A small sweep of the headless stages writes one result per case."""
+    path = tmp_path / "bench.json"
+    monkeypatch.setattr(sys, "argv", ["benchmark.py", "--stages", "parse,append,save",
+                                      "--sizes", "100", "--rates", "1000,5000", "--ticks", "3",
+                                      "--json", str(path)])
+    benchmark.main()
+    output = json.loads(path.read_text())
+    cases = [(result["stage"], result.get("format"), result.get("rate"))
+             for result in output["results"]]
+    assert cases[:4] == [("parse", "ascii", 1000), ("parse", "ascii", 5000),
+                         ("parse", "binary", 1000), ("parse", "binary", 5000)]
+    assert [case[0] for case in cases[4:]] == ["append", "append"] + ["save"] * len(
+        benchmark.EXPORT_FORMATS)
+    for result in output["results"]:
+        assert result["calls"] >= 1
+        assert 0 <= result["p50_ms"] <= result["max_ms"]
+    assert "Results written to" in capsys.readouterr().out
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""
+Tests for the tolerance checks of example.py, Raphael's original display.
+example.py is a Python 2 Tkinter program, so its tolerance functions are
+compiled from the source on their own and run against a fake trick_data.
+Author: Generated for NASA Trick Project
+"""
+
+import os
+import textwrap
+
+import pytest
+
+
+SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "example.py")
+
+
+def load_function(name, namespace):
+    """
+    Compile one function or method of example.py into namespace.
+
+    Args:
+        name (str): Function name
+        namespace (dict): Globals the function runs with
+
+    Returns:
+        function: The compiled function
+    """
+    with open(SOURCE) as f:
+        lines = f.read().split("\n")
+    start = next(i for i, line in enumerate(lines) if line.strip().startswith("def " + name + "("))
+    indent = len(lines[start]) - len(lines[start].lstrip())
+    end = start + 1
+    while end < len(lines) and (not lines[end].strip() or
+                                len(lines[end]) - len(lines[end].lstrip()) > indent):
+        end += 1
+    exec(textwrap.dedent("\n".join(lines[start:end])), namespace)
+    return namespace[name]
+
+
+class FakeWidget:
+    """Tolerance_widget stand-in recording update_data calls."""
+    def __init__(self, data):
+        self.data = data
+        self.updates = []
+
+    def update_data(self, new_data):
+        self.updates.append(new_data)
+
+
+def run_tolerances(tolerances, trick_data):
+    """Run MAIN_DISPLAY.update_tolerance once; return (remaining tolerances, widgets, popups)."""
+    popups = []
+    namespace = {"TOLERANCES": dict(tolerances), "trick_data": trick_data,
+                 "show_popup_message": lambda message, duration_ms: popups.append(message)}
+    load_function("format_trick_value", namespace)
+    update_tolerance = load_function("update_tolerance", namespace)
+
+    display = type("Display", (), {})()
+    display.tolerance_widget_list = [FakeWidget(key) for key in tolerances]
+    update_tolerance(display)
+    return namespace["TOLERANCES"], display.tolerance_widget_list, popups
+
+
+@pytest.mark.parametrize("dim, component", [("X", 0), ("Y", 1), ("Z", 2)])
+def test_vector_tolerance(dim, component):
+    """An armed X/Y/Z tolerance checks that component of the (x, y, z) tuple."""
+    position = [7.0e6, -1.0e6, 2.0e5]
+    trick_data = {"UTC Seconds (s)": 100.0, "Position": tuple(position)}
+    tolerance = [position[component], 10.0, 10.0, dim, "NOW", "Position"]
+
+    # Within the band: still armed
+    remaining, widgets, popups = run_tolerances({"pos": tolerance}, trick_data)
+    assert "pos" in remaining
+    assert widgets[0].updates == []
+    assert popups == []
+
+    # Only the checked component breaches the maximum
+    position[component] += 50.0
+    trick_data["Position"] = tuple(position)
+    remaining, widgets, popups = run_tolerances({"pos": tolerance}, trick_data)
+    assert remaining == {}
+    assert widgets[0].updates == ["YES"]
+    assert str(position[component]) in popups[0]
+
+
+def test_scalar_tolerance_below_minimum():
+    """A scalar tolerance trips when the value falls under expected - min."""
+    trick_data = {"UTC Seconds (s)": 100.0, "Altitude": 399.0}
+    tolerance = [410.0, 5.0, 5.0, "N", "NOW", "Altitude"]
+    remaining, widgets, popups = run_tolerances({"alt": tolerance}, trick_data)
+    assert remaining == {}
+    assert widgets[0].updates == ["YES"]
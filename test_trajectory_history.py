@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""
+Tests for the TrajectoryHistory ring buffer: wraparound and running extents.
+Every check compares the buffer with the plain array of the rows it should
+hold, the last capacity rows appended.
+Author: Generated for NASA Trick Project
+"""
+
+import numpy as np
+import pytest
+
+from trajectory_history import COLUMNS, POSITION, TIME, TrajectoryHistory
+
+
+def trajectory(count, seed=3):
+    """Get count random-walk rows in history order, with increasing times."""
+    rng = np.random.RandomState(seed)
+    rows = rng.normal(0.0, 1000.0, (count, len(COLUMNS))).cumsum(axis=0)
+    rows[:, TIME] = np.arange(count) * 0.1
+    return rows
+
+
+def check(history, rows):
+    """Assert the history holds the last capacity rows and reports their extents."""
+    expected = rows[-history.capacity:]
+    assert len(history) == len(expected)
+    np.testing.assert_array_equal(history.view(), expected)
+    np.testing.assert_array_equal(history.latest(), expected[-1])
+    np.testing.assert_array_equal(history.positions(), expected[:, POSITION])
+    mins, maxs = history.extent()
+    np.testing.assert_array_equal(mins, expected[:, POSITION].min(axis=0))
+    np.testing.assert_array_equal(maxs, expected[:, POSITION].max(axis=0))
+
+
+@pytest.mark.parametrize("batch", [1, 3, 7, 16, 50])
+def test_extend_wraps_around(batch):
+    """Batches of any size wrap around the ring, keeping the newest rows in order."""
+    rows = trajectory(137)
+    history = TrajectoryHistory(16)
+    for start in range(0, len(rows), batch):
+        history.extend(rows[start:start + batch])
+        check(history, rows[:start + batch])
+    assert history.total == len(rows)
+
+
+def test_append_wraps_around():
+    """Single appends wrap the same way as batches."""
+    rows = trajectory(40)
+    history = TrajectoryHistory(7)
+    for i, row in enumerate(rows):
+        history.append(row)
+        check(history, rows[:i + 1])
+
+
+def test_view_is_contiguous_after_wrapping():
+    """The held rows are one slice of the storage, so view() never copies."""
+    history = TrajectoryHistory(10)
+    history.extend(trajectory(25))
+    view = history.view()
+    assert view.base is history.data
+    assert view.flags["C_CONTIGUOUS"]
+    assert history.column("pos_x").base is history.data
+
+
+def test_extend_more_than_capacity():
+    """A batch larger than the ring keeps only its newest rows."""
+    rows = trajectory(100)
+    history = TrajectoryHistory(30)
+    history.extend(rows[:5])
+    history.extend(rows[5:])
+    check(history, rows)
+    assert history.total == 100
+
+
+def test_extent_follows_evicted_extremes():
+    """Extents drop a minimum or maximum once its row is evicted."""
+    history = TrajectoryHistory(3)
+    rows = np.zeros((6, len(COLUMNS)))
+    rows[:, 1] = [5.0, -9.0, 1.0, 2.0, 3.0, 0.5]
+    for i in range(len(rows)):
+        history.extend(rows[i:i + 1])
+        check(history, rows[:i + 1])
+    assert history.extent()[0][0] == 0.5
+    assert history.extent()[1][0] == 3.0
+
+
+def test_discard_and_clear():
+    """discard() drops the oldest rows; clear() empties the history and its extents."""
+    rows = trajectory(20)
+    history = TrajectoryHistory(8)
+    history.extend(rows)
+    history.discard(5)
+    np.testing.assert_array_equal(history.view(), rows[-3:])
+    mins, maxs = history.extent()
+    np.testing.assert_array_equal(mins, rows[-3:, POSITION].min(axis=0))
+    np.testing.assert_array_equal(maxs, rows[-3:, POSITION].max(axis=0))
+
+    history.clear()
+    assert len(history) == 0
+    assert history.latest() is None
+    assert history.extent() is None
+    history.extend(rows[:4])
+    check(history, rows[:4])
+
+
+def test_untracked_history():
+    """Histories without position columns hold rows but report no extents."""
+    history = TrajectoryHistory(4, columns=("a", "b"), tracked=())
+    history.extend(np.arange(20.0).reshape(10, 2))
+    np.testing.assert_array_equal(history.view(), np.arange(12.0, 20.0).reshape(4, 2))
+    mins, maxs = history.extent()
+    assert len(mins) == len(maxs) == 0
+
+
+def test_capacity_must_be_positive():
+    """A zero capacity is refused."""
+    with pytest.raises(ValueError):
+        TrajectoryHistory(0)
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+"""
+Tests for TrajectoryRecorder restarts: stopping and starting again within the
+same second, and while a stopped writer is still writing.
+Author: Generated for NASA Trick Project
+"""
+
+import time
+
+import numpy as np
+
+from trajectory_history import COLUMNS
+from trajectory_recorder import TrajectoryRecorder
+
+
+def read_csv(path):
+    """Read the rows of a recorded CSV file."""
+    return np.loadtxt(path, delimiter=",", skiprows=1, ndmin=2)
+
+
+def test_restart_in_same_second(tmp_path):
+    """Recordings started within one second get their own files."""
+    recorder = TrajectoryRecorder(str(tmp_path), flush_interval=0.01)
+    rows = np.arange(6 * len(COLUMNS), dtype=float).reshape(6, len(COLUMNS))
+    for batch in (rows[:3], rows[3:]):
+        recorder.start()
+        recorder.record(batch)
+        recorder.stop()
+    assert len(recorder.files) == len(set(recorder.files)) == 2
+    np.testing.assert_array_equal(read_csv(recorder.files[0]), rows[:3])
+    np.testing.assert_array_equal(read_csv(recorder.files[1]), rows[3:])
+
+
+def test_start_waits_for_stopping_writer(tmp_path):
+    """A stop() that times out keeps the thread, and start() waits for it to exit."""
+    recorder = TrajectoryRecorder(str(tmp_path), flush_interval=0.01)
+    write_pending = recorder._write_pending
+
+    def slow_write():
+        time.sleep(0.3)
+        write_pending()
+    recorder._write_pending = slow_write
+    recorder.start()
+    recorder.record(np.zeros((2, len(COLUMNS))))
+    old = recorder.thread
+    recorder.stop(timeout=0.01)
+    assert recorder.thread is old and recorder.running
+
+    recorder.start()
+    assert not old.is_alive()
+    assert recorder.thread is not old and recorder.running
+    recorder.stop()
+    assert recorder.thread is None
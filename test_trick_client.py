@@ -0,0 +1,267 @@
+#!/usr/bin/env python
+"""
+Tests for TrickVariableClient and the asyncio streams against mock_trick_server.
+Each client subscribes to the mock's synthetic orbit, in ASCII and binary and
+with per-line and combined var_adds, and the samples it parses are compared
+with the orbit the mock computes for the same times.
+Author: Generated for NASA Trick Project
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from mock_trick_server import MockTrickServer
+from trick_async import TrickStreamPool
+from trick_client import (COPY_SCHEDULED, DEFAULT_VEHICLE, LIVE, WRITE_WHEN_COPIED,
+                          TrickConnectionManager, TrickVariableClient, vehicle_vars)
+from trajectory_history import POSITION, TIME
+
+
+RATE = 1000.0  # Rows per second sent by the mock
+
+
+@pytest.fixture
+def server():
+    """Mock variable server on a free port, sending RATE rows per second."""
+    server = MockTrickServer(port=0, rate=RATE, verbose=False)
+    server.start()
+    yield server
+    server.stop()
+
+
+def wait_for(condition, timeout=5.0):
+    """Poll condition() until it is true or timeout seconds pass."""
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def read_rows(client, count, timeout=5.0):
+    """Read at least count samples with read_available() (direct mode)."""
+    batches = []
+    wait_for(lambda: batches.append(client.read_available()) or
+             sum(len(batch) for batch in batches) >= count, timeout)
+    return np.concatenate(batches)
+
+
+def check_samples(server, rows, vehicle=DEFAULT_VEHICLE):
+    """Assert samples are in time order and match the mock's orbit at their times."""
+    assert rows.shape[1] == 10
+    assert (np.diff(rows[:, TIME]) > 0).all()
+    expected = server.orbit(vehicle).state(rows[:, TIME] - server.start_time)
+    np.testing.assert_allclose(rows[:, 1:], expected, rtol=1e-12, atol=1e-9)
+
+
+@pytest.mark.parametrize("binary", [False, True])
+@pytest.mark.parametrize("combined", [False, True])
+def test_direct_read(server, binary, combined):
+    """read_available() parses every format and subscription layout to the same samples."""
+    client = TrickVariableClient("127.0.0.1", server.port, binary=binary)
+    client.combined_add = combined
+    assert client.connect(timeout=2.0)
+    try:
+        rows = read_rows(client, 200)
+        assert client.binary_active == binary
+        check_samples(server, rows)
+        assert server.sessions[-1].variables == client.trick_vars
+        np.testing.assert_array_equal(client.get_position(), rows[-1, POSITION])
+        assert client.get_time() == rows[-1, TIME]
+    finally:
+        client.disconnect()
+
+
+@pytest.mark.parametrize("binary", [False, True])
+def test_reader_thread(server, binary):
+    """The reader thread queues samples that drain() returns in order, without gaps."""
+    client = TrickVariableClient("127.0.0.1", server.port, binary=binary)
+    assert client.connect(timeout=2.0)
+    try:
+        assert client.start_reader()
+        batches = []
+        wait_for(lambda: batches.append(client.drain(100)) or
+                 sum(len(batch) for batch in batches) >= 500)
+        rows = np.concatenate(batches)
+        assert max(len(batch) for batch in batches) <= 100
+        check_samples(server, rows)
+        # One row per 1/RATE seconds (to the resolution of epoch times), none
+        # lost between receives
+        np.testing.assert_allclose(np.diff(rows[:, TIME]), 1.0 / RATE, atol=1e-6)
+        assert client.dropped_samples == 0
+    finally:
+        client.disconnect()
+    assert not client.reader_running
+
+
+def test_update_reads_one_sample(server):
+    """update() blocks for one message and stores it as the current state."""
+    client = TrickVariableClient("127.0.0.1", server.port)
+    assert client.connect(timeout=2.0)
+    try:
+        times = []
+        for _ in range(3):
+            assert client.update()
+            times.append(client.get_time())
+        assert times[0] < times[1] < times[2]
+    finally:
+        client.disconnect()
+
+
+def test_partial_sends():
+    """Messages cut at random bytes by the server parse to the same samples."""
+    server = MockTrickServer(port=0, rate=RATE, partial=True, verbose=False)
+    server.start()
+    try:
+        for binary in (False, True):
+            client = TrickVariableClient("127.0.0.1", server.port, binary=binary)
+            assert client.connect(timeout=2.0)
+            try:
+                check_samples(server, read_rows(client, 300))
+            finally:
+                client.disconnect()
+    finally:
+        server.stop()
+
+
+def test_other_vehicle(server):
+    """A vehicle prefix subscribes to that vehicle's variables."""
+    client = TrickVariableClient("127.0.0.1", server.port, vehicle="Sim.Orion_2")
+    assert client.trick_vars == vehicle_vars("Sim.Orion_2")
+    assert client.connect(timeout=2.0)
+    try:
+        check_samples(server, read_rows(client, 50), "Sim.Orion_2")
+    finally:
+        client.disconnect()
+
+
+def test_subscription_block():
+    """The connect block pauses, subscribes, sets options and unpauses in one write."""
+    client = TrickVariableClient(binary=True)
+    client.configure(cycle=0.02, copy_mode=COPY_SCHEDULED, write_mode=WRITE_WHEN_COPIED,
+                     frame_multiple=2)
+    commands = client.subscription().commands()
+    assert commands[:2] == ["trick.var_pause()", "trick.var_clear()"]
+    assert commands[2:12] == ['trick.var_add("{}")'.format(name) for name in client.trick_vars]
+    assert commands[12:] == ["trick.var_binary_nonames()", "trick.var_set_copy_mode(1)",
+                             "trick.var_set_write_mode(1)", "trick.var_set_frame_multiple(2)",
+                             "trick.var_cycle(0.02)", "trick.var_unpause()"]
+
+    client.combined_add = True
+    combined = client.subscription().commands()
+    assert len(combined) == 9
+    assert combined[2].split("; ") == commands[2:12]
+
+
+def test_configure_while_connected():
+    """configure() sends the changed settings to a connected server at once."""
+    server = MockTrickServer(port=0, verbose=False)
+    server.start()
+    try:
+        client = TrickVariableClient("127.0.0.1", server.port)
+        client.configure(cycle=0.05)
+        assert client.connect(timeout=2.0)
+        try:
+            assert wait_for(lambda: server.sessions and server.sessions[-1].cycle == 0.05)
+            client.configure(cycle=0.01)
+            assert wait_for(lambda: server.sessions[-1].cycle == 0.01)
+        finally:
+            client.disconnect()
+    finally:
+        server.stop()
+
+
+def test_mock_ignores_bad_cycle(server):
+    """A var_cycle the mock cannot parse is ignored, keeping the session alive."""
+    client = TrickVariableClient("127.0.0.1", server.port)
+    assert client.connect(timeout=2.0)
+    try:
+        client.client_socket.sendall(b"trick.var_cycle(abc)\ntrick.var_cycle(0.002)\n")
+        assert wait_for(lambda: server.sessions and server.sessions[-1].cycle == 0.002)
+        check_samples(server, read_rows(client, 10))
+    finally:
+        client.disconnect()
+
+
+def test_connection_manager(server):
+    """The connection manager connects in the background and reports LIVE."""
+    client = TrickVariableClient("127.0.0.1", server.port)
+    manager = TrickConnectionManager(client)
+    manager.start()
+    try:
+        assert wait_for(lambda: manager.state == LIVE)
+        assert wait_for(lambda: len(client.drain()) > 0)
+    finally:
+        manager.stop()
+    assert not client.connected
+
+
+def test_connection_manager_stop_during_connect(server):
+    """A connect attempt outlasting stop() disconnects, or carries on if restarted."""
+    client = TrickVariableClient("127.0.0.1", server.port)
+    open_socket = client.open_socket
+
+    def slow_open(timeout):
+        time.sleep(1.0)
+        return open_socket(timeout)
+    client.open_socket = slow_open
+    manager = TrickConnectionManager(client)
+
+    # Stopped for good: the attempt's connection is dropped when it returns
+    manager.start()
+    thread = manager.thread
+    manager.stop()
+    assert not manager.running
+    thread.join()
+    assert not client.connected
+
+    # Restarted before the attempt returns: the same thread takes it up
+    manager.start()
+    thread = manager.thread
+    manager.stop()
+    manager.start()
+    assert manager.running and manager.thread is thread
+    try:
+        assert wait_for(lambda: manager.state == LIVE)
+    finally:
+        manager.stop()
+    assert not client.connected
+
+
+def test_connect_refused():
+    """connect() reports a refused connection instead of raising."""
+    server = MockTrickServer(port=0, verbose=False)
+    server.start()
+    port = server.port
+    server.stop()
+    client = TrickVariableClient("127.0.0.1", port)
+    assert not client.connect(timeout=1.0)
+    assert client.client_socket is None
+
+
+@pytest.mark.parametrize("binary", [False, True])
+def test_stream_pool(server, binary):
+    """One event loop follows several vehicles, each parsed like the threaded client."""
+    pool = TrickStreamPool()
+    vehicles = ["Sim.Orion_1", "Sim.Orion_2", "Sim.Orion_3"]
+    for vehicle in vehicles:
+        pool.add(vehicle, "127.0.0.1", server.port, binary=binary, vehicle=vehicle)
+    pool.start()
+    try:
+        received = dict((vehicle, []) for vehicle in vehicles)
+
+        def collect():
+            for name, batch in pool.drain().items():
+                received[name].append(batch)
+            return all(sum(len(batch) for batch in batches) >= 200
+                       for batches in received.values())
+        assert wait_for(collect)
+        for vehicle in vehicles:
+            check_samples(server, np.concatenate(received[vehicle]), vehicle)
+            assert pool.streams[vehicle].binary_active == binary
+    finally:
+        pool.stop()
+    assert not pool.running
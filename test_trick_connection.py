@@ -8,8 +8,12 @@ import socket
 import time
 import sys
 
+from trick_parser import detect_byteorder, parse_rows, pop_binary, pop_chunk
+from trick_client import TrickVariableClient
+from trick_subscription import TrickSubscription
 
-def test_connection(host="localhost", port=7108, duration=10):
+
+def test_connection(host="localhost", port=7108, duration=10, binary=False, combined=False):
     """
     Test connection to Trick Variable Server and print data.
     
@@ -17,6 +21,8 @@ def test_connection(host="localhost", port=7108, duration=10):
         host (str): Hostname or IP address
         port (int): Port number
         duration (int): How long to run the test (seconds)
+        binary (bool): Request binary messages instead of ASCII
+        combined (bool): Send all var_add commands on one line
     """
     print("="*70)
     print("Trick Variable Server Connection Test")
@@ -24,6 +30,7 @@ def test_connection(host="localhost", port=7108, duration=10):
     print("Host: {}".format(host))
     print("Port: {}".format(port))
     print("Duration: {} seconds".format(duration))
+    print("Format: {}".format("binary" if binary else "ASCII"))
     print("="*70)
     
     try:
@@ -32,18 +39,12 @@ def test_connection(host="localhost", port=7108, duration=10):
         client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         
         print("[2/4] Connecting to Trick Variable Server...")
+        connect_time = time.time()
         client_socket.connect((host, port))
         print("      SUCCESS! Connected to {}:{}".format(host, port))
         
-        # Create file reader
-        src = client_socket.makefile("r")
-        
-        # Pause and clear variables
+        # Pause, clear, add the Orion state variables and unpause in one write
         print("[3/4] Configuring variable server...")
-        client_socket.send(b"trick.var_pause()\n")
-        client_socket.send(b"trick.var_clear()\n")
-        
-        # Add the Orion state variables
         trick_vars = [
             "Sim.Orion_1.Dyn.DVehModel.State.VState[0].R_CG_from_ECI_in_ECI[0]",
             "Sim.Orion_1.Dyn.DVehModel.State.VState[0].R_CG_from_ECI_in_ECI[1]",
@@ -57,13 +58,13 @@ def test_connection(host="localhost", port=7108, duration=10):
             "Sim.Orion_1.NEnv.itsSTimeModel.itsSTimeOutput.TimeData.UTC_Seconds_From_Epoch"
         ]
         
-        for var in trick_vars:
-            cmd = "trick.var_add(\"{}\")\n".format(var)
-            client_socket.send(cmd.encode())
-        
-        # Unpause to start receiving data
-        client_socket.send(b"trick.var_unpause()\n")
-        print("      SUCCESS! Variables configured")
+        subscription = TrickSubscription(trick_vars, combined=combined)
+        if binary:
+            subscription.add_option("trick.var_binary_nonames()")
+        subscription.send(client_socket)
+        setup_time = time.time() - connect_time
+        print("      SUCCESS! Variables configured ({} commands in one write, setup {:.1f} ms)".format(
+            len(subscription.commands()), setup_time * 1000))
         
         print("[4/4] Reading data from Trick Variable Server...")
         print("="*70)
@@ -72,6 +73,10 @@ def test_connection(host="localhost", port=7108, duration=10):
         # Read and display data
         start_time = time.time()
         count = 0
+        first_sample_time = None
+        rx_buffer = bytearray()
+        byteorder = None  # Set once binary messages are seen
+        client_socket.settimeout(1.0)
         
         while True:
             # Check if duration exceeded
@@ -79,32 +84,41 @@ def test_connection(host="localhost", port=7108, duration=10):
                 print("\n\nTest duration reached. Stopping...")
                 break
             
-            # Read line from server
-            data = src.readline()
+            # Read whatever the server has sent
+            try:
+                data = client_socket.recv(65536)
+            except socket.timeout:
+                data = None
             
-            if data == '':
+            if not data:
                 print("WARNING: No data received. Is the simulation running?")
-                time.sleep(1)
+                if data is not None:
+                    time.sleep(1)
                 continue
+            rx_buffer.extend(data)
             
-            # Parse data
-            values = data.strip().split("\t")
+            # ASCII lines start with a digit, binary messages with a zero byte
+            if binary and byteorder is None and rx_buffer[0] == 0:
+                byteorder = detect_byteorder(rx_buffer, len(trick_vars))
+                if byteorder is None:
+                    continue
             
-            if len(values) >= 10:
+            # Parse every complete line (or binary message) at once
+            if byteorder is not None:
+                rows, lines = pop_binary(rx_buffer, len(trick_vars), byteorder=byteorder)
+            else:
+                chunk, lines = pop_chunk(rx_buffer)
+                rows = parse_rows(chunk, len(trick_vars), lines)
+            if len(rows) < lines:
+                print("WARNING: Received {} incomplete line(s) (expected {} values per line)".format(
+                    lines - len(rows), len(trick_vars)))
+            
+            if len(rows) and first_sample_time is None:
+                first_sample_time = time.time() - connect_time
+            
+            for pos_x, pos_y, pos_z, vel_x, vel_y, vel_z, acc_x, acc_y, acc_z, utc_sec in rows.tolist():
                 count += 1
                 
-                # Extract values
-                pos_x = float(values[1])
-                pos_y = float(values[2])
-                pos_z = float(values[3])
-                vel_x = float(values[4])
-                vel_y = float(values[5])
-                vel_z = float(values[6])
-                acc_x = float(values[7])
-                acc_y = float(values[8])
-                acc_z = float(values[9])
-                utc_sec = float(values[10])
-                
                 # Print every 10th reading to avoid spam
                 if count % 10 == 0:
                     print("Sample #{} at t={:.2f}s:".format(count, utc_sec))
@@ -112,18 +126,18 @@ def test_connection(host="localhost", port=7108, duration=10):
                     print("  Velocity (m/s):   X={:+.4e}  Y={:+.4e}  Z={:+.4e}".format(vel_x, vel_y, vel_z))
                     print("  Accel (m/s^2):    X={:+.4e}  Y={:+.4e}  Z={:+.4e}".format(acc_x, acc_y, acc_z))
                     print()
-            else:
-                print("WARNING: Received incomplete data (got {} values, expected 10+)".format(len(values)))
         
         # Clean up
         print("\n" + "="*70)
         print("Test Summary:")
         print("  Total samples received: {}".format(count))
         print("  Average rate: {:.1f} Hz".format(count / duration))
+        print("  Setup time: {:.1f} ms".format(setup_time * 1000))
+        if first_sample_time is not None:
+            print("  First sample after: {:.1f} ms".format(first_sample_time * 1000))
         print("="*70)
         print("\nCleaning up...")
-        client_socket.send(b"trick.var_pause()\n")
-        client_socket.send(b"trick.var_clear()\n")
+        client_socket.sendall(b"trick.var_pause()\ntrick.var_clear()\n")
         client_socket.close()
         print("Connection closed successfully.")
         print("\n✓ TEST PASSED - Connection and data retrieval working!")
@@ -131,8 +145,7 @@ def test_connection(host="localhost", port=7108, duration=10):
     except KeyboardInterrupt:
         print("\n\nTest interrupted by user.")
         try:
-            client_socket.send(b"trick.var_pause()\n")
-            client_socket.send(b"trick.var_clear()\n")
+            client_socket.sendall(b"trick.var_pause()\ntrick.var_clear()\n")
             client_socket.close()
         except:
             pass
@@ -158,6 +171,45 @@ def test_connection(host="localhost", port=7108, duration=10):
     return True
 
 
+def tune_rate(host="localhost", port=7108, binary=False, step_time=2.0):
+    """
+    Find the fastest variable server cycle the display client keeps up with.
+    
+    Args:
+        host (str): Hostname or IP address
+        port (int): Port number
+        binary (bool): Request binary messages instead of ASCII
+        step_time (float): Seconds to measure at each cycle
+    """
+    print("="*70)
+    print("Trick Variable Server Rate Tuning")
+    print("="*70)
+    
+    client = TrickVariableClient(host, port, binary=binary)
+    if not client.connect():
+        return False
+    
+    try:
+        print("\nStepping var_cycle down ({:.0f} s per step, Ctrl+C to stop):\n".format(step_time))
+        best, results = client.tune_cycle(step_time=step_time)
+    except KeyboardInterrupt:
+        print("\n\nTuning interrupted by user.")
+        best = None
+    finally:
+        client.disconnect()
+    
+    print("\n" + "="*70)
+    if best is None:
+        print("No cycle was sustainable. Is the simulation running?")
+        print("="*70)
+        return False
+    print("Maximum sustainable rate: {:.1f} Hz (var_cycle {} s)".format(1.0 / best, best))
+    print("  Variables subscribed: {}".format(len(client.trick_vars)))
+    print("  Format: {}".format("binary" if client.binary_active else "ASCII"))
+    print("="*70)
+    return True
+
+
 if __name__ == "__main__":
     # Default values
     host = "localhost"
@@ -165,15 +217,22 @@ if __name__ == "__main__":
     duration = 10
     
     # Parse command line arguments
-    if len(sys.argv) > 1:
-        host = sys.argv[1]
-    if len(sys.argv) > 2:
-        port = int(sys.argv[2])
-    if len(sys.argv) > 3:
-        duration = int(sys.argv[3])
+    binary = "--binary" in sys.argv
+    tune = "--tune" in sys.argv
+    combined = "--combined" in sys.argv
+    args = [arg for arg in sys.argv[1:] if arg not in ("--binary", "--tune", "--combined")]
+    if len(args) > 0:
+        host = args[0]
+    if len(args) > 1:
+        port = int(args[1])
+    if len(args) > 2:
+        duration = int(args[2])
+    
+    if tune:
+        sys.exit(0 if tune_rate(host, port, binary) else 1)
     
     # Run test
-    success = test_connection(host, port, duration)
+    success = test_connection(host, port, duration, binary, combined)
     
     if success:
         print("\nYou can now run the full trajectory display:")
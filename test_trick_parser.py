@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+"""
+Tests for the bulk variable server parser (trick_parser).
+Rows are encoded the way the variable server (and mock_trick_server) sends
+them, then parsed back, whole and fed in partial chunks.
+Author: Generated for NASA Trick Project
+"""
+
+import struct
+
+import numpy as np
+import pytest
+
+from mock_trick_server import ascii_messages, binary_messages
+from trick_parser import (TRICK_DOUBLE, VS_VAR_LIST, binary_dtype, detect_byteorder,
+                          parse_rows, pop_binary, pop_chunk)
+
+
+NVARS = 10
+
+
+def sample_values(count, nvars=NVARS):
+    """Get reproducible values spanning the magnitudes of an orbit state."""
+    rng = np.random.RandomState(7)
+    return rng.uniform(-1.0, 1.0, (count, nvars)) * 10.0 ** rng.randint(-3, 8, (count, nvars))
+
+
+def binary_messages_ordered(values, byteorder):
+    """Pack rows as var_binary_nonames messages of doubles in either byte order."""
+    dtype = binary_dtype(values.shape[1], byteorder)
+    messages = np.zeros(len(values), dtype)
+    messages["indicator"] = VS_VAR_LIST
+    messages["size"] = dtype.itemsize - 4
+    messages["nvars"] = values.shape[1]
+    messages["vars"]["type"] = TRICK_DOUBLE
+    messages["vars"]["size"] = 8
+    messages["vars"]["value"] = values
+    return messages.tobytes()
+
+
+def mixed_message(values, byteorder):
+    """Pack one message of (trick type, size, value) triples of any type."""
+    body = struct.pack(byteorder + "i", len(values))
+    for var_type, size, value in values:
+        fmt = {(11, 8): "d", (10, 4): "f", (4, 4): "i", (8, 8): "q", (7, 4): "I"}[(var_type, size)]
+        body += struct.pack(byteorder + "ii" + fmt, var_type, size, value)
+    # The size counts every byte after the indicator, itself included
+    return struct.pack(byteorder + "ii", VS_VAR_LIST, 4 + len(body)) + body
+
+
+def test_parse_rows_round_trip():
+    """ASCII rows parse back to the exact values sent."""
+    values = sample_values(500)
+    chunk, count = pop_chunk(bytearray(ascii_messages(values)))
+    assert count == 500
+    rows = parse_rows(chunk, NVARS, count)
+    assert rows.shape == (500, NVARS)
+    np.testing.assert_array_equal(rows, values)
+
+
+def test_parse_rows_accepts_str_and_unknown_count():
+    """str chunks parse too, counting their own lines."""
+    values = sample_values(3)
+    rows = parse_rows(ascii_messages(values).decode("ascii"), NVARS)
+    np.testing.assert_array_equal(rows, values)
+
+
+def test_parse_rows_skips_bad_lines():
+    """Non-data, malformed and partial lines are dropped, the rest kept."""
+    values = sample_values(4)
+    lines = ascii_messages(values).decode("ascii").splitlines()
+    lines.insert(1, "1\t1")  # var_exists reply
+    lines.insert(3, "0\tnot\ta\tnumber" + "\t0" * (NVARS - 3))
+    lines.append("0\t1.5\t2.5")  # Partial row
+    rows = parse_rows("\n".join(lines), NVARS)
+    np.testing.assert_array_equal(rows, values)
+
+
+def test_parse_rows_misaligned_lines():
+    """A long line and a short one adding up to the right tab count are not merged."""
+    rows = parse_rows(b"0\t1\t2\t9\n0\t3", 2)
+    np.testing.assert_array_equal(rows, [[1.0, 2.0]])
+
+    values = sample_values(3)
+    lines = ascii_messages(values).decode("ascii").splitlines()
+    lines.insert(1, lines[1] + "\t7.0")
+    lines.insert(3, "0\t1.5")
+    rows = parse_rows("\n".join(lines), NVARS, len(lines))
+    np.testing.assert_array_equal(rows, np.vstack([values[:2], values[1:]]))
+
+
+def test_parse_rows_empty():
+    """Chunks without data rows give an empty (0, nvars) array."""
+    assert parse_rows(b"", NVARS).shape == (0, NVARS)
+    assert parse_rows(b"1\t1", NVARS).shape == (0, NVARS)
+
+
+def test_pop_chunk_keeps_partial_line():
+    """A line without its newline stays in the buffer."""
+    data = ascii_messages(sample_values(3))
+    buffer = bytearray(data[:-5])
+    chunk, count = pop_chunk(buffer)
+    assert count == 2
+    assert bytes(buffer) == data.split(b"\n")[2][:-4]
+
+
+def test_pop_chunk_max_lines():
+    """max_lines takes the oldest lines and leaves the rest."""
+    values = sample_values(5)
+    buffer = bytearray(ascii_messages(values))
+    chunk, count = pop_chunk(buffer, 2)
+    assert count == 2
+    np.testing.assert_array_equal(parse_rows(chunk, NVARS, count), values[:2])
+    chunk, count = pop_chunk(buffer)
+    assert count == 3
+    np.testing.assert_array_equal(parse_rows(chunk, NVARS, count), values[2:])
+    assert not buffer
+
+
+def test_ascii_partial_chunks():
+    """Lines split across receives parse to the same rows."""
+    values = sample_values(50)
+    data = ascii_messages(values)
+    for size in (1, 7, 64, 333):
+        buffer = bytearray()
+        rows = []
+        for start in range(0, len(data), size):
+            buffer += data[start:start + size]
+            chunk, count = pop_chunk(buffer)
+            rows.append(parse_rows(chunk, NVARS, count))
+        assert not buffer
+        np.testing.assert_array_equal(np.concatenate(rows), values)
+
+
+@pytest.mark.parametrize("byteorder", ["<", ">"])
+def test_pop_binary_round_trip(byteorder):
+    """Binary messages of doubles decode in either byte order."""
+    values = sample_values(200)
+    buffer = bytearray(binary_messages_ordered(values, byteorder))
+    assert detect_byteorder(buffer, NVARS) == byteorder
+    rows, taken = pop_binary(buffer, NVARS, byteorder=byteorder)
+    assert taken == 200
+    assert not buffer
+    np.testing.assert_array_equal(rows, values)
+
+
+def test_mock_server_binary_is_little_endian():
+    """The mock server's binary messages are detected as little-endian."""
+    values = sample_values(2)
+    buffer = bytearray(binary_messages(values))
+    assert detect_byteorder(buffer, NVARS) == "<"
+    np.testing.assert_array_equal(pop_binary(buffer, NVARS)[0], values)
+
+
+@pytest.mark.parametrize("byteorder", ["<", ">"])
+def test_pop_binary_partial_chunks(byteorder):
+    """Messages split across receives decode to the same rows."""
+    values = sample_values(40)
+    data = binary_messages_ordered(values, byteorder)
+    message_size = binary_dtype(NVARS).itemsize
+    for size in (1, 5, message_size - 1, message_size + 3, 1000):
+        buffer = bytearray()
+        rows = []
+        for start in range(0, len(data), size):
+            buffer += data[start:start + size]
+            block, taken = pop_binary(buffer, NVARS, byteorder=byteorder)
+            assert len(buffer) < message_size
+            rows.append(block)
+        assert not buffer
+        np.testing.assert_array_equal(np.concatenate(rows), values)
+
+
+@pytest.mark.parametrize("byteorder", ["<", ">"])
+def test_pop_binary_max_messages(byteorder):
+    """max_messages takes the oldest messages and leaves the rest."""
+    values = sample_values(10)
+    buffer = bytearray(binary_messages_ordered(values, byteorder))
+    rows, taken = pop_binary(buffer, NVARS, 4, byteorder)
+    assert taken == 4
+    np.testing.assert_array_equal(rows, values[:4])
+    rows, taken = pop_binary(buffer, NVARS, None, byteorder)
+    assert taken == 6
+    np.testing.assert_array_equal(rows, values[4:])
+
+
+@pytest.mark.parametrize("byteorder", ["<", ">"])
+def test_pop_binary_mixed_types(byteorder):
+    """Messages with other numeric types take the per-message path."""
+    data = (mixed_message([(11, 8, 1.5), (10, 4, 0.25), (4, 4, -3)], byteorder) +
+            mixed_message([(8, 8, 2 ** 40), (7, 4, 4000000000), (11, 8, -2.0)], byteorder))
+    buffer = bytearray(data + data[:9])
+    rows, taken = pop_binary(buffer, 3, byteorder=byteorder)
+    assert taken == 2
+    assert len(buffer) == 9
+    np.testing.assert_array_equal(rows, [[1.5, 0.25, -3.0], [2.0 ** 40, 4e9, -2.0]])
+
+
+def test_pop_binary_skips_other_messages():
+    """Messages for another variable count are taken but not returned."""
+    values = sample_values(2, 3)
+    other = mixed_message([(4, 4, 1)], "<")  # A message with another variable count
+    buffer = bytearray(binary_messages(values[:1]) + other + binary_messages(values[1:]))
+    rows, taken = pop_binary(buffer, 3)
+    assert taken == 3
+    np.testing.assert_array_equal(rows, values)
+
+
+def test_pop_binary_corrupt_size():
+    """An impossible message size raises ValueError."""
+    buffer = bytearray(struct.pack("<iii", VS_VAR_LIST, 2, 3))
+    with pytest.raises(ValueError):
+        pop_binary(buffer, 3)
@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+"""
+Tests for the trajectory relay (trick_relay): its frame encoding, the
+subscribe/backfill handshake, refused subscriptions, and RelayClient
+reconnects, with a TrickRelay following mock_trick_server.
+Author: Generated for NASA Trick Project
+"""
+
+import socket
+import time
+
+import numpy as np
+import pytest
+
+from mock_trick_server import MockTrickServer
+from trajectory_history import COLUMNS, TIME
+from trick_relay import (ERROR_PREFIX, FRAME_HEADER, RelayClient, TrickRelay, encode_frames,
+                         parse_address, pop_frames)
+
+
+@pytest.fixture
+def relay():
+    """TrickRelay on a free port following Sim.Orion_1 and Sim.Orion_2 of a mock server."""
+    server = MockTrickServer(port=0, rate=1000.0, verbose=False)
+    server.start()
+    relay = TrickRelay("127.0.0.1", server.port, ("127.0.0.1", 0),
+                       vehicles=["Sim.Orion_1", "Sim.Orion_2"], verbose=False)
+    relay.start()
+    # Let the ring buffers fill for the backfill tests
+    assert wait_for(lambda: all(len(feed.history) >= 300 for feed in relay.feeds.values()))
+    yield relay
+    relay.stop()
+    server.stop()
+
+
+def wait_for(condition, timeout=5.0):
+    """Poll condition() until it is true or timeout seconds pass."""
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def subscribe(relay, line):
+    """Connect to the relay and send a subscribe line."""
+    sock = socket.create_connection(relay.listen, timeout=2.0)
+    sock.sendall(line)
+    return sock
+
+
+def receive_rows(sock, count, timeout=5.0):
+    """Receive frames until at least count rows have arrived."""
+    buffer = bytearray()
+    blocks = []
+    deadline = time.time() + timeout
+    while sum(len(block) for block in blocks) < count and time.time() < deadline:
+        buffer += sock.recv(65536)
+        blocks.append(pop_frames(buffer, len(COLUMNS))[0])
+    return np.concatenate(blocks)
+
+
+def receive_line(sock):
+    """Receive one line (a refusal) until the relay closes the socket."""
+    data = b""
+    while True:
+        chunk = sock.recv(4096)
+        if not chunk:
+            return data
+        data += chunk
+
+
+def test_frames_round_trip():
+    """Frames decode to the rows encoded, split across receives and by max_rows."""
+    rows = np.arange(25 * len(COLUMNS), dtype=float).reshape(25, len(COLUMNS))
+    data = encode_frames(rows[:10]) + encode_frames(rows[10:])
+    buffer = bytearray()
+    blocks = []
+    for start in range(0, len(data), 7):
+        buffer += data[start:start + 7]
+        blocks.append(pop_frames(buffer, len(COLUMNS), 4)[0])
+    while buffer:
+        blocks.append(pop_frames(buffer, len(COLUMNS), 4)[0])
+    assert max(len(block) for block in blocks) <= 4
+    np.testing.assert_array_equal(np.concatenate(blocks), rows)
+
+
+def test_pop_frames_rejects_other_data():
+    """Bytes that are not a frame of the expected width raise ValueError."""
+    with pytest.raises(ValueError):
+        pop_frames(bytearray(b"0\t1.0\t2.0\t3.0\n"), len(COLUMNS))
+    with pytest.raises(ValueError):
+        pop_frames(bytearray(encode_frames(np.zeros((2, 3)))), len(COLUMNS))
+
+
+def test_parse_address():
+    """Relay addresses are host:port, a bare host, or a Unix socket path."""
+    assert parse_address("unix:/tmp/relay.sock") == ("unix", "/tmp/relay.sock")
+    assert parse_address("sim2:7300") == ("sim2", 7300)
+    assert parse_address("sim2", 7201) == ("sim2", 7201)
+    assert parse_address(":7300") == ("localhost", 7300)
+
+
+def test_subscribe_backfill(relay):
+    """A subscriber gets the requested backfill first, then live rows without gaps."""
+    sock = subscribe(relay, b"relay_subscribe Sim.Orion_2 200\n")
+    try:
+        first = FRAME_HEADER.unpack(sock.recv(FRAME_HEADER.size, socket.MSG_WAITALL))
+        assert first[0] == b"TRLY"
+        assert first[1] == 200
+        assert first[2] == len(COLUMNS)
+        body = sock.recv(200 * len(COLUMNS) * 8, socket.MSG_WAITALL)
+        backfill = np.frombuffer(body, "<f8").reshape(200, len(COLUMNS))
+
+        rows = np.concatenate([backfill, receive_rows(sock, 300)])
+        assert (np.diff(rows[:, TIME]) > 0).all()
+        np.testing.assert_allclose(np.diff(rows[:, TIME]), 1e-3, atol=1e-6)
+    finally:
+        sock.close()
+
+
+def test_subscribe_after(relay):
+    """With an after time only newer backfill rows are sent."""
+    history = relay.feeds["Sim.Orion_1"].history.view()
+    after = history[-50, TIME]
+    line = "relay_subscribe Sim.Orion_1 100000 {!r}\n".format(float(after)).encode()
+    sock = subscribe(relay, line)
+    try:
+        rows = receive_rows(sock, 100)
+        assert rows[0, TIME] == history[-49, TIME]
+        assert (np.diff(rows[:, TIME]) > 0).all()
+    finally:
+        sock.close()
+
+
+@pytest.mark.parametrize("line", [
+    b"relay_subscribe Sim.Orion_3 10\n",
+    b"relay_subscribe Sim.Orion_1\");trick.var_exit();(\" 10\n",
+    b"subscribe Sim.Orion_1 10\n",
+    b"relay_subscribe " + b"x" * 2000,
+])
+def test_subscribe_refused(relay, line):
+    """Unserved or malformed vehicles, wrong commands and overlong lines are refused."""
+    feeds = set(relay.feeds)
+    sock = subscribe(relay, line)
+    try:
+        assert receive_line(sock).startswith(ERROR_PREFIX)
+    finally:
+        sock.close()
+    # No upstream connection is added for the requested vehicle
+    assert set(relay.feeds) == feeds
+
+
+def test_invalid_vehicle_option():
+    """Vehicles given to the relay must be plain dotted names."""
+    with pytest.raises(ValueError):
+        TrickRelay(vehicles=["Sim.Orion_1\")"], verbose=False)
+
+
+def test_client_reconnect_backfills_missed_rows(relay):
+    """A reconnecting RelayClient gets only the rows it missed: no duplicates, no gaps."""
+    # The backfill covers the 200 rows sent while disconnected
+    client = RelayClient(relay.listen[0], relay.listen[1], backfill=1000)
+    batches = []
+    for connection in range(3):
+        assert client.connect(timeout=2.0)
+        assert client.start_reader()
+        assert wait_for(lambda: batches.append(client.drain()) or
+                        sum(len(batch) for batch in batches) >= 1000 + 300 * connection)
+        client.disconnect()
+        time.sleep(0.2)
+    rows = np.concatenate(batches)
+    assert (np.diff(rows[:, TIME]) > 0).all()
+    np.testing.assert_allclose(np.diff(rows[:, TIME]), 1e-3, atol=1e-6)
+
+
+def test_client_refused(relay):
+    """A RelayClient for a vehicle the relay does not serve reports the refusal."""
+    client = RelayClient(relay.listen[0], relay.listen[1], vehicle="Sim.Orion_3")
+    assert client.connect(timeout=2.0)
+    try:
+        assert wait_for(lambda: len(client.read_available()) == 0 and client.no_data, 2.0)
+    finally:
+        client.disconnect()
@@ -0,0 +1,285 @@
+#!/usr/bin/env python
+"""
+Columnar binary archive for trajectory recordings.
+An archive is a small JSON header naming each column and its unit, followed by
+fixed-width float64 rows. Rows are only ever appended, so a recording can be
+written incrementally and read back with np.memmap while it grows; plotting a
+time window touches only the pages of that window.
+Author: Generated for NASA Trick Project
+"""
+
+import json
+import os
+import re
+import struct
+
+import numpy as np
+
+from trajectory_history import COLUMNS, CSV_HEADER, POSITION, UNITS
+from trajectory_lod import decimate_indices, POINTS_PER_BUCKET
+
+MAGIC = b"TRAJARC1"
+EXTENSION = "traj"
+DTYPE = np.dtype("<f8")
+HEADER_ALIGN = 64  # Rows start on a multiple of this many bytes
+DECIMATE_ROWS = 1 << 20  # Rows of a window reduced at a time by decimated()
+
+
+def units_from_header(header):
+    """
+    Get the units from CSV headers like "Velocity X (m/s)".
+
+    Args:
+        header (list): Column headers
+
+    Returns:
+        list: Unit of each column, "" where the header has none
+    """
+    units = []
+    for label in header:
+        match = re.search(r"\(([^()]*)\)\s*$", label)
+        units.append(match.group(1) if match else "")
+    return units
+
+
+def archive_header(columns, labels, units):
+    """
+    Build the archive header.
+
+    Layout: MAGIC, uint32 little-endian length of the rest of the header, then
+    UTF-8 JSON padded with spaces so the rows start aligned.
+
+    Args:
+        columns (tuple): Column names
+        labels (list): Human-readable header of each column
+        units (list): Unit of each column
+
+    Returns:
+        bytes: Header, HEADER_ALIGN-aligned
+    """
+    info = {"columns": list(columns), "labels": list(labels), "units": list(units),
+            "dtype": DTYPE.str}
+    text = json.dumps(info, ensure_ascii=False).encode("utf-8")
+    size = len(MAGIC) + 4 + len(text)
+    text += b" " * (-size % HEADER_ALIGN)
+    return MAGIC + struct.pack("<I", len(text)) + text
+
+
+def parse_window(text):
+    """
+    Parse a time window like "100:250", "100:" or ":250".
+
+    Args:
+        text (str): START:END in seconds; either side may be blank
+
+    Returns:
+        tuple: (start, end), None for a blank side
+    """
+    start, _, end = text.partition(":")
+    return (float(start) if start.strip() else None,
+            float(end) if end.strip() else None)
+
+
+def search_sorted(values, value, right=False):
+    """
+    Binary search that reads one element per step.
+
+    np.searchsorted copies a strided array such as a memory-mapped column,
+    which would read the whole column; this reads about log2(N) values.
+
+    Args:
+        values (np.ndarray): (N,) values in ascending order
+        value (float): Value to find
+        right (bool): Return the index after any equal values instead of before
+
+    Returns:
+        int: Insertion index of value
+    """
+    low, high = 0, len(values)
+    while low < high:
+        middle = (low + high) // 2
+        if values[middle] < value or (right and values[middle] == value):
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+class ArchiveWriter:
+    """
+    Appends rows to an archive file.
+
+    Has the same write/flush/fsync/close/size interface as the recorder's
+    CSV and Parquet segments, so TrajectoryRecorder can write archives
+    directly (fmt="archive").
+    """
+    extension = EXTENSION
+
+    def __init__(self, path, columns=COLUMNS, header=CSV_HEADER):
+        """
+        Create the file and write its header.
+
+        Args:
+            path (str): Archive file path
+            columns (tuple): Column names of each row
+            header (list): Label of each column; units are taken from the
+                "(unit)" suffix of each label
+        """
+        self.columns = tuple(columns)
+        units = UNITS if self.columns == COLUMNS else units_from_header(header)
+        self.file = open(path, "wb")
+        self.file.write(archive_header(self.columns, header, units))
+        self.size = self.file.tell()
+
+    def write(self, rows):
+        """
+        Append rows.
+
+        Args:
+            rows (np.ndarray): (N, columns) values
+        """
+        data = np.ascontiguousarray(rows, dtype=DTYPE)
+        self.file.write(data.tobytes())
+        self.size += data.nbytes
+
+    def flush(self):
+        self.file.flush()
+
+    def fsync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.fsync()
+        self.file.close()
+
+
+class TrajectoryArchive:
+    """
+    Read-only, memory-mapped view of an archive.
+
+    data is an (N, columns) np.memmap; slicing it only reads the pages
+    touched. The row count comes from the file size, so an archive that is
+    still being recorded can be reopened with refresh() to see new rows, and
+    a partial row left by a crash is ignored.
+
+    Time windows are found by binary search, which assumes time does not go
+    backwards within the archive (true for a single simulation run).
+    """
+    def __init__(self, path):
+        """
+        Open an archive.
+
+        Args:
+            path (str): Archive file path
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError("{} is not a trajectory archive".format(path))
+            length = struct.unpack("<I", f.read(4))[0]
+            info = json.loads(f.read(length).decode("utf-8"))
+        self.offset = len(MAGIC) + 4 + length
+        self.columns = tuple(info["columns"])
+        self.labels = list(info["labels"])
+        self.units = list(info["units"])
+        self.dtype = np.dtype(info["dtype"])
+        self.data = None
+        self.refresh()
+
+    def refresh(self):
+        """Map the file again to pick up rows appended since it was opened."""
+        with open(self.path, "rb") as f:
+            f.seek(0, 2)
+            size = f.tell()
+        row_bytes = self.dtype.itemsize * len(self.columns)
+        rows = max(0, (size - self.offset) // row_bytes)
+        if rows == 0:
+            self.data = np.empty((0, len(self.columns)), dtype=self.dtype)
+        else:
+            self.data = np.memmap(self.path, dtype=self.dtype, mode="r",
+                                  offset=self.offset, shape=(rows, len(self.columns)))
+
+    def __len__(self):
+        return len(self.data)
+
+    def column(self, name):
+        """
+        Get one column (a strided view; nothing is read until it is used).
+
+        Args:
+            name (str): Column name
+
+        Returns:
+            np.ndarray: (N,) values
+        """
+        return self.data[:, self.columns.index(name)]
+
+    def time_range(self):
+        """
+        Get the first and last sample time.
+
+        Returns:
+            tuple: (start, end) in seconds, or None if the archive is empty
+        """
+        if len(self.data) == 0:
+            return None
+        times = self.column(COLUMNS[0])
+        return float(times[0]), float(times[-1])
+
+    def window(self, start=None, end=None):
+        """
+        Get the rows with start <= time <= end.
+
+        Args:
+            start (float): First sample time, or None for the beginning
+            end (float): Last sample time, or None for the end
+
+        Returns:
+            np.ndarray: (N, columns) memory-mapped view of the window
+        """
+        times = self.column(COLUMNS[0])
+        first = 0 if start is None else search_sorted(times, start, right=False)
+        last = len(times) if end is None else search_sorted(times, end, right=True)
+        return self.data[first:max(first, last)]
+
+    def decimated(self, start=None, end=None, max_rows=1000, columns=COLUMNS):
+        """
+        Get a time window reduced to about max_rows rows for plotting.
+
+        The window is read DECIMATE_ROWS at a time and reduced with the same
+        per-bucket min/max selection as the live displays, so memory use does
+        not depend on the window length.
+
+        Args:
+            start (float): First sample time, or None for the beginning
+            end (float): Last sample time, or None for the end
+            max_rows (int): Most rows to return
+            columns (tuple): Columns to return, in this order
+
+        Returns:
+            np.ndarray: (N, len(columns)) rows in time order
+        """
+        select = [self.columns.index(name) for name in columns]
+        position = [self.columns.index(COLUMNS[i]) for i in range(POSITION.start, POSITION.stop)]
+        window = self.window(start, end)
+        if len(window) <= max_rows:
+            return np.array(window[:, select], dtype=np.float64)
+
+        n_buckets = max(1, max_rows // POINTS_PER_BUCKET)
+        bucket_size = -(-len(window) // n_buckets)
+        chunk = max(1, DECIMATE_ROWS // bucket_size) * bucket_size
+
+        blocks = []
+        for first in range(0, len(window), chunk):
+            block = np.asarray(window[first:first + chunk])
+            if len(block) < bucket_size:
+                # Last, partial bucket: keep its first and last sample
+                index = np.unique([0, len(block) - 1])
+            else:
+                index = decimate_indices(block[:, position], bucket_size)
+                tail = len(block) % bucket_size
+                if tail:
+                    index = np.concatenate([index, np.unique([len(block) - tail, len(block) - 1])])
+            blocks.append(block[index][:, select])
+        return np.concatenate(blocks).astype(np.float64, copy=False)
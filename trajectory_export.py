@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+"""
+Export of trajectory history snapshots to CSV, gzip-compressed CSV or binary
+archive files.
+The display copies its histories as arrays (one copy per vehicle) and a
+worker thread formats and writes them in chunks, reporting progress, so
+saving a long history never blocks the Tk loop.
+Author: Generated for NASA Trick Project
+"""
+
+import gzip
+import threading
+
+from trajectory_history import COLUMNS, CSV_HEADER
+from trajectory_recorder import format_csv_rows
+from trajectory_archive import ArchiveWriter, EXTENSION as ARCHIVE_EXTENSION
+
+# File extension of each export format
+EXPORT_FORMATS = {"csv": "csv", "csv.gz": "csv.gz", "archive": ARCHIVE_EXTENSION}
+
+# Format chooser entries in the displays, in menu order
+EXPORT_LABELS = {"CSV": "csv", "CSV (gzip)": "csv.gz", "Binary (.traj)": "archive"}
+
+CHUNK_ROWS = 10000  # Rows formatted and written at a time
+GZIP_LEVEL = 6  # Near the size of level 9 at a fraction of the time
+
+
+def export_rows(path, rows, fmt="csv", columns=COLUMNS, header=CSV_HEADER, progress=None):
+    """
+    Write rows to a file in chunks.
+
+    Args:
+        path (str): Output file path
+        rows (np.ndarray): (N, columns) values
+        fmt (str): "csv", "csv.gz" or "archive"
+        columns (tuple): Column names of each row
+        header (list): Header of each column
+        progress (callable): Called with the number of rows written after
+            every chunk
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError("Unknown export format: {}".format(fmt))
+
+    if fmt == "archive":
+        output = ArchiveWriter(path, columns, header)
+        write = output.write
+    else:
+        if fmt == "csv.gz":
+            output = gzip.open(path, "wt", compresslevel=GZIP_LEVEL, encoding="utf-8", newline="")
+        else:
+            output = open(path, "w", encoding="utf-8", newline="")
+        output.write(",".join(header) + "\n")
+        write = lambda chunk: output.write(format_csv_rows(chunk))
+
+    try:
+        for start in range(0, len(rows), CHUNK_ROWS):
+            write(rows[start:start + CHUNK_ROWS])
+            if progress is not None:
+                progress(min(start + CHUNK_ROWS, len(rows)))
+    finally:
+        output.close()
+
+
+class TrajectoryExport:
+    """
+    Writes a set of files on a worker thread.
+
+    The GUI thread starts it and polls fraction and running; files lists the
+    paths written successfully, in order.
+    """
+    def __init__(self, jobs, fmt="csv"):
+        """
+        Initialize the export.
+
+        Args:
+            jobs (list): (path, rows) pairs; rows must not be modified afterwards
+            fmt (str): "csv", "csv.gz" or "archive"
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError("Unknown export format: {}".format(fmt))
+        self.jobs = list(jobs)
+        self.fmt = fmt
+        self.total = sum(len(rows) for path, rows in self.jobs)
+        self.done = 0  # Rows written so far
+        self.files = []
+        self.error = None  # Last write error, if any
+        self.thread = None
+
+    @property
+    def running(self):
+        """True while the worker thread is alive."""
+        return self.thread is not None and self.thread.is_alive()
+
+    @property
+    def fraction(self):
+        """Fraction of the rows written, 0 to 1."""
+        return float(self.done) / self.total if self.total else 1.0
+
+    def start(self):
+        """Start the worker thread."""
+        self.thread = threading.Thread(target=self._run, name="TrajectoryExport")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def join(self, timeout=None):
+        """
+        Wait for the export to finish.
+
+        Args:
+            timeout (float): Seconds to wait, or None to wait until done
+        """
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def _run(self):
+        """Worker thread: write every job, continuing past failed files."""
+        for path, rows in self.jobs:
+            written = self.done
+
+            def progress(rows_done):
+                self.done = written + rows_done
+
+            try:
+                export_rows(path, rows, self.fmt, progress=progress)
+                self.files.append(path)
+            except Exception as e:
+                self.error = e
+                print("Error saving {}: {}".format(path, e))
+            self.done = written + len(rows)
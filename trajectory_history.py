@@ -0,0 +1,322 @@
+#!/usr/bin/env python
+"""
+Trajectory history buffer shared by the trajectory displays and CSV export.
+Stores the most recent vehicle state samples in a preallocated NumPy ring
+buffer so appends are O(1) and the plots can read the history without
+building Python lists.
+Author: Generated for NASA Trick Project
+"""
+
+import numpy as np
+
+
+# Column order of every sample row (matches TrickVariableClient samples)
+COLUMNS = (
+    "time",
+    "pos_x", "pos_y", "pos_z",
+    "vel_x", "vel_y", "vel_z",
+    "acc_x", "acc_y", "acc_z",
+)
+
+# CSV header for each column, in COLUMNS order
+CSV_HEADER = [
+    'Time (UTC sec)',
+    'Position X (m)',
+    'Position Y (m)',
+    'Position Z (m)',
+    'Velocity X (m/s)',
+    'Velocity Y (m/s)',
+    'Velocity Z (m/s)',
+    'Acceleration X (m/s²)',
+    'Acceleration Y (m/s²)',
+    'Acceleration Z (m/s²)'
+]
+
+# Unit of each column, in COLUMNS order
+UNITS = ("s", "m", "m", "m", "m/s", "m/s", "m/s", "m/s²", "m/s²", "m/s²")
+
+TIME = 0
+POSITION = slice(1, 4)
+VELOCITY = slice(4, 7)
+ACCELERATION = slice(7, 10)
+
+
+class MonotonicQueue:
+    """
+    Sliding-window minimum as a monotonic queue stored in NumPy arrays.
+
+    Holds (value, sample number) pairs with both fields strictly increasing
+    from front to back, so the front is the minimum of the window. Because
+    both fields are sorted, trimming the back on push and the front on
+    eviction are binary searches rather than per-element pops. Track a
+    maximum by pushing negated values.
+    """
+    def __init__(self, size=64):
+        self.values = np.empty(size)
+        self.numbers = np.empty(size, dtype=np.int64)
+        self.start = 0
+        self.end = 0
+
+    def __len__(self):
+        return self.end - self.start
+
+    def clear(self):
+        self.start = 0
+        self.end = 0
+
+    def push(self, values, numbers):
+        """
+        Push candidates for the window minimum.
+
+        Args:
+            values (np.ndarray): Strictly increasing values, oldest first
+            numbers (np.ndarray): Sample numbers of values, increasing
+        """
+        # Entries >= the new minimum can never be the window minimum again
+        self.end = self.start + int(np.searchsorted(self.values[self.start:self.end], values[0]))
+
+        n = len(values)
+        if self.end + n > len(self.values):
+            # Move the live entries to the front, growing if more than half full
+            live = self.end - self.start
+            size = len(self.values)
+            while live + n > size // 2:
+                size *= 2
+            new_values = np.empty(size)
+            new_numbers = np.empty(size, dtype=np.int64)
+            new_values[:live] = self.values[self.start:self.end]
+            new_numbers[:live] = self.numbers[self.start:self.end]
+            self.values, self.numbers = new_values, new_numbers
+            self.start, self.end = 0, live
+
+        self.values[self.end:self.end + n] = values
+        self.numbers[self.end:self.end + n] = numbers
+        self.end += n
+
+    def front(self, oldest):
+        """
+        Get the window minimum.
+
+        Args:
+            oldest (int): Sample number of the oldest sample in the window
+
+        Returns:
+            float: Minimum value among samples numbered oldest or later
+        """
+        self.start += int(np.searchsorted(self.numbers[self.start:self.end], oldest))
+        return self.values[self.start]
+
+
+class TrajectoryHistory:
+    """
+    Fixed-capacity ring buffer of trajectory samples.
+
+    Every row is written twice, at slot i and slot i + capacity, so the most
+    recent rows always form one contiguous slice of the storage array even
+    after the write position wraps around. view() and the column accessors
+    therefore return NumPy views, never copies.
+
+    Views are only valid until the next append; copy them if they need to
+    outlive the current GUI tick.
+
+    Running min/max extents of the tracked columns are kept in monotonic
+    queues, so extent() costs amortized O(1) per append and per eviction
+    instead of a scan of the whole history.
+    """
+    def __init__(self, capacity=1000, columns=COLUMNS, tracked=None):
+        """
+        Initialize an empty history.
+
+        Args:
+            capacity (int): Maximum number of samples kept (oldest are dropped)
+            columns (tuple): Column names of each row (default: COLUMNS)
+            tracked (tuple): Columns whose running extents extent() reports
+                (default: the position columns, if present)
+        """
+        self.capacity = int(capacity)
+        if self.capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.columns = tuple(columns)
+
+        if tracked is None:
+            tracked = [name for name in ("pos_x", "pos_y", "pos_z") if name in self.columns]
+        self.tracked = tuple(tracked)
+        self.tracked_index = [self.columns.index(name) for name in self.tracked]
+        self.min_queues = [MonotonicQueue() for _ in self.tracked]
+        self.max_queues = [MonotonicQueue() for _ in self.tracked]  # Negated values
+
+        self.data = np.zeros((2 * self.capacity, len(self.columns)), dtype=np.float64)
+        self.head = 0  # Next slot to write, in [0, capacity)
+        self.count = 0  # Samples currently held
+        self.total = 0  # Samples ever appended (not reset by eviction)
+
+    def __len__(self):
+        return self.count
+
+    def append(self, sample):
+        """
+        Append one sample.
+
+        Args:
+            sample: Sequence of one value per column
+        """
+        self.data[self.head] = sample
+        self.data[self.head + self.capacity] = sample
+        if self.tracked:
+            self.track_extents(self.data[self.head:self.head + 1], self.total)
+
+        self.head += 1
+        if self.head == self.capacity:
+            self.head = 0
+        if self.count < self.capacity:
+            self.count += 1
+        self.total += 1
+
+    def extend(self, samples):
+        """
+        Append a batch of samples.
+
+        Args:
+            samples: List of samples or an (N, columns) array, oldest first
+        """
+        rows = np.asarray(samples, dtype=np.float64)
+        if rows.size == 0:
+            return
+        rows = rows.reshape(-1, len(self.columns))
+
+        added = rows.shape[0]
+        if added > self.capacity:
+            rows = rows[-self.capacity:]
+        n = rows.shape[0]
+
+        # Split the write at the end of the ring so both copies are slices
+        first = min(n, self.capacity - self.head)
+        self.data[self.head:self.head + first] = rows[:first]
+        self.data[self.head + self.capacity:self.head + self.capacity + first] = rows[:first]
+        if first < n:
+            rest = n - first
+            self.data[:rest] = rows[first:]
+            self.data[self.capacity:self.capacity + rest] = rows[first:]
+
+        self.track_extents(rows, self.total + added - n)
+
+        self.head = (self.head + n) % self.capacity
+        self.count = min(self.capacity, self.count + n)
+        self.total += added
+
+    def track_extents(self, rows, first):
+        """
+        Push a batch of rows onto the monotonic min/max queues.
+
+        Only rows strictly below every later row of the batch can ever be a
+        window minimum, so those are found with one reversed accumulate and
+        only they are queued (likewise for the maximum, on negated values).
+
+        Args:
+            rows (np.ndarray): Rows being appended, oldest first
+            first (int): Sample number of rows[0]
+        """
+        numbers = np.arange(first, first + len(rows))
+        for i, col in enumerate(self.tracked_index):
+            for queue, values in ((self.min_queues[i], rows[:, col]),
+                                  (self.max_queues[i], -rows[:, col])):
+                later_min = np.minimum.accumulate(values[::-1])[::-1]
+                keep = np.append(values[:-1] < later_min[1:], True)
+                queue.push(values[keep], numbers[keep])
+
+    def discard(self, n):
+        """
+        Drop the n oldest samples.
+
+        Args:
+            n (int): Number of samples to drop (clamped to len(self))
+        """
+        self.count -= max(0, min(n, self.count))
+
+    def clear(self):
+        """Remove all samples."""
+        self.head = 0
+        self.count = 0
+        self.total = 0
+        for queue in self.min_queues + self.max_queues:
+            queue.clear()
+
+    def slots(self):
+        """
+        Get the storage rows holding the samples, oldest first.
+
+        Returns:
+            tuple: (start, end) such that data[start:end] is the history
+        """
+        end = self.head
+        start = end - self.count
+        if start < 0:
+            start += self.capacity
+            end += self.capacity
+        return start, end
+
+    def view(self):
+        """
+        Get the held samples, oldest first.
+
+        Returns:
+            np.ndarray: (len(self), columns) contiguous view
+        """
+        start, end = self.slots()
+        return self.data[start:end]
+
+    def column(self, name):
+        """
+        Get one column of the held samples.
+
+        Args:
+            name (str or int): Column name, or its index
+
+        Returns:
+            np.ndarray: 1-D view of length len(self)
+        """
+        if not isinstance(name, int):
+            name = self.columns.index(name)
+        return self.view()[:, name]
+
+    def positions(self):
+        """Get the held positions as an (N, 3) view in meters."""
+        return self.view()[:, POSITION]
+
+    def latest(self):
+        """
+        Get the most recent sample.
+
+        Returns:
+            np.ndarray: Row view, or None if empty
+        """
+        if self.count == 0:
+            return None
+        return self.data[self.head - 1 + self.capacity]
+
+    def extent(self):
+        """
+        Get the running extents of the tracked columns.
+
+        Returns:
+            tuple: (mins, maxs) arrays in self.tracked order, or None if empty
+        """
+        if self.count == 0:
+            return None
+
+        oldest = self.total - self.count
+        mins = np.array([queue.front(oldest) for queue in self.min_queues])
+        maxs = -np.array([queue.front(oldest) for queue in self.max_queues])
+        return mins, maxs
+
+    def min(self):
+        """Get the per-column minimum of the held samples (None if empty)."""
+        if self.count == 0:
+            return None
+        return self.view().min(axis=0)
+
+    def max(self):
+        """Get the per-column maximum of the held samples (None if empty)."""
+        if self.count == 0:
+            return None
+        return self.view().max(axis=0)
@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+"""
+Level-of-detail decimation for long trajectory histories.
+Sits between the TrajectoryHistory buffer and the plot artists so the number
+of points handed to matplotlib or VTK depends on the window size, not on how
+long the simulation has been running.
+Author: Generated for NASA Trick Project
+"""
+
+import numpy as np
+
+from trajectory_history import TrajectoryHistory, POSITION
+
+
+# Points kept per bucket: first, last, and the min and max of X, Y and Z
+POINTS_PER_BUCKET = 8
+
+
+def decimate_indices(points, bucket_size):
+    """
+    Find the extreme points of consecutive buckets of points.
+
+    Each bucket keeps its first and last point plus the points holding the
+    minimum and maximum of every coordinate, in their original order.
+
+    Args:
+        points (np.ndarray): (N * bucket_size, 3) positions
+        bucket_size (int): Samples per bucket
+
+    Returns:
+        np.ndarray: (N * POINTS_PER_BUCKET,) row indices into points, ascending
+    """
+    n_buckets = len(points) // bucket_size
+    buckets = points[:n_buckets * bucket_size].reshape(n_buckets, bucket_size, 3)
+
+    index = np.empty((n_buckets, POINTS_PER_BUCKET), dtype=np.intp)
+    index[:, 0] = 0
+    index[:, 1:4] = buckets.argmin(axis=1)
+    index[:, 4:7] = buckets.argmax(axis=1)
+    index[:, 7] = bucket_size - 1
+    index.sort(axis=1)
+
+    index += (np.arange(n_buckets) * bucket_size)[:, None]
+    return index.reshape(-1)
+
+
+def decimate_buckets(points, bucket_size):
+    """
+    Reduce consecutive buckets of points to their extreme points.
+
+    This is the per-pixel-column min/max reduction applied to all three axes
+    at once (see decimate_indices), so the decimated line has the same
+    envelope in the X-Y, Y-Z and X-Z projections and in 3D.
+
+    Args:
+        points (np.ndarray): (N * bucket_size, 3) positions
+        bucket_size (int): Samples per bucket
+
+    Returns:
+        np.ndarray: (N * POINTS_PER_BUCKET, 3) decimated positions
+    """
+    return points[decimate_indices(points, bucket_size)]
+
+
+class TrajectoryDecimator:
+    """
+    Incremental, screen-space-aware decimation of a TrajectoryHistory.
+
+    Samples are grouped into fixed buckets by their absolute sample number
+    (TrajectoryHistory.total), so a bucket's decimated points never change
+    once it is complete. Each update() reduces only the buckets completed
+    since the previous call and drops the ones that were evicted, and the
+    most recent samples (at least recent_points of them) are always passed
+    through at full resolution.
+
+    The bucket size is a power of two chosen so that a full history yields
+    about POINTS_PER_BUCKET points per screen pixel column. When that would
+    not reduce anything, update() returns the history positions unchanged.
+    """
+    def __init__(self, capacity, pixels=1000, recent_points=1000):
+        """
+        Initialize the decimator.
+
+        Args:
+            capacity (int): Capacity of the history being decimated
+            pixels (int): Width of the plot in pixels
+            recent_points (int): Newest samples always drawn at full resolution
+        """
+        self.capacity = capacity
+        self.recent_points = recent_points
+        self.bucket_size = 1
+        self.set_resolution(pixels)
+
+    def set_resolution(self, pixels):
+        """
+        Choose the bucket size for a plot of the given width.
+
+        Args:
+            pixels (int): Width of the plot in pixels
+
+        Returns:
+            bool: True if the bucket size changed (the cache was reset)
+        """
+        target = max(1, int(self.capacity // max(1, int(pixels))))
+        bucket_size = 1
+        while bucket_size < target:
+            bucket_size *= 2
+
+        if bucket_size == self.bucket_size:
+            return False
+        self.bucket_size = bucket_size
+        self.reset()
+        return True
+
+    @property
+    def active(self):
+        """True if decimation actually reduces the point count."""
+        return self.bucket_size > POINTS_PER_BUCKET
+
+    def reset(self):
+        """Forget all cached buckets."""
+        buckets = self.capacity // self.bucket_size + 2
+        self.cache = TrajectoryHistory(buckets * POINTS_PER_BUCKET, columns=("x", "y", "z"))
+        self.first_bucket = 0  # Absolute number of the oldest cached bucket
+        self.next_bucket = 0  # Absolute number of the next bucket to reduce
+        self.seen_total = 0
+
+    def update(self, history):
+        """
+        Get the decimated positions of a history.
+
+        Args:
+            history (TrajectoryHistory): History to decimate
+
+        Returns:
+            np.ndarray: (M, 3) positions, oldest first; the last row is the
+                most recent sample
+        """
+        positions = history.view()[:, POSITION]
+        if not self.active or len(positions) <= self.recent_points + self.bucket_size:
+            return positions
+
+        size = self.bucket_size
+        total = history.total
+        oldest = total - len(positions)  # Absolute number of positions[0]
+        if total < self.seen_total:
+            # History was cleared
+            self.reset()
+        self.seen_total = total
+
+        # Drop cached buckets that are no longer (entirely) in the history
+        first_kept = -(-oldest // size)
+        if first_kept > self.first_bucket:
+            dropped = min(first_kept, self.next_bucket) - self.first_bucket
+            self.cache.discard(dropped * POINTS_PER_BUCKET)
+            self.first_bucket = first_kept
+            self.next_bucket = max(self.next_bucket, first_kept)
+
+        # Reduce newly completed buckets, leaving the recent segment alone
+        last_complete = (total - self.recent_points) // size
+        if last_complete > self.next_bucket:
+            start = self.next_bucket * size - oldest
+            end = last_complete * size - oldest
+            self.cache.extend(decimate_buckets(positions[start:end], size))
+            self.next_bucket = last_complete
+
+        # Partially evicted bucket before the cache, reduced as one bucket
+        head_end = self.first_bucket * size - oldest
+        parts = []
+        if head_end > 0:
+            parts.append(decimate_buckets(positions[:head_end], head_end))
+        parts.append(self.cache.view())
+        parts.append(positions[self.next_bucket * size - oldest:])
+        return np.concatenate(parts)
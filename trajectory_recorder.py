@@ -0,0 +1,302 @@
+#!/usr/bin/env python
+"""
+Background recorder that streams trajectory samples to disk.
+Every ingested sample is appended to CSV, Parquet or binary archive files by a writer thread,
+in batches, so what is persisted does not depend on the size of the on-screen
+history and the GUI thread never formats or writes rows.
+Author: Generated for NASA Trick Project
+"""
+
+import importlib.util
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+
+from trajectory_history import COLUMNS, CSV_HEADER
+from trajectory_archive import ArchiveWriter
+
+# pyarrow is only imported by ParquetSegment, so CSV and archive recordings
+# (and record_trajectory.py) start without paying for it
+PARQUET_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+
+def format_csv_rows(rows):
+    """
+    Format rows as CSV lines in one pass.
+
+    Values are written with repr(), the shortest text that reads back as the
+    same float.
+
+    Args:
+        rows (np.ndarray): (N, columns) values
+
+    Returns:
+        str: One newline-terminated line per row
+    """
+    if len(rows) == 0:
+        return ""
+    row_format = ",".join(["%r"] * rows.shape[1])
+    return "\n".join([row_format % tuple(row) for row in rows.tolist()]) + "\n"
+
+
+class CsvSegment:
+    """One CSV file of a recording."""
+    extension = "csv"
+
+    def __init__(self, path, columns, header):
+        self.file = open(path, "w", newline="")
+        self.file.write(",".join(header) + "\n")
+        self.size = self.file.tell()
+
+    def write(self, rows):
+        text = format_csv_rows(rows)
+        self.file.write(text)
+        self.size += len(text)
+
+    def flush(self):
+        self.file.flush()
+
+    def fsync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.fsync()
+        self.file.close()
+
+
+class ParquetSegment:
+    """
+    One Parquet file of a recording; each batch becomes a row group.
+
+    The file is only readable once closed (Parquet writes its footer last),
+    so rotate often if the recording must be readable while it runs.
+    """
+    extension = "parquet"
+
+    def __init__(self, path, columns, header):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self.columns = list(columns)
+        self.file = open(path, "wb")
+        schema = pa.schema([(name, pa.float64()) for name in self.columns])
+        self.writer = pq.ParquetWriter(self.file, schema)
+        self.size = 0
+
+    def write(self, rows):
+        import pyarrow as pa
+        table = pa.Table.from_arrays([pa.array(rows[:, i]) for i in range(len(self.columns))],
+                                     names=self.columns)
+        self.writer.write_table(table)
+        self.size = self.file.tell()
+
+    def flush(self):
+        self.file.flush()
+
+    def fsync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.writer.close()
+        self.fsync()
+        self.file.close()
+
+
+SEGMENT_TYPES = {"csv": CsvSegment, "parquet": ParquetSegment, "archive": ArchiveWriter}
+
+
+class TrajectoryRecorder:
+    """
+    Appends every recorded sample to disk from a background thread.
+
+    record() only queues the batch; the writer thread wakes every
+    flush_interval seconds, writes everything queued as one batch and
+    flushes it to the OS. Files are fsynced every fsync_interval seconds and
+    on rotation and close. A new file is started when the current one
+    reaches max_bytes or has been open max_seconds.
+
+    Files are named <prefix>_<start time>_<part>.<csv|parquet|traj> in
+    directory; parts already on disk are skipped, never overwritten.
+    """
+    def __init__(self, directory=".", prefix="orion_trajectory", fmt="csv",
+                 columns=COLUMNS, header=CSV_HEADER, flush_interval=1.0,
+                 fsync_interval=10.0, max_bytes=None, max_seconds=None):
+        """
+        Initialize a stopped recorder.
+
+        Args:
+            directory (str): Directory the files are written to
+            prefix (str): Start of every file name
+            fmt (str): "csv", "parquet" (needs pyarrow) or "archive"
+                (see trajectory_archive)
+            columns (tuple): Column names of each sample row
+            header (list): CSV header for each column
+            flush_interval (float): Seconds between batched writes
+            fsync_interval (float): Seconds between fsyncs, 0 to fsync every
+                batch, or None to fsync only on rotation and close
+            max_bytes (int): Start a new file past this size, or None
+            max_seconds (float): Start a new file after this long, or None
+        """
+        if fmt not in SEGMENT_TYPES:
+            raise ValueError("Unknown recording format: {}".format(fmt))
+        if fmt == "parquet" and not PARQUET_AVAILABLE:
+            raise ImportError("Parquet recording needs pyarrow (pip install pyarrow)")
+
+        self.directory = directory
+        self.prefix = prefix
+        self.segment_type = SEGMENT_TYPES[fmt]
+        self.columns = tuple(columns)
+        self.header = list(header)
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.chunk_rows = 1000  # Rows formatted and written at a time
+
+        # Batches queued by record(), taken by the writer thread
+        self.pending = deque()
+        self.pending_lock = threading.Lock()
+
+        self.segment = None
+        self.segment_start = 0.0
+        self.last_fsync = 0.0
+        self.start_stamp = None
+        self.part = 0
+        self.files = []  # Paths of every file started, oldest first
+        self.rows_written = 0
+        self.error = None  # Last write error, if any
+
+        self.thread = None
+        self.stop_event = threading.Event()
+
+    @property
+    def running(self):
+        """True while the writer thread is alive."""
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self):
+        """
+        Start the writer thread (no-op if already running).
+
+        If a stopped writer is still writing out its queue, this waits for it
+        to finish first, so only one thread ever writes.
+        """
+        if self.running and not self.stop_event.is_set():
+            return
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.stop_event.clear()
+        self.start_stamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        self.part = 0
+        self.thread = threading.Thread(target=self._run, name="TrajectoryRecorder")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self, timeout=5.0):
+        """
+        Write everything still queued, close the file and stop the thread.
+
+        Args:
+            timeout (float): Seconds to wait for the writer thread
+        """
+        self.stop_event.set()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+        # Kept until the thread has exited, so start() waits for it
+        if self.thread is not None and not self.thread.is_alive():
+            self.thread = None
+
+    def record(self, samples):
+        """
+        Queue samples to be written (safe to call from any thread).
+
+        Samples recorded while the recorder is stopped are ignored.
+
+        Args:
+            samples (np.ndarray): (N, columns) rows; must not be modified afterwards
+        """
+        if len(samples) == 0 or not self.running:
+            return
+        with self.pending_lock:
+            self.pending.append(samples)
+
+    @property
+    def pending_rows(self):
+        """Rows queued but not yet written."""
+        with self.pending_lock:
+            return sum(len(batch) for batch in self.pending)
+
+    def _run(self):
+        """Writer thread: write queued batches every flush_interval until stopped."""
+        while True:
+            stopping = self.stop_event.wait(self.flush_interval)
+            try:
+                self._write_pending()
+            except Exception as e:
+                self.error = e
+                print("Error recording trajectory: {}".format(e))
+            if stopping:
+                break
+        self._close_segment()
+
+    def _write_pending(self):
+        """Write every queued batch to the current file, rotating as needed."""
+        with self.pending_lock:
+            batches = list(self.pending)
+            self.pending.clear()
+        if not batches:
+            return
+        rows = batches[0] if len(batches) == 1 else np.concatenate(batches)
+
+        # Written in chunks so a large backlog still rotates near max_bytes
+        now = time.time()
+        for start in range(0, len(rows), self.chunk_rows):
+            if self.segment is not None and self._rotate_due(now):
+                self._close_segment()
+            if self.segment is None:
+                self._open_segment(now)
+            chunk = rows[start:start + self.chunk_rows]
+            self.segment.write(chunk)
+            self.rows_written += len(chunk)
+        self.segment.flush()
+        if self.fsync_interval is not None and now - self.last_fsync >= self.fsync_interval:
+            self.segment.fsync()
+            self.last_fsync = now
+
+    def _rotate_due(self, now):
+        """Check whether the current file is full or old enough to rotate."""
+        if self.max_bytes is not None and self.segment.size >= self.max_bytes:
+            return True
+        return self.max_seconds is not None and now - self.segment_start >= self.max_seconds
+
+    def _open_segment(self, now):
+        """Start the next file, skipping part numbers already on disk."""
+        while True:
+            self.part += 1
+            name = "{}_{}_{:03d}.{}".format(self.prefix, self.start_stamp, self.part,
+                                            self.segment_type.extension)
+            path = os.path.join(self.directory, name)
+            # A recording restarted within the same second has the same stamp
+            if not os.path.exists(path):
+                break
+        self.segment = self.segment_type(path, self.columns, self.header)
+        self.segment_start = now
+        self.last_fsync = now
+        self.files.append(path)
+
+    def _close_segment(self):
+        """Fsync and close the current file, if any."""
+        if self.segment is None:
+            return
+        try:
+            self.segment.close()
+        except Exception as e:
+            self.error = e
+            print("Error closing trajectory recording: {}".format(e))
+        self.segment = None
@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+"""
+Offline replay of recorded trajectories.
+A TrajectoryReplay stands in for a vehicle's Trick connection and hands the
+display the rows of a saved or recorded file (CSV, gzip CSV or binary
+archive) through the same read/ingest/render path as live data, paced at the
+recorded rate times a speed factor, or as fast as the display takes them.
+Author: Generated for NASA Trick Project
+"""
+
+import gzip
+import time
+
+import numpy as np
+
+from trick_client import IDLE, LIVE
+from trajectory_history import COLUMNS, TIME, POSITION, VELOCITY, ACCELERATION
+from trajectory_archive import TrajectoryArchive, MAGIC, search_sorted
+
+
+def load_rows(path):
+    """
+    Read a trajectory file written by save_to_csv or a TrajectoryRecorder.
+
+    Archives are memory-mapped rather than read; CSV files (.csv or .csv.gz,
+    with one header line) are read in one bulk parse.
+
+    Args:
+        path (str): .csv, .csv.gz or .traj file
+
+    Returns:
+        np.ndarray: (N, 10) rows in COLUMNS order
+    """
+    with open(path, "rb") as f:
+        magic = f.read(len(MAGIC))
+    if magic == MAGIC:
+        archive = TrajectoryArchive(path)
+        if archive.columns == COLUMNS:
+            return archive.data
+        return archive.data[:, [archive.columns.index(name) for name in COLUMNS]]
+
+    opener = gzip.open if magic[:2] == b"\x1f\x8b" else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        rows = np.loadtxt(f, delimiter=",", skiprows=1, ndmin=2)
+    if rows.shape[1] != len(COLUMNS):
+        raise ValueError("{} has {} columns, expected {}".format(path, rows.shape[1], len(COLUMNS)))
+    return rows
+
+
+def parse_speed(text):
+    """
+    Parse a replay speed like "1", "10x" or "max".
+
+    Args:
+        text (str): Speed factor, or "max" for as fast as possible
+
+    Returns:
+        float: Speed factor, or None for as fast as possible
+    """
+    text = text.strip().lower()
+    if text in ("max", ""):
+        return None
+    speed = float(text[:-1] if text.endswith("x") else text)
+    if speed <= 0:
+        raise ValueError("Replay speed must be positive")
+    return speed
+
+
+class TrajectoryReplay:
+    """
+    Plays the rows of a trajectory file back in real time or faster.
+
+    Provides the parts of TrickVariableClient and TrickConnectionManager the
+    displays use (state, status_text(), get_position() etc., get_lag()), so
+    a VehicleTrack can take its samples from a replay instead of a
+    connection. With speed=None every read returns as many rows as allowed,
+    which measures how fast the display ingests and renders.
+    """
+    def __init__(self, path, speed=1.0):
+        """
+        Load the file (see load_rows).
+
+        Args:
+            path (str): Trajectory file
+            speed (float): Recorded seconds played per second, or None to
+                play as fast as the rows are read
+        """
+        self.path = path
+        self.rows = load_rows(path)
+        self.times = self.rows[:, TIME]
+        self.speed = speed
+
+        self.state = IDLE
+        self.next_row = 0
+        self.start_time = None  # Wall-clock time of start()
+        self.finish_time = None  # Wall-clock time the last row was read
+        self.latest = np.zeros(len(COLUMNS))
+        self.lag = 0.0
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def running(self):
+        """True while rows are being played."""
+        return self.state == LIVE
+
+    @property
+    def finished(self):
+        """True once every row has been read."""
+        return self.next_row >= len(self.rows)
+
+    def start(self):
+        """Play from the first row."""
+        self.next_row = 0
+        self.start_time = time.time()
+        self.finish_time = None
+        self.state = LIVE if len(self.rows) else IDLE
+
+    def stop(self):
+        """Stop playing."""
+        self.state = IDLE
+
+    def read(self, max_samples=None):
+        """
+        Get the rows due since the last read.
+
+        Args:
+            max_samples (int): Most rows to return
+
+        Returns:
+            np.ndarray: (N, 10) rows in history order
+        """
+        if self.state != LIVE:
+            return np.empty((0, len(COLUMNS)))
+
+        now = time.time()
+        if self.speed is None:
+            end = len(self.rows)
+        else:
+            due = self.times[0] + (now - self.start_time) * self.speed
+            end = search_sorted(self.times, due, right=True)
+        if max_samples is not None:
+            end = min(end, self.next_row + max_samples)
+
+        batch = np.array(self.rows[self.next_row:end], dtype=np.float64)
+        self.next_row = max(self.next_row, end)
+        if len(batch):
+            self.latest = batch[-1]
+            if self.speed is not None:
+                self.lag = max(0.0, due - self.latest[TIME]) / self.speed
+        if self.finished:
+            self.finish_time = now
+            self.state = IDLE
+        return batch
+
+    def rates(self):
+        """
+        Get the replay throughput so far.
+
+        Returns:
+            tuple: (rows read, seconds since start)
+        """
+        end = self.finish_time or time.time()
+        return self.next_row, end - (self.start_time or end)
+
+    def status_text(self):
+        """
+        Describe the replay for a status label.
+
+        Returns:
+            str: e.g. "Replay 10x (41%)" or "Replay finished"
+        """
+        if self.finished:
+            return "Replay finished"
+        if self.state != LIVE:
+            return "Replay stopped"
+        speed = "max" if self.speed is None else "{:g}x".format(self.speed)
+        return "Replay {} ({:.0f}%)".format(speed, 100.0 * self.next_row / len(self.rows))
+
+    def get_lag(self):
+        """Get how far the replay trails its schedule, in wall-clock seconds."""
+        return self.lag
+
+    def get_position(self):
+        """Get the last played position vector [X, Y, Z] in meters."""
+        return self.latest[POSITION].copy()
+
+    def get_velocity(self):
+        """Get the last played velocity vector [X, Y, Z] in m/s."""
+        return self.latest[VELOCITY].copy()
+
+    def get_acceleration(self):
+        """Get the last played acceleration vector [X, Y, Z] in m/s^2."""
+        return self.latest[ACCELERATION].copy()
+
+    def get_time(self):
+        """Get the last played UTC seconds from epoch."""
+        return self.latest[TIME]
@@ -0,0 +1,300 @@
+#!/usr/bin/env python
+"""
+Asyncio Trick Variable Server client for following many simulations at once.
+Every connection runs as a coroutine on one event loop thread, so a display
+can follow dozens of variable servers without a reader thread per stream.
+Parsed samples are handed to the GUI through each stream's thread-safe queue.
+Author: Generated for NASA Trick Project
+"""
+
+import asyncio
+import threading
+import time
+
+from trick_client import (TrickVariableClient, backoff_delay, status_text, DEFAULT_VEHICLE,
+                          IDLE, CONNECTING, LIVE, STALLED, BACKOFF)
+
+
+class AsyncTrickStream(TrickVariableClient):
+    """
+    One variable server connection driven by a TrickStreamPool.
+
+    Shares TrickVariableClient's subscription, parsing, sample queue and
+    get_position()/get_velocity()/get_acceleration()/get_time() accessors;
+    the socket is an asyncio stream owned by the pool's event loop, so
+    samples are collected with drain() (update(), read_available() and
+    start_reader() do not apply). The stream reconnects on its own with the
+    same backoff as TrickConnectionManager.
+    """
+    def __init__(self, name, host="localhost", port=7108, queue_size=10000,
+                 binary=False, connect_timeout=3.0, initial_backoff=0.5,
+                 max_backoff=30.0, jitter=0.25, stall_timeout=2.0,
+                 stall_reconnect=None, vehicle=DEFAULT_VEHICLE):
+        """
+        Initialize the stream.
+
+        Args:
+            name (str): Key of the stream in TrickStreamPool.drain() results
+            host (str): Hostname or IP address of the Trick simulation
+            port (int): Port number for the variable server
+            queue_size (int): Maximum samples queued before the oldest are dropped
+            binary (bool): Request Trick's binary message format instead of ASCII
+            connect_timeout (float): Seconds to wait for each TCP connect
+            initial_backoff (float): Seconds to wait after the first failure
+            max_backoff (float): Longest wait between attempts
+            jitter (float): Random fraction (+/-) applied to every wait
+            stall_timeout (float): Seconds without data before the state is STALLED
+            stall_reconnect (float): Seconds without data before reconnecting,
+                or None to only report the stall
+            vehicle (str): Prefix of the vehicle to follow
+        """
+        TrickVariableClient.__init__(self, host, port, queue_size, binary, vehicle)
+        self.name = name
+        self.connect_timeout = connect_timeout
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.stall_timeout = stall_timeout
+        self.stall_reconnect = stall_reconnect
+
+        self.state = IDLE
+        self.attempts = 0
+        self.retry_time = 0.0
+        self.loop = None  # Event loop running the stream
+        self.writer = None  # asyncio.StreamWriter while connected
+
+    def status_text(self):
+        """Describe the connection state for a status label (see trick_client.status_text)."""
+        return status_text(self.state, self.last_receive_time, self.attempts, self.retry_time)
+
+    def send_commands(self, data):
+        """
+        Send raw commands from any thread; the write runs on the event loop.
+
+        Args:
+            data (bytes): Newline-terminated commands
+        """
+        writer = self.writer
+        if writer is None:
+            raise IOError("not connected")
+        self.loop.call_soon_threadsafe(writer.write, data)
+
+    async def run(self):
+        """Connect, read, and back off between attempts until cancelled."""
+        self.loop = asyncio.get_running_loop()
+        try:
+            while True:
+                self.state = CONNECTING
+                start = time.time()
+                try:
+                    reader, writer = await asyncio.wait_for(
+                        asyncio.open_connection(self.host, self.port), self.connect_timeout)
+                except (OSError, asyncio.TimeoutError) as e:
+                    print("Error connecting to Trick Variable Server {} at {}:{}: {}".format(
+                        self.name, self.host, self.port, e or "timed out"))
+                    await self._backoff()
+                    continue
+
+                self.reset_connection()
+                self.writer = writer
+                connected_time = self.last_receive_time = time.time()
+                try:
+                    writer.write(self.subscription().build())
+                    await writer.drain()
+                    self.setup_time = time.time() - start
+                    self.connected = True
+                    self.state = LIVE
+                    await self._read(reader)
+                except (OSError, ValueError) as e:
+                    print("Error reading from Trick Variable Server {}: {}".format(self.name, e))
+                finally:
+                    self._close(writer)
+
+                if self.last_receive_time > connected_time:
+                    # The connection delivered data, so retry quickly
+                    self.attempts = 0
+                await self._backoff()
+        finally:
+            self.state = IDLE
+
+    async def _read(self, reader):
+        """Parse and queue samples until the server closes or stalls too long."""
+        while True:
+            try:
+                data = await asyncio.wait_for(reader.read(self.recv_size), self.stall_timeout)
+            except asyncio.TimeoutError:
+                quiet = time.time() - self.last_receive_time
+                if self.stall_reconnect is not None and quiet > self.stall_reconnect:
+                    print("No data from Trick Variable Server {} for {:.1f} s, reconnecting".format(
+                        self.name, quiet))
+                    return
+                self.state = STALLED
+                continue
+
+            if not data:
+                # Server closed the connection
+                self.no_data = True
+                return
+            self.no_data = False
+            self.state = LIVE
+            self.last_receive_time = time.time()
+
+            self.rx_buffer += data
+            block = self._pop_samples()[0]
+            if len(block):
+                self.queue_block(self.last_receive_time, block)
+
+    async def _backoff(self):
+        """Wait before the next connect attempt."""
+        delay = backoff_delay(self.attempts, self.initial_backoff, self.max_backoff, self.jitter)
+        self.attempts += 1
+        self.retry_time = time.time() + delay
+        self.state = BACKOFF
+        await asyncio.sleep(delay)
+
+    def _close(self, writer):
+        """Unsubscribe (if the server is still there) and close the connection."""
+        self.connected = False
+        self.writer = None
+        try:
+            if not self.no_data:
+                writer.write(b"trick.var_pause()\ntrick.var_clear()\n")
+            writer.close()
+        except Exception:
+            pass
+
+    def disconnect(self):
+        """Close the connection; use TrickStreamPool.remove() to stop reconnecting."""
+        writer = self.writer
+        if writer is not None:
+            self.loop.call_soon_threadsafe(self._close, writer)
+
+
+class TrickStreamPool:
+    """
+    Runs any number of AsyncTrickStreams on one event loop thread.
+
+    Streams can be added and removed while the pool is running. The GUI
+    thread collects everything received since the last tick with drain(),
+    which returns a batch per stream.
+    """
+    def __init__(self):
+        """Initialize an empty, stopped pool."""
+        self.streams = {}  # name -> AsyncTrickStream
+        self.tasks = {}  # name -> asyncio.Task, while running
+        self.loop = None
+        self.thread = None
+        self.ready = threading.Event()
+        self.stopping = None  # asyncio.Event set by stop(), on the loop thread
+
+    @property
+    def running(self):
+        """True while the event loop thread is alive."""
+        return self.thread is not None and self.thread.is_alive()
+
+    def add(self, name, host="localhost", port=7108, **kwargs):
+        """
+        Add a stream; it starts connecting at once if the pool is running.
+
+        Args:
+            name (str): Unique stream name
+            host (str): Hostname or IP address of the Trick simulation
+            port (int): Port number for the variable server
+            **kwargs: Other AsyncTrickStream arguments
+
+        Returns:
+            AsyncTrickStream: The new stream
+        """
+        if name in self.streams:
+            raise ValueError("Stream {} already exists".format(name))
+        stream = AsyncTrickStream(name, host, port, **kwargs)
+        self.streams[name] = stream
+        if self.running:
+            self.loop.call_soon_threadsafe(self._start_task, stream)
+        return stream
+
+    def remove(self, name):
+        """
+        Disconnect a stream and stop it reconnecting.
+
+        Args:
+            name (str): Stream name
+        """
+        self.streams.pop(name, None)
+        if self.running:
+            self.loop.call_soon_threadsafe(self._cancel_task, name)
+
+    def start(self):
+        """Start the event loop thread and connect every stream."""
+        if self.running:
+            return
+        self.ready.clear()
+        self.thread = threading.Thread(target=self._run, name="TrickStreams")
+        self.thread.daemon = True
+        self.thread.start()
+        self.ready.wait()
+
+    def stop(self, timeout=2.0):
+        """
+        Disconnect every stream and stop the event loop thread.
+
+        Args:
+            timeout (float): Seconds to wait for the thread to exit
+        """
+        if not self.running:
+            return
+        self.loop.call_soon_threadsafe(self._cancel_all)
+        if self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+        self.thread = None
+
+    def drain(self, max_samples=None):
+        """
+        Collect queued samples from every stream without blocking.
+
+        Args:
+            max_samples (int): Maximum samples to take per stream, or None for all
+
+        Returns:
+            dict: Stream name -> (N, 10) samples in arrival order, only for
+                streams that received something
+        """
+        batches = {}
+        for name, stream in list(self.streams.items()):
+            batch = stream.drain(max_samples)
+            if len(batch):
+                batches[name] = batch
+        return batches
+
+    def _run(self):
+        """Event loop thread: run the streams until every task has finished."""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.stopping = asyncio.Event()
+        for stream in list(self.streams.values()):
+            self._start_task(stream)
+        self.ready.set()
+        try:
+            self.loop.run_until_complete(self.stopping.wait())
+            tasks = list(self.tasks.values())
+            if tasks:
+                self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        finally:
+            self.tasks = {}
+            self.loop.close()
+
+    def _start_task(self, stream):
+        """Start a stream's coroutine (on the loop thread)."""
+        self.tasks[stream.name] = self.loop.create_task(stream.run())
+
+    def _cancel_task(self, name):
+        """Cancel one stream's coroutine (on the loop thread)."""
+        task = self.tasks.pop(name, None)
+        if task is not None:
+            task.cancel()
+
+    def _cancel_all(self):
+        """Cancel every stream and let _run finish (on the loop thread)."""
+        for task in self.tasks.values():
+            task.cancel()
+        self.stopping.set()
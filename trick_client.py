@@ -0,0 +1,939 @@
+#!/usr/bin/env python
+"""
+Trick Variable Server client shared by the trajectory displays.
+Connects to the Trick Variable Server and retrieves Orion vehicle state data,
+either on demand from the caller's thread or from a background reader thread.
+Author: Generated for NASA Trick Project
+"""
+
+import random
+import select
+import socket
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from trick_parser import detect_byteorder, parse_rows, pop_binary, pop_chunk
+from trick_subscription import TrickSubscription
+
+
+# When the variable server copies values out of the sim (trick.var_set_copy_mode)
+COPY_ASYNC = 0  # On the variable server thread, every cycle
+COPY_SCHEDULED = 1  # At the end of the frame, every frame_multiple frames
+COPY_TOP_OF_FRAME = 2  # At the top of the frame, every frame_multiple frames
+
+# When the copied values are sent (trick.var_set_write_mode)
+WRITE_ASYNC = 0  # On the variable server thread, every cycle
+WRITE_WHEN_COPIED = 1  # Right after each copy, so messages line up with frames
+
+# Default var_cycle periods tried by tune_cycle(), in seconds
+TUNE_CYCLES = (0.1, 0.05, 0.02, 0.01, 0.005, 0.002, 0.001, 0.0005)
+
+# Vehicle whose state is subscribed to unless another prefix is given
+DEFAULT_VEHICLE = "Sim.Orion_1"
+
+# TrickConnectionManager states
+IDLE = "idle"
+CONNECTING = "connecting"
+LIVE = "live"
+STALLED = "stalled"
+BACKOFF = "backoff"
+
+
+def vehicle_vars(vehicle=DEFAULT_VEHICLE):
+    """
+    Get the variable names subscribed for one vehicle.
+
+    Args:
+        vehicle (str): Vehicle prefix in the sim, e.g. "Sim.Orion_2"
+
+    Returns:
+        list: Position, velocity and acceleration components, then UTC time
+    """
+    state = vehicle + ".Dyn.DVehModel.State.VState[0]."
+    names = []
+    for vector in ("R_CG_from_ECI_in_ECI", "V_CG_rel_ECI_in_ECI", "A_CG_rel_ECI_in_ECI"):
+        names.extend("{}{}[{}]".format(state, vector, i) for i in range(3))
+    names.append(vehicle + ".NEnv.itsSTimeModel.itsSTimeOutput.TimeData.UTC_Seconds_From_Epoch")
+    return names
+
+
+def backoff_delay(attempts, initial_backoff, max_backoff, jitter):
+    """
+    Get the wait before a reconnect attempt.
+
+    Args:
+        attempts (int): Consecutive failed attempts so far
+        initial_backoff (float): Seconds to wait after the first failure
+        max_backoff (float): Longest wait
+        jitter (float): Random fraction (+/-) applied to the wait
+
+    Returns:
+        float: initial_backoff doubled per failure, up to max_backoff, jittered
+    """
+    delay = min(max_backoff, initial_backoff * 2 ** min(attempts, 30))
+    return delay * (1.0 + random.uniform(-jitter, jitter))
+
+
+def status_text(state, last_receive_time, attempts, retry_time):
+    """
+    Describe a connection state for a status label.
+
+    Args:
+        state (str): IDLE, CONNECTING, LIVE, STALLED or BACKOFF
+        last_receive_time (float): Wall-clock time data last arrived
+        attempts (int): Consecutive failed attempts
+        retry_time (float): Wall-clock time of the next attempt
+
+    Returns:
+        str: e.g. "Live", "Stalled (3.1 s)" or "Retry 2 in 1.8 s"
+    """
+    if state == LIVE:
+        return "Live"
+    if state == STALLED:
+        return "Stalled ({:.1f} s)".format(time.time() - last_receive_time)
+    if state == CONNECTING:
+        return "Connecting..."
+    if state == BACKOFF:
+        return "Retry {} in {:.1f} s".format(attempts, max(0.0, retry_time - time.time()))
+    return "Not Connected"
+
+
+class TrickVariableClient:
+    """
+    Client to connect to Trick Variable Server and retrieve simulation data.
+
+    The client can be used in two ingest modes:
+      * direct - the caller polls update(), which blocks for one line, or
+        read_available(), which returns every complete line already received
+      * thread - start_reader() hands the socket to a background thread that
+        queues parsed samples; the caller collects them with drain()
+
+    With binary=True the server is asked for var_binary_nonames messages,
+    which skip number formatting on the server and parsing here; if the server
+    keeps sending ASCII the client falls back to it.
+
+    Received data is parsed in bulk (see trick_parser). Batches of samples
+    are (N, 10) float64 arrays with columns in history order:
+        (utc_seconds, pos_x, pos_y, pos_z, vel_x, vel_y, vel_z, acc_x, acc_y, acc_z)
+    """
+    def __init__(self, host="localhost", port=7108, queue_size=10000, binary=False,
+                 vehicle=DEFAULT_VEHICLE):
+        """
+        Initialize connection to Trick Variable Server.
+
+        Args:
+            host (str): Hostname or IP address of the Trick simulation
+            port (int): Port number for the variable server (default: 7108)
+            queue_size (int): Maximum samples held by the reader thread before
+                the oldest are dropped
+            binary (bool): Request Trick's binary message format instead of ASCII
+            vehicle (str): Prefix of the vehicle to follow (default: Sim.Orion_1)
+        """
+        self.host = host
+        self.port = port
+        self.vehicle = vehicle
+        self.client_socket = None
+        self.connected = False
+        self.no_data = False
+
+        # Bytes received but not yet parsed, filled from a reusable recv_into buffer
+        self.rx_buffer = bytearray()
+        self.recv_size = 65536
+        self.recv_buffer = bytearray(self.recv_size)
+        self.recv_view = memoryview(self.recv_buffer)
+
+        # Message format: binary is what was requested, binary_active what the
+        # server actually sends (None until the first bytes arrive)
+        self.binary = binary
+        self.binary_active = None
+        self.byteorder = "<"
+
+        # Server-side publishing settings, sent on connect (None: server default)
+        self.cycle = None  # var_cycle period in seconds
+        self.copy_mode = None  # COPY_* constant
+        self.write_mode = None  # WRITE_* constant
+        self.frame_multiple = None  # Frames between scheduled copies
+        self.sync = None  # var_sync mode, for servers without var_set_copy_mode
+
+        # Subscribe with several var_adds per line (see TrickSubscription)
+        self.combined_add = False
+        # Seconds the last connect took, from socket connect to commands sent
+        self.setup_time = None
+        # Wall-clock time bytes last arrived, for stall detection
+        self.last_receive_time = 0.0
+
+        # Data storage
+        self.position = [0.0, 0.0, 0.0]  # [X, Y, Z] in meters (ECI frame)
+        self.velocity = [0.0, 0.0, 0.0]  # [X, Y, Z] in m/s (ECI frame)
+        self.acceleration = [0.0, 0.0, 0.0]  # [X, Y, Z] in m/s^2 (ECI frame)
+        self.utc_seconds = 0.0  # Seconds from epoch
+
+        # Ingest latency tracking: wall-clock time the current sample arrived,
+        # and the smallest (arrival - sim time) offset seen this connection
+        self.receive_time = 0.0
+        self.min_clock_offset = None
+
+        # Background reader state: a deque of (receive_time, samples) blocks,
+        # one per recv, holding at most queue_size samples in total
+        self.samples = deque()
+        self.queued_samples = 0
+        self.queue_size = queue_size
+        self.queue_lock = threading.Lock()
+        self.dropped_samples = 0
+        self.reader_thread = None
+        self.reader_stop = threading.Event()
+
+        # PerfMonitor timing the "parse" stage (see perf_stats), if any
+        self.perf = None
+
+        # Trick variable names
+        self.trick_vars = vehicle_vars(vehicle)
+
+        # Values arrive in var_add order; samples put the time (last) first
+        self.column_order = [len(self.trick_vars) - 1] + list(range(len(self.trick_vars) - 1))
+
+    def connect(self, timeout=None):
+        """
+        Establish connection to Trick Variable Server.
+
+        Makes a single attempt; retrying is up to the caller (see
+        TrickConnectionManager).
+
+        Args:
+            timeout (float): Seconds to wait for the TCP connection, or None to
+                use the system default
+
+        Returns:
+            bool: True if connected and subscribed
+        """
+        try:
+            print("Connecting to Trick Variable Server at {}:{}...".format(self.host, self.port))
+            start = time.time()
+            self.client_socket = self.open_socket(timeout)
+            self.reset_connection()
+
+            # Pause, clear, add all variables and unpause in one write
+            self.subscription().send(self.client_socket)
+            self.client_socket.settimeout(None)
+            self.setup_time = time.time() - start
+            self.last_receive_time = time.time()
+
+            self.connected = True
+            print("Successfully connected to Trick Variable Server! (setup {:.1f} ms)".format(
+                self.setup_time * 1000))
+            return True
+
+        except Exception as e:
+            print("Error connecting to Trick Variable Server: {}".format(e))
+            if self.client_socket:
+                try:
+                    self.client_socket.close()
+                except:
+                    pass
+                self.client_socket = None
+            return False
+
+    def open_socket(self, timeout=None):
+        """
+        Open the connection to the variable server.
+
+        Args:
+            timeout (float): Seconds to wait for the connection, or None to
+                use the system default
+
+        Returns:
+            socket.socket: Connected socket, with timeout still set
+        """
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(timeout)
+            sock.connect((self.host, self.port))
+        except:
+            sock.close()
+            raise
+        return sock
+
+    def reset_connection(self):
+        """Forget parse and timing state left over from a previous connection."""
+        self.rx_buffer = bytearray()
+        self.binary_active = None
+        self.min_clock_offset = None
+        self.no_data = False
+
+    def subscription(self):
+        """
+        Build the command block sent on connect.
+
+        Returns:
+            TrickSubscription: var_adds for trick_vars, plus the binary format
+                and publishing settings
+        """
+        subscription = TrickSubscription(self.trick_vars, combined=self.combined_add)
+        if self.binary:
+            # Binary values without the variable names in every message
+            subscription.add_option("trick.var_binary_nonames()")
+        # Publishing rate and copy/write modes
+        for cmd in self.config_commands():
+            subscription.add_option(cmd)
+        return subscription
+
+    def configure(self, cycle=None, copy_mode=None, write_mode=None,
+                  frame_multiple=None, sync=None):
+        """
+        Set how the variable server publishes; arguments left as None are unchanged.
+
+        Settings are sent on every connect, and immediately if already connected.
+
+        Args:
+            cycle (float): Seconds between messages (trick.var_cycle)
+            copy_mode (int): COPY_ASYNC, COPY_SCHEDULED or COPY_TOP_OF_FRAME
+            write_mode (int): WRITE_ASYNC or WRITE_WHEN_COPIED
+            frame_multiple (int): Copy every this many frames (scheduled copy modes)
+            sync (int): trick.var_sync mode (0 async, 1 sync copy, 2 sync copy
+                and write), for Trick releases before var_set_copy_mode
+        """
+        changed = {}
+        for name, value in (("cycle", cycle), ("copy_mode", copy_mode),
+                            ("write_mode", write_mode),
+                            ("frame_multiple", frame_multiple), ("sync", sync)):
+            if value is not None:
+                setattr(self, name, value)
+                changed[name] = value
+
+        if self.connected and changed:
+            try:
+                commands = "".join(cmd + "\n" for cmd in self.config_commands(changed))
+                self.send_commands(commands.encode())
+            except Exception as e:
+                print("Error configuring Trick Variable Server: {}".format(e))
+
+    def send_commands(self, data):
+        """
+        Send raw commands to the connected variable server.
+
+        Args:
+            data (bytes): Newline-terminated commands
+        """
+        self.client_socket.sendall(data)
+
+    def config_commands(self, settings=None):
+        """
+        Build the variable server commands for the publishing settings.
+
+        Args:
+            settings (dict): Settings to send (default: every one that is set)
+
+        Returns:
+            list: Command strings, without newlines
+        """
+        if settings is None:
+            settings = {"cycle": self.cycle, "copy_mode": self.copy_mode,
+                        "write_mode": self.write_mode,
+                        "frame_multiple": self.frame_multiple, "sync": self.sync}
+
+        commands = []
+        if settings.get("sync") is not None:
+            commands.append("trick.var_sync({})".format(int(settings["sync"])))
+        if settings.get("copy_mode") is not None:
+            commands.append("trick.var_set_copy_mode({})".format(int(settings["copy_mode"])))
+        if settings.get("write_mode") is not None:
+            commands.append("trick.var_set_write_mode({})".format(int(settings["write_mode"])))
+        if settings.get("frame_multiple") is not None:
+            commands.append("trick.var_set_frame_multiple({})".format(int(settings["frame_multiple"])))
+        if settings.get("cycle") is not None:
+            commands.append("trick.var_cycle({!r})".format(float(settings["cycle"])))
+        return commands
+
+    def tune_cycle(self, cycles=TUNE_CYCLES, step_time=2.0, min_ratio=0.9):
+        """
+        Find the fastest var_cycle this client keeps up with.
+
+        Steps the cycle down through cycles, reading and parsing everything the
+        server sends for step_time seconds at each step. A step passes if the
+        received rate reaches min_ratio of the requested rate and the lag
+        (see get_lag) does not grow by more than a tenth of the step. Stops at
+        the first failing step and leaves the server on the fastest passing
+        cycle. Uses direct reads, so the reader thread must not be running.
+
+        Args:
+            cycles (tuple): Cycle periods to try in seconds, slowest first
+            step_time (float): Seconds to measure at each cycle
+            min_ratio (float): Fraction of the requested rate that must arrive
+
+        Returns:
+            tuple: (fastest passing cycle in seconds or None, list of
+                (cycle, received Hz, lag growth in seconds, passed) per step)
+        """
+        if not self.connected or self.reader_running:
+            return None, []
+
+        original = self.cycle
+        best = None
+        results = []
+        for cycle in cycles:
+            self.configure(cycle=cycle)
+            # Settle, then throw away what was sent at the previous rate
+            time.sleep(min(0.2, step_time / 4))
+            self.read_available()
+
+            received = 0
+            lag_start = None
+            start = time.time()
+            while time.time() - start < step_time and not self.no_data:
+                select.select([self.client_socket], [], [], 0.01)
+                batch = self.read_available()
+                received += len(batch)
+                if lag_start is None and len(batch):
+                    lag_start = self.get_lag()
+            elapsed = time.time() - start
+
+            rate = received / elapsed
+            lag_growth = self.get_lag() - lag_start if lag_start is not None else 0.0
+            passed = (received > 0 and rate >= min_ratio / cycle
+                      and lag_growth <= 0.1 * step_time)
+            results.append((cycle, rate, lag_growth, passed))
+            print("  var_cycle {:.4f} s: requested {:8.1f} Hz, received {:8.1f} Hz, "
+                  "lag {:+.3f} s  {}".format(cycle, 1.0 / cycle, rate, lag_growth,
+                                             "OK" if passed else "FALLING BEHIND"))
+            if not passed or self.no_data:
+                break
+            best = cycle
+
+        if best is not None:
+            self.configure(cycle=best)
+        elif original is not None:
+            self.configure(cycle=original)
+        return best, results
+
+    def parse_lines(self, chunk, count=None):
+        """
+        Parse lines from the variable server.
+
+        Args:
+            chunk (bytes or str): Tab-separated lines as sent by the server
+            count (int): Number of lines in chunk, if already known
+
+        Returns:
+            np.ndarray: (N, 10) samples in history order; incomplete or
+                malformed lines are skipped
+        """
+        rows = parse_rows(chunk, len(self.trick_vars), count)
+        return rows[:, self.column_order]
+
+    def parse_line(self, trick_server_data):
+        """
+        Parse one line from the variable server.
+
+        Args:
+            trick_server_data (str): Tab-separated line as sent by the server
+
+        Returns:
+            tuple: Sample in history order, or None if the line is incomplete
+        """
+        rows = self.parse_lines(trick_server_data, 1)
+        if len(rows) == 0:
+            return None
+        return tuple(rows[0].tolist())
+
+    def set_state(self, sample, receive_time=None):
+        """
+        Store a parsed sample as the current vehicle state.
+
+        Args:
+            sample (tuple or np.ndarray): Sample in history order
+            receive_time (float): Wall-clock time the sample arrived (default: now)
+        """
+        if isinstance(sample, np.ndarray):
+            sample = sample.tolist()
+        self.utc_seconds = sample[0]
+        self.position = [sample[1], sample[2], sample[3]]
+        self.velocity = [sample[4], sample[5], sample[6]]
+        self.acceleration = [sample[7], sample[8], sample[9]]
+
+        if receive_time is None:
+            receive_time = time.time()
+        self.receive_time = receive_time
+        offset = receive_time - self.utc_seconds
+        if self.min_clock_offset is None or offset < self.min_clock_offset:
+            self.min_clock_offset = offset
+
+    def get_lag(self):
+        """
+        Get how far the current sample trails the simulation, in seconds.
+
+        The sim clock and the local wall clock need not share an epoch, so the
+        lag is measured against the smallest arrival-minus-sim-time offset seen
+        on this connection. It grows when samples queue up anywhere between
+        the server and the display, and stays near zero while the display
+        keeps up.
+
+        Returns:
+            float: Lag in seconds, or 0.0 before the first sample
+        """
+        if self.min_clock_offset is None:
+            return 0.0
+        return max(0.0, (time.time() - self.utc_seconds) - self.min_clock_offset)
+
+    def _recv(self):
+        """
+        Receive available bytes into the parse buffer.
+
+        Returns:
+            bool: False if the server closed the connection
+        """
+        received = self.client_socket.recv_into(self.recv_buffer)
+        if not received:
+            return False
+        self.last_receive_time = time.time()
+        self.rx_buffer += self.recv_view[:received]
+        return True
+
+    def _detect_format(self):
+        """
+        Decide from the first bytes received whether the server sends binary.
+
+        ASCII rows start with the message type as a digit, binary messages
+        with a 4-byte integer indicator whose first byte is zero.
+
+        Returns:
+            bool: True once the format is known
+        """
+        if not self.rx_buffer:
+            return False
+        if not self.binary or self.rx_buffer[0] != 0:
+            if self.binary:
+                print("Variable server did not switch to binary, using ASCII")
+            self.binary_active = False
+            return True
+
+        byteorder = detect_byteorder(self.rx_buffer, len(self.trick_vars))
+        if byteorder is None:
+            return False
+        self.byteorder = byteorder
+        self.binary_active = True
+        return True
+
+    def _pop_samples(self, max_samples=None):
+        """
+        Parse complete messages out of the parse buffer.
+
+        Args:
+            max_samples (int): Maximum messages to take, or None for all
+
+        Returns:
+            tuple: ((N, 10) samples in history order, messages taken); N can
+                be less than the messages taken if some were malformed
+        """
+        if self.binary_active is None and not self._detect_format():
+            return np.empty((0, len(self.column_order))), 0
+
+        start = self.perf.start() if self.perf is not None else None
+        if self.binary_active:
+            rows, taken = pop_binary(self.rx_buffer, len(self.trick_vars),
+                                     max_samples, self.byteorder)
+        else:
+            chunk, taken = pop_chunk(self.rx_buffer, max_samples)
+            rows = parse_rows(chunk, len(self.trick_vars), taken)
+        rows = rows[:, self.column_order]
+        if start is not None:
+            self.perf.stop("parse", start)
+        return rows, taken
+
+    def update(self):
+        """
+        Update data from Trick Variable Server.
+
+        Returns:
+            bool: True if data was successfully updated, False otherwise
+        """
+        if not self.connected:
+            return False
+
+        try:
+            # Read one message from variable server
+            rows, taken = self._pop_samples(1)
+            while not taken:
+                if not self._recv():
+                    self.no_data = True
+                    return False
+                rows, taken = self._pop_samples(1)
+            self.no_data = False
+
+            if len(rows):
+                self.set_state(rows[-1])
+                return True
+            else:
+                return False
+
+        except Exception as e:
+            print("Error reading from Trick Variable Server: {}".format(e))
+            return False
+
+    def read_available(self, max_lines=None):
+        """
+        Parse every complete message already received, without blocking.
+
+        Drains the socket receive buffer first, so a server publishing faster
+        than the caller polls does not build up lag. Messages (lines or
+        binary messages) beyond max_lines stay buffered for the next call.
+
+        Args:
+            max_lines (int): Maximum messages to parse, or None for all
+
+        Returns:
+            np.ndarray: (N, 10) samples in history order (oldest first)
+        """
+        if not self.connected:
+            return np.empty((0, len(self.column_order)))
+
+        try:
+            while True:
+                readable, _, _ = select.select([self.client_socket], [], [], 0)
+                if not readable:
+                    break
+                if not self._recv():
+                    self.no_data = True
+                    break
+        except Exception as e:
+            print("Error reading from Trick Variable Server: {}".format(e))
+            self.no_data = True
+            return np.empty((0, len(self.column_order)))
+
+        try:
+            batch = self._pop_samples(max_lines)[0]
+        except ValueError as e:
+            print("Error parsing data from Trick Variable Server: {}".format(e))
+            return np.empty((0, len(self.column_order)))
+        if len(batch):
+            self.no_data = False
+            self.set_state(batch[-1])
+        return batch
+
+    def start_reader(self):
+        """
+        Start the background reader thread.
+
+        The thread owns the socket from here on; callers must use drain()
+        instead of update() until the client is disconnected. Samples still
+        queued from a previous connection are kept.
+
+        Returns:
+            bool: True if the reader is running, False if not connected
+        """
+        if not self.connected:
+            return False
+        if self.reader_thread is not None and self.reader_thread.is_alive():
+            return True
+
+        self.reader_stop.clear()
+        self.reader_thread = threading.Thread(target=self._reader_loop,
+                                              name="TrickReader")
+        self.reader_thread.daemon = True
+        self.reader_thread.start()
+        return True
+
+    def stop_reader(self, timeout=1.0):
+        """
+        Stop the background reader thread.
+
+        Args:
+            timeout (float): Seconds to wait for the thread to exit
+        """
+        self.reader_stop.set()
+        if self.reader_thread is not None:
+            if self.reader_thread is not threading.current_thread():
+                self.reader_thread.join(timeout)
+            self.reader_thread = None
+
+    def _reader_loop(self):
+        """Read and queue samples until stopped or the server closes the socket."""
+        while not self.reader_stop.is_set():
+            try:
+                received = self._recv()
+                if received:
+                    block = self._pop_samples()[0]
+            except Exception as e:
+                if not self.reader_stop.is_set():
+                    print("Error reading from Trick Variable Server: {}".format(e))
+                    self.no_data = True
+                break
+
+            if not received:
+                # Server closed the connection
+                self.no_data = True
+                break
+            self.no_data = False
+
+            if len(block):
+                self.queue_block(time.time(), block)
+
+    def queue_block(self, receive_time, block):
+        """
+        Queue parsed samples for drain(), dropping the oldest beyond queue_size.
+
+        Args:
+            receive_time (float): Wall-clock time the block arrived
+            block (np.ndarray): (N, 10) samples in history order
+        """
+        with self.queue_lock:
+            self.samples.append((receive_time, block))
+            self.queued_samples += len(block)
+            # Drop the oldest samples if the GUI has fallen behind
+            while self.queued_samples > self.queue_size:
+                excess = self.queued_samples - self.queue_size
+                oldest_time, oldest = self.samples[0]
+                if len(oldest) <= excess:
+                    self.samples.popleft()
+                    dropped = len(oldest)
+                else:
+                    self.samples[0] = (oldest_time, oldest[excess:])
+                    dropped = excess
+                self.queued_samples -= dropped
+                self.dropped_samples += dropped
+
+    def drain(self, max_samples=None):
+        """
+        Collect samples queued by the reader thread without blocking.
+
+        Args:
+            max_samples (int): Maximum samples to take, or None for all queued
+
+        Returns:
+            np.ndarray: (N, 10) samples in arrival order (oldest first)
+        """
+        blocks = []
+        receive_time = None
+        with self.queue_lock:
+            remaining = self.queued_samples
+            if max_samples is not None:
+                remaining = min(remaining, max_samples)
+            while remaining > 0:
+                receive_time, block = self.samples.popleft()
+                if len(block) > remaining:
+                    # Leave the rest of the block for the next call
+                    self.samples.appendleft((receive_time, block[remaining:]))
+                    block = block[:remaining]
+                blocks.append(block)
+                remaining -= len(block)
+                self.queued_samples -= len(block)
+
+        if not blocks:
+            return np.empty((0, len(self.column_order)))
+        batch = blocks[0] if len(blocks) == 1 else np.concatenate(blocks)
+        self.set_state(batch[-1], receive_time)
+        return batch
+
+    @property
+    def reader_running(self):
+        """True while the background reader thread is alive."""
+        return self.reader_thread is not None and self.reader_thread.is_alive()
+
+    def disconnect(self):
+        """Close connection to Trick Variable Server."""
+        self.reader_stop.set()
+        if self.client_socket:
+            try:
+                self.client_socket.sendall(b"trick.var_pause()\ntrick.var_clear()\n")
+                self.client_socket.shutdown(socket.SHUT_RDWR)
+            except:
+                pass
+            try:
+                self.client_socket.close()
+                print("Disconnected from Trick Variable Server")
+            except:
+                pass
+        self.stop_reader()
+        self.connected = False
+
+    def get_position(self):
+        """Get current position vector [X, Y, Z] in meters."""
+        return self.position.copy()
+
+    def get_velocity(self):
+        """Get current velocity vector [X, Y, Z] in m/s."""
+        return self.velocity.copy()
+
+    def get_acceleration(self):
+        """Get current acceleration vector [X, Y, Z] in m/s^2."""
+        return self.acceleration.copy()
+
+    def get_time(self):
+        """Get current UTC seconds from epoch."""
+        return self.utc_seconds
+
+
+class TrickConnectionManager:
+    """
+    Keeps a TrickVariableClient connected from a background thread.
+
+    Connect attempts run off the GUI thread with a connect timeout. After a
+    failure or a lost connection the manager waits with bounded exponential
+    backoff plus jitter, then tries again. The caller's history buffers are
+    untouched, so ingestion simply resumes when the connection comes back.
+
+    The current state is one of IDLE, CONNECTING, LIVE, STALLED (connected
+    but nothing received for stall_timeout seconds) or BACKOFF (waiting to
+    retry); status_text() formats it for a status label.
+    """
+    def __init__(self, client, start_reader=True, connect_timeout=3.0,
+                 initial_backoff=0.5, max_backoff=30.0, jitter=0.25,
+                 stall_timeout=2.0, stall_reconnect=None):
+        """
+        Initialize the connection manager.
+
+        Args:
+            client (TrickVariableClient): Client to keep connected
+            start_reader (bool): Start the client's reader thread on each connect
+            connect_timeout (float): Seconds to wait for each TCP connect
+            initial_backoff (float): Seconds to wait after the first failure
+            max_backoff (float): Longest wait between attempts
+            jitter (float): Random fraction (+/-) applied to every wait, so many
+                displays do not retry in lockstep
+            stall_timeout (float): Seconds without data before the state is STALLED
+            stall_reconnect (float): Seconds without data before reconnecting,
+                or None to only report the stall
+        """
+        self.client = client
+        self.start_reader = start_reader
+        self.connect_timeout = connect_timeout
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.stall_timeout = stall_timeout
+        self.stall_reconnect = stall_reconnect
+
+        self.state = IDLE
+        self.attempts = 0  # Consecutive failed attempts
+        self.retry_time = 0.0  # Wall-clock time of the next attempt (BACKOFF)
+        self.thread = None
+        self.stop_event = threading.Event()
+        # Held while the thread decides to exit and while start() takes it over
+        self.lock = threading.Lock()
+        self.exiting = False  # The thread saw the stop and is finishing
+
+    @property
+    def running(self):
+        """True while the manager thread is alive and not stopping."""
+        return (self.thread is not None and self.thread.is_alive() and
+                not self.stop_event.is_set())
+
+    def start(self):
+        """
+        Start connecting in the background (no-op if already running).
+
+        A thread stopped during a connect attempt that has not returned yet
+        is taken over instead: the stop is cancelled and it carries on.
+        """
+        with self.lock:
+            if self.thread is not None and self.thread.is_alive() and not self.exiting:
+                if self.stop_event.is_set():
+                    self.stop_event.clear()
+                    self.state = CONNECTING
+                return
+        if self.thread is not None and self.thread is not threading.current_thread():
+            # Only the exiting thread's final disconnect is left
+            self.thread.join()
+        self.stop_event.clear()
+        self.exiting = False
+        self.attempts = 0
+        self.state = CONNECTING
+        self.thread = threading.Thread(target=self._run, name="TrickConnection")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self, timeout=0.5):
+        """
+        Stop reconnecting and disconnect the client.
+
+        Args:
+            timeout (float): Seconds to wait for the manager thread; a thread
+                still inside a connect attempt disconnects when it returns
+        """
+        self.stop_event.set()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = None
+            if self.client.connected:
+                self.client.disconnect()
+        self.state = IDLE
+
+    def backoff_delay(self):
+        """
+        Get the wait before the next attempt.
+
+        Returns:
+            float: initial_backoff doubled per consecutive failure, up to
+                max_backoff, with +/- jitter applied
+        """
+        return backoff_delay(self.attempts, self.initial_backoff, self.max_backoff, self.jitter)
+
+    def status_text(self):
+        """
+        Describe the current state for a status label.
+
+        Returns:
+            str: e.g. "Live", "Stalled (3.1 s)" or "Retry 2 in 1.8 s"
+        """
+        return status_text(self.state, self.client.last_receive_time,
+                           self.attempts, self.retry_time)
+
+    def _run(self):
+        """Connect, watch the connection, and back off between attempts until stopped."""
+        while not self._stopped():
+            self.state = CONNECTING
+            if self.client.connect(self.connect_timeout):
+                if self._stopped():
+                    break
+                connected_time = time.time()
+                if self.start_reader:
+                    self.client.start_reader()
+                self.state = LIVE
+                self._watch()
+                self.client.disconnect()
+                if self._stopped():
+                    break
+                if self.client.last_receive_time > connected_time:
+                    # The connection delivered data, so retry quickly; a server
+                    # that accepts and then hangs up keeps backing off
+                    self.attempts = 0
+
+            delay = self.backoff_delay()
+            self.attempts += 1
+            self.retry_time = time.time() + delay
+            self.state = BACKOFF
+            self.stop_event.wait(delay)
+
+        if self.client.connected:
+            self.client.disconnect()
+        self.state = IDLE
+
+    def _stopped(self):
+        """
+        Check for a stop request; once one is seen the thread exits.
+
+        Returns:
+            bool: True if the thread must exit
+        """
+        with self.lock:
+            self.exiting = self.stop_event.is_set()
+            return self.exiting
+
+    def _watch(self):
+        """Track LIVE/STALLED until the connection is lost or the manager stops."""
+        while not self.stop_event.wait(0.1):
+            if self.client.no_data:
+                # Server closed the connection
+                return
+            if self.start_reader and not self.client.reader_running:
+                # Reader thread exited on a socket error
+                return
+
+            quiet = time.time() - self.client.last_receive_time
+            if self.stall_reconnect is not None and quiet > self.stall_reconnect:
+                print("No data from Trick Variable Server for {:.1f} s, reconnecting".format(quiet))
+                return
+            self.state = STALLED if quiet > self.stall_timeout else LIVE
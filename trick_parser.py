@@ -0,0 +1,261 @@
+#!/usr/bin/env python
+"""
+Bulk parser for Trick Variable Server rows.
+Turns a chunk of many received ASCII lines, or var_binary messages, into one
+2-D float64 NumPy array, so clients draining hundreds of rows per tick do not
+split and float() every field in Python.
+Author: Generated for NASA Trick Project
+"""
+
+import struct
+import warnings
+
+import numpy as np
+
+
+# Message indicator of a variable list message
+VS_VAR_LIST = 0
+
+# Trick parameter type codes (parameter_types.h)
+TRICK_DOUBLE = 11
+SIGNED_TYPES = (1, 4, 6, 8, 14)  # char, short, int, long, long long
+UNSIGNED_TYPES = (2, 5, 7, 9, 15, 17)  # unsigned char/short/int/long/long long, bool
+FLOAT_TYPES = (10, 11)  # float, double
+
+# struct formats by size for each kind of numeric type
+SIGNED_FORMATS = {1: "b", 2: "h", 4: "i", 8: "q"}
+UNSIGNED_FORMATS = {1: "B", 2: "H", 4: "I", 8: "Q"}
+FLOAT_FORMATS = {4: "f", 8: "d"}
+
+
+def pop_chunk(buffer, max_lines=None):
+    """
+    Remove complete lines from a receive buffer.
+
+    Args:
+        buffer (bytearray): Received bytes; complete lines are deleted from it
+        max_lines (int): Maximum lines to take, or None for all
+
+    Returns:
+        tuple: (chunk, count) where chunk holds the lines joined by newlines
+            (without the final one) and count is the number of lines taken
+    """
+    if max_lines is None:
+        end = buffer.rfind(b"\n")
+        count = buffer.count(b"\n", 0, end + 1)
+    else:
+        end = -1
+        count = 0
+        while count < max_lines:
+            next_end = buffer.find(b"\n", end + 1)
+            if next_end < 0:
+                break
+            end = next_end
+            count += 1
+    if end < 0:
+        return b"", 0
+
+    chunk = bytes(buffer[:end])
+    del buffer[:end + 1]
+    return chunk, count
+
+
+def parse_rows(chunk, nvars, count=None):
+    """
+    Parse variable server lines into an array of values.
+
+    Each line is the message type followed by nvars tab-separated values in
+    var_add order. When every line has exactly nvars tabs, the whole chunk is
+    parsed with a single np.fromstring call; otherwise, or if that fails (a
+    malformed, partial or non-data line somewhere in the chunk), it is parsed
+    again line by line, skipping the bad lines.
+
+    Args:
+        chunk (bytes or str): One or more lines separated by newlines
+        nvars (int): Number of variables subscribed
+        count (int): Number of lines in chunk, if already known
+
+    Returns:
+        np.ndarray: (N, nvars) float64 values in var_add order, one row per
+            valid line (the message type column is dropped)
+    """
+    width = nvars + 1
+    newline = b"\n" if isinstance(chunk, bytes) else "\n"
+    tab = b"\t" if isinstance(chunk, bytes) else "\t"
+    chunk = chunk.strip()
+    if not chunk:
+        return np.empty((0, nvars))
+    if count is None:
+        count = chunk.count(newline) + 1
+
+    # Fast path: every line is a complete data row (checked per line, since a
+    # line with an extra field and one missing a field add up to the right total)
+    if lines_aligned(chunk, nvars):
+        try:
+            with warnings.catch_warnings():
+                # Older NumPy warns and returns a partial result instead of raising
+                warnings.simplefilter("ignore", DeprecationWarning)
+                values = np.fromstring(chunk, sep=" ")
+        except ValueError:
+            values = None
+        if values is not None and values.size == count * width:
+            return values.reshape(count, width)[:, 1:]
+
+    # Slow path: keep only the lines that parse to at least nvars values
+    rows = []
+    for line in chunk.split(newline):
+        fields = line.strip().split(tab)
+        if len(fields) < width:
+            continue
+        try:
+            rows.append([float(value) for value in fields[1:width]])
+        except ValueError:
+            continue
+    if not rows:
+        return np.empty((0, nvars))
+    return np.array(rows, dtype=np.float64)
+
+
+def lines_aligned(chunk, nvars):
+    """
+    Check that every line of a chunk has exactly nvars tab separators.
+
+    Args:
+        chunk (bytes or str): Lines separated by newlines, without a final one
+        nvars (int): Number of variables subscribed
+
+    Returns:
+        bool: True if every line has nvars + 1 fields
+    """
+    if not isinstance(chunk, bytes):
+        chunk = chunk.encode("utf-8")
+    data = np.frombuffer(chunk, np.uint8)
+    tabs = np.flatnonzero(data == ord("\t"))
+    newlines = np.flatnonzero(data == ord("\n"))
+    # Tabs before each newline, then in total; consecutive differences are per line
+    before = np.append(np.searchsorted(tabs, newlines), len(tabs))
+    return bool((np.diff(before, prepend=0) == nvars).all())
+
+
+def binary_dtype(nvars, byteorder="<"):
+    """
+    Get the layout of a var_binary_nonames message holding nvars doubles.
+
+    Args:
+        nvars (int): Number of variables subscribed
+        byteorder (str): "<" or ">" for the server's byte order
+
+    Returns:
+        np.dtype: Structured dtype of one whole message
+    """
+    int32 = byteorder + "i4"
+    var = [("type", int32), ("size", int32), ("value", byteorder + "f8")]
+    return np.dtype([("indicator", int32), ("size", int32), ("nvars", int32),
+                     ("vars", var, (nvars,))])
+
+
+def detect_byteorder(buffer, nvars):
+    """
+    Work out the server's byte order from the start of a binary message.
+
+    Args:
+        buffer (bytearray): Received bytes, starting at a message
+        nvars (int): Number of variables subscribed
+
+    Returns:
+        str: "<" or ">", or None if fewer than 12 bytes have arrived
+    """
+    if len(buffer) < 12:
+        return None
+    if struct.unpack_from(">i", buffer, 8)[0] == nvars:
+        return ">"
+    return "<"
+
+
+def pop_binary(buffer, nvars, max_messages=None, byteorder="<"):
+    """
+    Remove complete var_binary_nonames messages from a receive buffer.
+
+    Each message is an indicator, a size (bytes after the indicator), the
+    variable count, then a (type, size, value) triple per variable. When every
+    variable is a double the messages have a fixed layout and the whole run is
+    decoded with one np.frombuffer call; anything else (other types, other
+    message kinds) is walked message by message with struct.
+
+    Args:
+        buffer (bytearray): Received bytes; complete messages are deleted from it
+        nvars (int): Number of variables subscribed
+        max_messages (int): Maximum messages to take, or None for all
+        byteorder (str): "<" or ">" for the server's byte order
+
+    Returns:
+        tuple: ((N, nvars) float64 values in var_add order, messages taken)
+    """
+    dtype = binary_dtype(nvars, byteorder)
+    count = len(buffer) // dtype.itemsize
+    if max_messages is not None:
+        count = min(count, max_messages)
+
+    if count:
+        messages = np.frombuffer(buffer, dtype, count)
+        fixed = ((messages["indicator"] == VS_VAR_LIST).all()
+                 and (messages["size"] == dtype.itemsize - 4).all()
+                 and (messages["nvars"] == nvars).all()
+                 and (messages["vars"]["type"] == TRICK_DOUBLE).all()
+                 and (messages["vars"]["size"] == 8).all())
+        if fixed:
+            rows = messages["vars"]["value"].astype(np.float64)
+            # Release the view before resizing the buffer
+            del messages
+            del buffer[:count * dtype.itemsize]
+            return rows, count
+        del messages
+
+    return _pop_binary_messages(buffer, nvars, max_messages, byteorder)
+
+
+def _pop_binary_messages(buffer, nvars, max_messages, byteorder):
+    """Walk binary messages one at a time (see pop_binary)."""
+    header = struct.Struct(byteorder + "iii")
+    var_header = struct.Struct(byteorder + "ii")
+
+    rows = []
+    offset = 0
+    count = 0
+    while max_messages is None or count < max_messages:
+        if len(buffer) - offset < header.size:
+            break
+        indicator, size, n = header.unpack_from(buffer, offset)
+        if size < header.size - 4:
+            raise ValueError("Corrupt binary message (size {})".format(size))
+        end = offset + 4 + size
+        if end > len(buffer):
+            break
+
+        if indicator == VS_VAR_LIST and n == nvars:
+            values = []
+            position = offset + header.size
+            for _ in range(n):
+                var_type, var_size = var_header.unpack_from(buffer, position)
+                position += var_header.size
+                if var_type in FLOAT_TYPES:
+                    fmt = FLOAT_FORMATS.get(var_size)
+                elif var_type in SIGNED_TYPES:
+                    fmt = SIGNED_FORMATS.get(var_size)
+                elif var_type in UNSIGNED_TYPES:
+                    fmt = UNSIGNED_FORMATS.get(var_size)
+                else:
+                    fmt = None
+                if fmt is None:
+                    values.append(float("nan"))
+                else:
+                    values.append(float(struct.unpack_from(byteorder + fmt, buffer, position)[0]))
+                position += var_size
+            rows.append(values)
+        offset = end
+        count += 1
+
+    del buffer[:offset]
+    if not rows:
+        return np.empty((0, nvars)), count
+    return np.array(rows, dtype=np.float64), count
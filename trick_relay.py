@@ -0,0 +1,605 @@
+#!/usr/bin/env python
+"""
+Trajectory relay: one Trick Variable Server subscription shared by many displays.
+The relay follows each vehicle with a single TrickVariableClient and
+re-broadcasts the parsed samples to any number of subscribers over TCP or a
+Unix socket, as compact binary frames of float64 rows. Subscribers that join
+late first receive the recent history held in the relay's ring buffer.
+
+Usage:
+    python trick_relay.py [sim_host] [sim_port] [--listen HOST:PORT | --listen unix:PATH]
+                          [--vehicles A,B,...] [--binary] [--cycle SECONDS]
+                          [--backfill ROWS] [--quiet]
+
+Displays attach with --relay, giving the relay's address instead of the sim's:
+    python flight_trajectory_display.py localhost 7200 --relay
+    python flight_trajectory_display.py unix:/tmp/orion_relay.sock --relay
+
+Protocol: the subscriber sends one line, "relay_subscribe <vehicle> <backfill rows>
+[<after time>]", and then receives frames (or one "relay_error <reason>" line if the relay does
+not serve that vehicle); each is a 12-byte header (b"TRLY", uint32 rows,
+uint32 columns, little-endian) followed by rows * columns little-endian
+float64 values in history order. With an after time (sent by a reconnecting
+RelayClient) only backfill samples newer than it are sent. Any later lines from the subscriber (such
+as the var_pause/var_clear sent on disconnect) are ignored.
+Author: Generated for NASA Trick Project
+"""
+
+import os
+import re
+import signal
+import socket
+import struct
+import sys
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from trick_client import TrickVariableClient, TrickConnectionManager, DEFAULT_VEHICLE
+from trajectory_history import TrajectoryHistory, COLUMNS, TIME
+
+FRAME_MAGIC = b"TRLY"
+FRAME_HEADER = struct.Struct("<4sII")  # Magic, rows, columns
+FRAME_DTYPE = np.dtype("<f8")
+FRAME_ROWS = 10000  # Most rows per frame
+DEFAULT_PORT = 7200
+BACKFILL_ROWS = 100000  # Recent samples kept per vehicle for late joiners
+SUBSCRIBER_ROWS = 200000  # Samples queued per subscriber before the oldest are dropped
+QUEUE_SIZE = 1000000  # Samples an upstream reader may queue between pumps
+TICK = 0.01  # Seconds between pumps of the upstream queues
+REPORT_INTERVAL = 10.0  # Seconds between status lines
+SUBSCRIBE_LINE_SIZE = 1024  # Longest subscribe line accepted
+ERROR_PREFIX = b"relay_error "
+
+# Vehicle prefixes are formatted into var_add commands, which the variable
+# server runs as Python, so only plain dotted names are accepted
+VEHICLE_PATTERN = re.compile(r"^[A-Za-z_][\w.\[\]]*$")
+
+
+def parse_address(text, default_port=DEFAULT_PORT):
+    """
+    Parse a relay address.
+
+    Args:
+        text (str): "host:port", "host", or "unix:/path/to/socket"
+        default_port (int): Port used when none is given
+
+    Returns:
+        tuple: ("unix", path) or (host, port)
+    """
+    if text.startswith("unix:"):
+        return "unix", text[len("unix:"):]
+    host, _, port = text.rpartition(":") if ":" in text else (text, None, "")
+    return host or "localhost", int(port) if port else default_port
+
+
+def encode_frames(rows):
+    """
+    Encode samples as relay frames.
+
+    Args:
+        rows (np.ndarray): (N, columns) samples
+
+    Returns:
+        bytes: One frame per FRAME_ROWS rows
+    """
+    rows = np.asarray(rows, dtype=FRAME_DTYPE)
+    frames = []
+    for start in range(0, len(rows), FRAME_ROWS):
+        chunk = rows[start:start + FRAME_ROWS]
+        frames.append(FRAME_HEADER.pack(FRAME_MAGIC, chunk.shape[0], chunk.shape[1]))
+        frames.append(np.ascontiguousarray(chunk).tobytes())
+    return b"".join(frames)
+
+
+def pop_frames(buffer, columns, max_rows=None):
+    """
+    Parse complete frames out of a receive buffer.
+
+    A frame holding more than max_rows rows is split: the rest stays in the
+    buffer as a smaller frame.
+
+    Args:
+        buffer (bytearray): Received bytes; parsed frames are removed
+        columns (int): Expected values per row
+        max_rows (int): Most rows to take, or None for all
+
+    Returns:
+        tuple: ((N, columns) samples, frames taken)
+
+    Raises:
+        ValueError: The buffer does not start with a frame of the expected shape
+    """
+    blocks = []
+    taken = 0
+    offset = 0
+    remaining = max_rows
+    while len(buffer) - offset >= FRAME_HEADER.size and remaining != 0:
+        magic, rows, frame_columns = FRAME_HEADER.unpack_from(buffer, offset)
+        if magic != FRAME_MAGIC or frame_columns != columns:
+            raise ValueError("Bad relay frame (magic {!r}, {} columns)".format(magic, frame_columns))
+        body = offset + FRAME_HEADER.size
+        end = body + rows * columns * FRAME_DTYPE.itemsize
+        if len(buffer) < end:
+            break
+
+        if remaining is not None and rows > remaining:
+            # Take the first rows, leaving a frame of the rest in the buffer
+            split = body + remaining * columns * FRAME_DTYPE.itemsize
+            blocks.append(np.frombuffer(bytes(buffer[body:split]), FRAME_DTYPE).reshape(-1, columns))
+            del buffer[:split]
+            buffer[:0] = FRAME_HEADER.pack(FRAME_MAGIC, rows - remaining, columns)
+            taken += 1
+            offset = 0
+            break
+
+        blocks.append(np.frombuffer(bytes(buffer[body:end]), FRAME_DTYPE).reshape(-1, columns))
+        taken += 1
+        offset = end
+        if remaining is not None:
+            remaining -= rows
+    del buffer[:offset]
+
+    if not blocks:
+        return np.empty((0, columns)), taken
+    return (blocks[0] if len(blocks) == 1 else np.concatenate(blocks)), taken
+
+
+class RelaySubscription:
+    """The subscribe line a RelayClient sends on connect (see TrickSubscription)."""
+
+    def __init__(self, vehicle, backfill, after=None):
+        self.vehicle = vehicle
+        self.backfill = backfill
+        self.after = after  # Backfill only samples newer than this time
+
+    def commands(self):
+        """Get the command lines, without newlines."""
+        command = "relay_subscribe {} {}".format(self.vehicle, int(self.backfill))
+        if self.after is not None:
+            command += " {!r}".format(float(self.after))
+        return [command]
+
+    def send(self, sock):
+        """
+        Send the subscribe line.
+
+        Args:
+            sock (socket.socket): Connected relay socket
+
+        Returns:
+            float: Seconds spent sending
+        """
+        start = time.time()
+        sock.sendall("".join(cmd + "\n" for cmd in self.commands()).encode())
+        return time.time() - start
+
+
+class RelayClient(TrickVariableClient):
+    """
+    TrickVariableClient that follows a vehicle through a TrickRelay.
+
+    Connects to the relay (host may be "unix:/path" for a Unix socket)
+    instead of the sim, and parses relay frames instead of variable server
+    messages; reconnecting, the reader thread, drain() and the state
+    accessors are inherited, so the displays and TrickConnectionManager use
+    it unchanged. Publishing settings (configure()) are ignored by the relay.
+    """
+    def __init__(self, host="localhost", port=DEFAULT_PORT, queue_size=10000, binary=False,
+                 vehicle=DEFAULT_VEHICLE, backfill=BACKFILL_ROWS):
+        """
+        Initialize the client.
+
+        Args:
+            host (str): Relay host, or "unix:/path" for a Unix socket
+            port (int): Relay port (ignored for Unix sockets)
+            queue_size (int): Maximum samples held by the reader thread
+            binary (bool): Ignored; relay frames are always binary
+            vehicle (str): Prefix of the vehicle to follow
+            backfill (int): Recent samples to ask for on connect; reconnects
+                ask only for the samples missed since the last one received
+        """
+        TrickVariableClient.__init__(self, host, port, queue_size, binary, vehicle)
+        self.backfill = backfill
+        # Time of the last sample received, kept across reconnects
+        self.last_time = None
+        # Backfill can be larger than the default queue
+        self.queue_size = max(queue_size, backfill)
+
+    def open_socket(self, timeout=None):
+        """Open the TCP or Unix socket connection to the relay."""
+        if not str(self.host).startswith("unix:"):
+            return TrickVariableClient.open_socket(self, timeout)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(timeout)
+            sock.connect(self.host[len("unix:"):])
+        except:
+            sock.close()
+            raise
+        return sock
+
+    def subscription(self):
+        """Build the subscribe line sent on connect."""
+        return RelaySubscription(self.vehicle, self.backfill, self.last_time)
+
+    def _pop_samples(self, max_samples=None):
+        """
+        Parse complete frames out of the parse buffer.
+
+        Args:
+            max_samples (int): Maximum samples to take, or None for all
+
+        Returns:
+            tuple: ((N, 10) samples in history order, frames taken)
+        """
+        if self.rx_buffer.startswith(ERROR_PREFIX):
+            # Refused by the relay (e.g. a vehicle it does not follow)
+            raise ValueError(bytes(self.rx_buffer).split(b"\n", 1)[0].decode("utf-8", "replace"))
+        start = self.perf.start() if self.perf is not None else None
+        rows, taken = pop_frames(self.rx_buffer, len(COLUMNS), max_samples)
+        if len(rows):
+            self.last_time = rows[-1, TIME]
+        if start is not None:
+            self.perf.stop("parse", start)
+        return rows, taken
+
+
+class RelaySubscriber:
+    """
+    One subscriber connection.
+
+    Frames are queued by the relay's pump thread and sent by the
+    subscriber's own thread, so a slow subscriber never delays the others;
+    past max_rows queued samples its oldest frames are dropped.
+    """
+    def __init__(self, sock, address, max_rows=SUBSCRIBER_ROWS):
+        self.sock = sock
+        self.address = address
+        self.max_rows = max_rows
+        self.vehicle = None
+        self.frames = deque()  # (bytes, rows)
+        self.queued_rows = 0
+        self.rows_sent = 0
+        self.dropped_rows = 0
+        self.closed = False
+        self.condition = threading.Condition()
+
+    def enqueue(self, frames, rows):
+        """
+        Queue encoded frames for sending (safe to call from any thread).
+
+        Args:
+            frames (bytes): Encoded frames
+            rows (int): Samples in the frames
+        """
+        with self.condition:
+            if self.closed:
+                return
+            self.frames.append((frames, rows))
+            self.queued_rows += rows
+            while self.queued_rows > self.max_rows and len(self.frames) > 1:
+                dropped = self.frames.popleft()[1]
+                self.queued_rows -= dropped
+                self.dropped_rows += dropped
+            self.condition.notify()
+
+    def close(self):
+        """Stop sending and close the socket."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+    def send_loop(self):
+        """Sender thread: send queued frames until closed."""
+        while True:
+            with self.condition:
+                while not self.frames and not self.closed:
+                    self.condition.wait()
+                if self.closed:
+                    return
+                data = b"".join(frames for frames, rows in self.frames)
+                rows = self.queued_rows
+                self.frames.clear()
+                self.queued_rows = 0
+            try:
+                self.sock.sendall(data)
+            except OSError:
+                self.close()
+                return
+            self.rows_sent += rows
+
+
+class RelayFeed:
+    """One upstream vehicle: its client, connection manager, backfill ring and subscribers."""
+
+    def __init__(self, vehicle, host, port, binary=False, cycle=None, backfill=BACKFILL_ROWS):
+        self.vehicle = vehicle
+        self.client = TrickVariableClient(host, port, QUEUE_SIZE, binary=binary, vehicle=vehicle)
+        if cycle is not None:
+            self.client.configure(cycle=cycle)
+        self.connection = TrickConnectionManager(self.client)
+        # Extents are not needed, so none are tracked
+        self.history = TrajectoryHistory(backfill, tracked=())
+        self.subscribers = []
+        self.lock = threading.Lock()  # Orders backfills against broadcasts
+        self.received = 0
+
+
+class TrickRelay:
+    """
+    Shares one upstream subscription per vehicle among many subscribers.
+
+    Only the vehicles given are followed; subscribers asking for any other
+    vehicle are refused, so they cannot add upstream connections or have
+    their vehicle name sent to the sim. A pump thread drains every feed's reader queue each
+    TICK, appends the samples to the feed's ring buffer and queues them as
+    frames for its subscribers. A new subscriber gets the requested backfill
+    from the ring first, taken under the same lock, so it sees every sample
+    exactly once.
+    """
+    def __init__(self, host="localhost", port=7108, listen=("localhost", DEFAULT_PORT),
+                 vehicles=None, binary=False, cycle=None, backfill=BACKFILL_ROWS, verbose=True):
+        """
+        Initialize the relay (call start() to listen).
+
+        Args:
+            host (str): Trick Variable Server host
+            port (int): Trick Variable Server port
+            listen (tuple): (host, port) to listen on (port 0 for any free
+                port, see self.listen), or ("unix", path)
+            vehicles (list): Vehicle prefixes served (default: Sim.Orion_1)
+            binary (bool): Ask the variable server for binary messages
+            cycle (float): var_cycle period to request, or None for the server's
+            backfill (int): Recent samples kept per vehicle for late joiners
+            verbose (bool): Print subscribers joining and leaving
+
+        Raises:
+            ValueError: A vehicle is not a plain dotted name (see VEHICLE_PATTERN)
+        """
+        self.host = host
+        self.port = port
+        self.listen = listen
+        self.binary = binary
+        self.cycle = cycle
+        self.backfill = backfill
+        self.verbose = verbose
+
+        self.listener = None
+        self.stop_event = threading.Event()
+        self.threads = []
+
+        self.feeds = {}  # Vehicle -> RelayFeed
+        for vehicle in vehicles or [DEFAULT_VEHICLE]:
+            if not VEHICLE_PATTERN.match(vehicle):
+                raise ValueError("Invalid vehicle name: {!r}".format(vehicle))
+            self.feeds[vehicle] = RelayFeed(vehicle, host, port, binary, cycle, backfill)
+
+    def log(self, message):
+        """Print a message unless quiet."""
+        if self.verbose:
+            print(message)
+
+    def start(self):
+        """Connect every feed, listen for subscribers and start pumping."""
+        if self.listen[0] == "unix":
+            path = self.listen[1]
+            if os.path.exists(path):
+                os.remove(path)  # Left by a relay that did not shut down
+            self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.listener.bind(path)
+        else:
+            self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.listener.bind(self.listen)
+            self.listen = self.listener.getsockname()[:2]
+        self.listener.listen(64)
+        self.listener.settimeout(0.2)
+
+        self.stop_event.clear()
+        for feed in list(self.feeds.values()):
+            feed.connection.start()
+        for target, name in ((self._accept, "RelayAccept"), (self._pump, "RelayPump")):
+            thread = threading.Thread(target=target, name=name)
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self):
+        """Disconnect upstream and every subscriber."""
+        self.stop_event.set()
+        for thread in self.threads:
+            thread.join(1.0)
+        self.threads = []
+        for feed in list(self.feeds.values()):
+            feed.connection.stop()
+            with feed.lock:
+                for subscriber in feed.subscribers:
+                    subscriber.close()
+                feed.subscribers = []
+        if self.listener is not None:
+            self.listener.close()
+            self.listener = None
+            if self.listen[0] == "unix" and os.path.exists(self.listen[1]):
+                os.remove(self.listen[1])
+
+    def _accept(self):
+        """Accept thread: start a handler thread per subscriber."""
+        while not self.stop_event.is_set():
+            try:
+                sock, address = self.listener.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            if sock.family != socket.AF_UNIX:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            subscriber = RelaySubscriber(sock, address or "unix socket")
+            thread = threading.Thread(target=self._serve, args=(subscriber,), name="RelaySubscriber")
+            thread.daemon = True
+            thread.start()
+
+    def _serve(self, subscriber):
+        """Handler thread: read the subscribe line, send the backfill, then wait for EOF."""
+        sock = subscriber.sock
+        buffer = b""
+        try:
+            sock.settimeout(10.0)
+            while b"\n" not in buffer:
+                if len(buffer) > SUBSCRIBE_LINE_SIZE:
+                    raise OSError("subscribe line too long")
+                data = sock.recv(4096)
+                if not data:
+                    raise OSError("closed before subscribing")
+                buffer += data
+            line, buffer = buffer.split(b"\n", 1)
+            fields = line.decode("utf-8", "replace").split()
+            if len(fields) < 2 or fields[0] != "relay_subscribe":
+                raise OSError("expected relay_subscribe, got {!r}".format(line[:80]))
+            vehicle = fields[1]
+            backfill = int(fields[2]) if len(fields) > 2 else 0
+            after = float(fields[3]) if len(fields) > 3 else None
+            if not VEHICLE_PATTERN.match(vehicle):
+                raise ValueError("invalid vehicle name")
+            feed = self.feeds.get(vehicle)
+            if feed is None:
+                raise ValueError("vehicle {} is not relayed".format(vehicle))
+        except (OSError, ValueError) as e:
+            self.log("Rejected subscriber {}: {}".format(subscriber.address, e))
+            try:
+                sock.sendall(ERROR_PREFIX + str(e).encode() + b"\n")
+            except OSError:
+                pass
+            subscriber.close()
+            return
+
+        subscriber.vehicle = vehicle
+        with feed.lock:
+            rows = feed.history.view()[-backfill:] if backfill > 0 else ()
+            if after is not None and len(rows):
+                # A reconnect: only what the subscriber missed
+                rows = rows[rows[:, TIME] > after]
+            if len(rows):
+                subscriber.enqueue(encode_frames(rows), len(rows))
+            feed.subscribers.append(subscriber)
+            count = len(feed.subscribers)
+        self.log("Subscriber {} joined {} ({} subscribers, {} rows backfilled)".format(
+            subscriber.address, vehicle, count, len(rows)))
+
+        sender = threading.Thread(target=subscriber.send_loop, name="RelaySender")
+        sender.daemon = True
+        sender.start()
+
+        # Anything else the subscriber sends is ignored; EOF ends the subscription
+        sock.settimeout(None)
+        try:
+            while not subscriber.closed and sock.recv(4096):
+                pass
+        except OSError:
+            pass
+        subscriber.close()
+        with feed.lock:
+            if subscriber in feed.subscribers:
+                feed.subscribers.remove(subscriber)
+        self.log("Subscriber {} left {}".format(subscriber.address, vehicle))
+
+    def _pump(self):
+        """Pump thread: move upstream samples into the rings and out to the subscribers."""
+        while not self.stop_event.wait(TICK):
+            for feed in list(self.feeds.values()):
+                rows = feed.client.drain()
+                if not len(rows):
+                    continue
+                frames = encode_frames(rows)
+                with feed.lock:
+                    feed.history.extend(rows)
+                    feed.received += len(rows)
+                    for subscriber in feed.subscribers:
+                        subscriber.enqueue(frames, len(rows))
+
+    def status_lines(self):
+        """
+        Describe every feed.
+
+        Returns:
+            list: One line per vehicle
+        """
+        lines = []
+        for vehicle, feed in sorted(self.feeds.items()):
+            with feed.lock:
+                subscribers = list(feed.subscribers)
+            lines.append("{}: {} | {:,} samples, {} subscribers, {:,} dropped (upstream {:,})".format(
+                vehicle, feed.connection.status_text(), feed.received, len(subscribers),
+                sum(subscriber.dropped_rows for subscriber in subscribers),
+                feed.client.dropped_samples))
+        return lines
+
+
+def main():
+    """Main entry point."""
+    args = sys.argv[1:]
+
+    def option(flag, default, convert):
+        if flag in args:
+            i = args.index(flag)
+            value = convert(args[i + 1])
+            del args[i:i + 2]
+            return value
+        return default
+
+    def switch(flag):
+        if flag in args:
+            args.remove(flag)
+            return True
+        return False
+
+    binary = switch("--binary")
+    quiet = switch("--quiet")
+    listen = option("--listen", ("localhost", DEFAULT_PORT), parse_address)
+    vehicles = option("--vehicles", None, lambda text: text.split(","))
+    cycle = option("--cycle", None, float)
+    backfill = option("--backfill", BACKFILL_ROWS, int)
+    host = args[0] if len(args) > 0 else "localhost"
+    port = int(args[1]) if len(args) > 1 else 7108
+
+    try:
+        relay = TrickRelay(host, port, listen, vehicles, binary, cycle, backfill, verbose=not quiet)
+    except ValueError as e:
+        print("ERROR: {}".format(e))
+        sys.exit(1)
+    try:
+        relay.start()
+    except OSError as e:
+        print("ERROR: cannot listen on {}: {}".format(listen, e))
+        sys.exit(1)
+
+    print("=" * 60)
+    print("Orion Trajectory Relay")
+    print("=" * 60)
+    print("Upstream: {}:{}".format(host, port))
+    print("Listening: {}".format("unix:" + relay.listen[1] if relay.listen[0] == "unix"
+                                 else "{}:{}".format(*relay.listen)))
+    print("Vehicles: {}".format(", ".join(sorted(relay.feeds))))
+    print("Backfill: {:,} samples per vehicle".format(backfill))
+    print("=" * 60)
+
+    # Ctrl+C and SIGTERM stop the relay, closing every connection
+    stop_event = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *unused: stop_event.set())
+    while not stop_event.wait(REPORT_INTERVAL):
+        if not quiet:
+            for line in relay.status_lines():
+                print(line)
+    relay.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+"""
+Subscription builder for the Trick Variable Server.
+Builds the whole pause/clear/add/unpause command block for a set of variables
+as one buffer, so a (re)connect is a single sendall instead of one send per
+command.
+Author: Generated for NASA Trick Project
+"""
+
+import time
+
+
+class TrickSubscription:
+    """
+    Command block that subscribes to a list of variables.
+
+    The variable server runs each received line as a Python statement, so with
+    combined=True the var_add calls are joined with semicolons into as few
+    lines as max_line allows, which also saves the server a parse per
+    variable. Servers that only accept one command per line need the default
+    combined=False.
+    """
+    def __init__(self, variables=None, combined=False, max_line=4000):
+        """
+        Initialize the subscription.
+
+        Args:
+            variables (list): Trick variable names, in the order values are sent
+            combined (bool): Put several var_add calls on one line
+            max_line (int): Longest combined line in characters
+        """
+        self.variables = list(variables or [])
+        self.combined = combined
+        self.max_line = max_line
+        self.options = []  # Commands run after the var_adds, before var_unpause
+
+    def add(self, *names):
+        """
+        Add variables to the subscription.
+
+        Args:
+            names (str): Trick variable names
+
+        Returns:
+            TrickSubscription: self, for chaining
+        """
+        self.variables.extend(names)
+        return self
+
+    def add_option(self, command):
+        """
+        Add a command to run before the server is unpaused.
+
+        Args:
+            command (str): Command without the newline, e.g. "trick.var_cycle(0.02)"
+
+        Returns:
+            TrickSubscription: self, for chaining
+        """
+        self.options.append(command)
+        return self
+
+    def commands(self):
+        """
+        Get the command lines of the block.
+
+        Returns:
+            list: Command lines without newlines
+        """
+        commands = ["trick.var_pause()", "trick.var_clear()"]
+
+        adds = ["trick.var_add(\"{}\")".format(name) for name in self.variables]
+        if self.combined:
+            line = ""
+            for add in adds:
+                if line and len(line) + 2 + len(add) > self.max_line:
+                    commands.append(line)
+                    line = ""
+                line = add if not line else line + "; " + add
+            if line:
+                commands.append(line)
+        else:
+            commands.extend(adds)
+
+        commands.extend(self.options)
+        commands.append("trick.var_unpause()")
+        return commands
+
+    def build(self):
+        """
+        Get the whole command block.
+
+        Returns:
+            bytes: Newline-terminated commands, ready to send
+        """
+        return ("\n".join(self.commands()) + "\n").encode("ascii")
+
+    def send(self, sock):
+        """
+        Send the command block with a single sendall.
+
+        Args:
+            sock (socket.socket): Connected variable server socket
+
+        Returns:
+            float: Seconds spent sending
+        """
+        block = self.build()
+        start = time.time()
+        sock.sendall(block)
+        return time.time() - start
@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+"""
+Per-vehicle state for the trajectory displays.
+Each followed vehicle has its own Trick client, connection manager, history
+buffer and level-of-detail stage; the display adds its own artists and draws
+every vehicle in one redraw per tick.
+Author: Generated for NASA Trick Project
+"""
+
+import numpy as np
+
+from trick_client import TrickVariableClient, TrickConnectionManager, DEFAULT_VEHICLE, LIVE
+from trajectory_history import TrajectoryHistory
+from trajectory_lod import TrajectoryDecimator
+from trick_relay import RelayClient
+
+
+def parse_vehicle(spec):
+    """
+    Split a vehicle spec into its server and vehicle prefix.
+
+    Args:
+        spec (str): "Sim.Orion_2" for a vehicle on the display's server, or
+            "host:port/Sim.Orion_2" (or "host/Sim.Orion_2") for another sim
+
+    Returns:
+        tuple: (host or None, port or None, vehicle prefix)
+    """
+    if "/" not in spec:
+        return None, None, spec
+    server, vehicle = spec.split("/", 1)
+    host, _, port = server.partition(":")
+    return host or None, int(port) if port else None, vehicle
+
+
+def safe_file_name(name):
+    """Get a vehicle name with characters unsafe in file names replaced."""
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+
+
+def combined_extent(tracks):
+    """
+    Get the position extents of several vehicles together.
+
+    Args:
+        tracks (list): VehicleTrack objects
+
+    Returns:
+        tuple: (mins, maxs) position arrays, or None if no track has data
+    """
+    extents = [track.history.extent() for track in tracks if len(track.history)]
+    if not extents:
+        return None
+    mins = np.min([extent[0] for extent in extents], axis=0)
+    maxs = np.max([extent[1] for extent in extents], axis=0)
+    return mins, maxs
+
+
+class VehicleTrack:
+    """
+    One vehicle followed by a trajectory display.
+
+    Holds the vehicle's client, connection manager, history, decimator and
+    optional recorder. While replay is set, samples come from that
+    TrajectoryReplay instead of the connection.
+    The display stores its artists for the vehicle in line, tail and marker,
+    and uses changed to update only the vehicles that received samples.
+    """
+    def __init__(self, spec=DEFAULT_VEHICLE, host="localhost", port=7108, max_points=1000,
+                 ingest_mode="thread", binary=False, relay=False):
+        """
+        Initialize the vehicle's client and buffers.
+
+        Args:
+            spec (str): Vehicle spec (see parse_vehicle)
+            host (str): Trick Variable Server host, unless the spec names one
+            port (int): Trick Variable Server port, unless the spec names one
+            max_points (int): History capacity
+            ingest_mode (str): "thread" or "direct" (see FlightTrajectoryDisplay)
+            binary (bool): Ask the variable server for binary messages
+            relay (bool): host and port are a TrickRelay (see trick_relay)
+                rather than the variable server
+        """
+        self.name = spec
+        self.host, self.port, self.vehicle = parse_vehicle(spec)
+        self.ingest_mode = ingest_mode
+
+        client_class = RelayClient if relay else TrickVariableClient
+        self.client = client_class(self.host or host, self.port or port,
+                                   binary=binary, vehicle=self.vehicle)
+        self.connection = TrickConnectionManager(self.client,
+                                                 start_reader=(ingest_mode == "thread"))
+        self.history = TrajectoryHistory(max_points)
+        self.decimator = TrajectoryDecimator(max_points)
+        # Persists every sample, however short the history (set by the display)
+        self.recorder = None
+        # TrajectoryReplay played instead of the connection (set by the display)
+        self.replay = None
+
+        # Set by the display
+        self.line = None
+        self.tail = None
+        self.marker = None
+        self.changed = False  # Samples arrived since the artists were updated
+        self.settled = 0  # history.total when the line was last redrawn in full
+
+    def start(self, host, port):
+        """
+        Start connecting; host and port apply unless the spec named a server.
+
+        With a replay set, start playing it instead (replays are not recorded).
+
+        Args:
+            host (str): Display's Trick Variable Server host
+            port (int): Display's Trick Variable Server port
+        """
+        if self.replay is not None:
+            self.replay.start()
+            return
+        self.client.host = self.host or host
+        self.client.port = self.port or port
+        self.connection.start()
+        if self.recorder is not None:
+            self.recorder.start()
+
+    def stop(self):
+        """Stop reconnecting, disconnect, and finish the recording (or stop the replay)."""
+        if self.replay is not None:
+            self.replay.stop()
+        self.connection.stop()
+        if self.recorder is not None:
+            self.recorder.stop()
+
+    @property
+    def running(self):
+        """True while connecting, connected or replaying."""
+        return self.connection.running or (self.replay is not None and self.replay.running)
+
+    @property
+    def live(self):
+        """True while the connection (or replay) is delivering data."""
+        if self.replay is not None:
+            return self.replay.state == LIVE
+        return self.connection.state == LIVE
+
+    def read(self, max_samples=None):
+        """
+        Collect the samples that arrived since the last GUI tick.
+
+        Args:
+            max_samples (int): Most samples to take this tick
+
+        Returns:
+            np.ndarray: (N, 10) samples in history order (see TrickVariableClient)
+        """
+        if self.replay is not None:
+            return self.replay.read(max_samples)
+        if self.ingest_mode == "thread":
+            return self.client.drain(max_samples)
+        return self.client.read_available(max_samples)
+
+    def clear(self):
+        """Remove the vehicle's history."""
+        self.history.clear()
+        self.decimator.reset()
+        self.changed = True
+
+    def file_name(self):
+        """Get the vehicle name with characters unsafe in file names replaced."""
+        return safe_file_name(self.name)